@@ -3,30 +3,33 @@ AI Astrology API Router — All Claude-powered endpoints
 """
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 from datetime import date, datetime
 
 from app.services.ai_service import (
-    generate_ai_horoscope,
     generate_kundli_reading,
     generate_compatibility_reading,
     generate_dasha_reading,
     chat_with_astrologer,
     generate_muhurta,
     generate_yearly_prediction,
+    stream_kundli_reading,
+    stream_compatibility_reading,
+    stream_dasha_reading,
+    stream_chat_with_astrologer,
+    stream_muhurta,
+    stream_yearly_prediction,
 )
+from app.core.sse import EventStreamResponse, start_events
+from app.services.ai_governor import AIOverloadedError, ai_governor
+from app.services.chart_pool import ChartPoolOverloadedError
+from app.services.gazetteer import PlaceNotFoundError
+from app.services.horoscope_store import horoscope_store
+from app.services.muhurta import find_muhurta
 
 router = APIRouter()
 
-CURRENT_TRANSITS = [
-    {"planet":"Sun","sign":"Aquarius","deg":15.3,"retro":False,"effect":"Focus on community and innovation"},
-    {"planet":"Moon","sign":"Scorpio","deg":22.7,"retro":False,"effect":"Deep emotional undercurrents"},
-    {"planet":"Mars","sign":"Gemini","deg":18.4,"retro":False,"effect":"Mental energy elevated"},
-    {"planet":"Jupiter","sign":"Taurus","deg":12.9,"retro":False,"effect":"Steady material abundance"},
-    {"planet":"Venus","sign":"Pisces","deg":14.5,"retro":False,"effect":"Romantic and spiritual peak"},
-]
-
 
 # ── Schemas ───────────────────────────────────────────────────────────────
 
@@ -60,39 +63,46 @@ class ChatRequest(BaseModel):
 
 class MuhurtaRequest(BaseModel):
     event_type: str
-    preferred_month: str
+    preferred_month: str         # "2026-03", "March 2026" or "March"
     kundli_data: Optional[Dict[str, Any]] = None
+    place: str = ""              # else latitude/longitude, else the default location
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    timezone: Optional[str] = None
 
 class YearlyRequest(BaseModel):
     kundli_data: Dict[str, Any]
     year: int = datetime.now().year
 
 
+def _overloaded(e: AIOverloadedError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+async def _muhurta_search(req: MuhurtaRequest) -> Dict[str, Any]:
+    try:
+        return await find_muhurta(
+            req.event_type, req.preferred_month, req.place, req.latitude, req.longitude,
+            req.timezone, req.kundli_data,
+        )
+    except (ValueError, PlaceNotFoundError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ChartPoolOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
 # ── Endpoints ─────────────────────────────────────────────────────────────
 
 @router.post("/horoscope")
 async def ai_horoscope(req: HoroscopeRequest):
     """Generate a fully AI-powered horoscope reading using Claude."""
     try:
-        today = date.today()
-        if req.period_type == "daily":
-            date_ctx = today.strftime("%A, %d %B %Y")
-        elif req.period_type == "weekly":
-            date_ctx = f"Week of {today.strftime('%d %B %Y')}"
-        elif req.period_type == "monthly":
-            date_ctx = today.strftime("%B %Y")
-        else:
-            date_ctx = str(today.year)
-
-        result = await generate_ai_horoscope(
-            rashi=req.rashi,
-            rashi_english=req.rashi_english,
-            period_type=req.period_type,
-            date_context=date_ctx,
-            current_transits=CURRENT_TRANSITS,
-            current_dasha=req.current_dasha
+        result = await horoscope_store.get(
+            req.rashi, req.rashi_english, req.period_type, req.current_dasha
         )
         return {"success": True, "rashi": req.rashi, "period": req.period_type, "reading": result}
+    except AIOverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI horoscope error: {str(e)}")
 
@@ -103,6 +113,8 @@ async def ai_kundli_reading(req: KundliReadingRequest):
     try:
         result = await generate_kundli_reading(req.kundli_data)
         return {"success": True, "reading": result}
+    except AIOverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI Kundli reading error: {str(e)}")
 
@@ -113,6 +125,8 @@ async def ai_compatibility(req: CompatibilityRequest):
     try:
         result = await generate_compatibility_reading(req.person1, req.person2, req.score)
         return {"success": True, "score": req.score, "reading": result}
+    except AIOverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI compatibility error: {str(e)}")
 
@@ -125,6 +139,8 @@ async def ai_dasha(req: DashaRequest):
             req.kundli_data, req.current_dasha, req.next_dasha, req.dasha_end_date
         )
         return {"success": True, "current_dasha": req.current_dasha, "reading": result}
+    except AIOverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI dasha error: {str(e)}")
 
@@ -137,6 +153,8 @@ async def ai_chat(req: ChatRequest):
         messages = [{"role": m.role, "content": m.content} for m in req.messages]
         response = await chat_with_astrologer(messages, req.user_context)
         return {"success": True, "response": response}
+    except AIOverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         tb = traceback.format_exc()
         print(f"\n[AI CHAT ERROR]\n{tb}")          # visible in uvicorn terminal
@@ -145,10 +163,13 @@ async def ai_chat(req: ChatRequest):
 
 @router.post("/muhurta")
 async def ai_muhurta(req: MuhurtaRequest):
-    """AI-powered auspicious timing selection."""
+    """Calculated Muhurta windows for the month, narrated by the AI astrologer."""
+    search = await _muhurta_search(req)
     try:
-        result = await generate_muhurta(req.event_type, req.preferred_month, req.kundli_data)
-        return {"success": True, "event": req.event_type, "muhurta": result}
+        result = await generate_muhurta(req.event_type, search["windows"], req.kundli_data)
+        return {"success": True, "event": req.event_type, "search": search, "muhurta": result}
+    except AIOverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI muhurta error: {str(e)}")
 
@@ -159,10 +180,82 @@ async def ai_yearly(req: YearlyRequest):
     try:
         result = await generate_yearly_prediction(req.kundli_data, req.year)
         return {"success": True, "year": req.year, "prediction": result}
+    except AIOverloadedError as e:
+        raise _overloaded(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI yearly error: {str(e)}")
 
 
+# ── Streaming (SSE) ───────────────────────────────────────────────────────
+# Same inputs as the routes above. A stream that calls Groq opens with "open"
+# once it holds an AI slot; JSON readings then emit a "field" event per
+# completed top-level field and chat a "token" event per delta; every stream
+# ends with "done" (the full result) or "error". The response starts only at
+# the first event, so failing to get an AI slot is the same 503 as above.
+
+async def _start(events: AsyncIterator[Tuple[str, Any]], error_prefix: str) -> AsyncIterator[Tuple[str, Any]]:
+    try:
+        return await start_events(events)
+    except AIOverloadedError as e:
+        raise _overloaded(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{error_prefix}: {str(e)}")
+
+
+@router.post("/horoscope/stream")
+async def ai_horoscope_stream(req: HoroscopeRequest):
+    events = horoscope_store.stream(req.rashi, req.rashi_english, req.period_type, req.current_dasha)
+    return EventStreamResponse(await _start(events, "AI horoscope error"), "AI horoscope error")
+
+
+@router.post("/kundli-reading/stream")
+async def ai_kundli_reading_stream(req: KundliReadingRequest):
+    events = stream_kundli_reading(req.kundli_data)
+    return EventStreamResponse(await _start(events, "AI Kundli reading error"), "AI Kundli reading error")
+
+
+@router.post("/compatibility/stream")
+async def ai_compatibility_stream(req: CompatibilityRequest):
+    events = stream_compatibility_reading(req.person1, req.person2, req.score)
+    return EventStreamResponse(await _start(events, "AI compatibility error"), "AI compatibility error")
+
+
+@router.post("/dasha/stream")
+async def ai_dasha_stream(req: DashaRequest):
+    events = stream_dasha_reading(req.kundli_data, req.current_dasha, req.next_dasha, req.dasha_end_date)
+    return EventStreamResponse(await _start(events, "AI dasha error"), "AI dasha error")
+
+
+@router.post("/chat/stream")
+async def ai_chat_stream(req: ChatRequest):
+    messages = [{"role": m.role, "content": m.content} for m in req.messages]
+    events = stream_chat_with_astrologer(messages, req.user_context)
+    return EventStreamResponse(await _start(events, "AI chat error"), "AI chat error")
+
+
+@router.post("/muhurta/stream")
+async def ai_muhurta_stream(req: MuhurtaRequest):
+    # The search runs first so a bad month or place is still a 422; the
+    # stream then opens with a "search" event carrying the windows.
+    search = await _muhurta_search(req)
+    reading = await _start(
+        stream_muhurta(req.event_type, search["windows"], req.kundli_data), "AI muhurta error"
+    )
+
+    async def events():
+        yield "search", search
+        async for event in reading:
+            yield event
+
+    return EventStreamResponse(events(), "AI muhurta error")
+
+
+@router.post("/yearly/stream")
+async def ai_yearly_stream(req: YearlyRequest):
+    events = stream_yearly_prediction(req.kundli_data, req.year)
+    return EventStreamResponse(await _start(events, "AI yearly error"), "AI yearly error")
+
+
 @router.get("/health")
 async def ai_health():
     """Check if Groq AI service is configured."""
@@ -172,5 +265,6 @@ async def ai_health():
         "ai_enabled": configured,
         "provider": "Groq Cloud (Free Tier)",
         "model": settings.GROQ_MODEL if configured else "not configured",
-        "message": "Groq AI service ready" if configured else "Set GROQ_API_KEY in .env — get free key at console.groq.com"
+        "message": "Groq AI service ready" if configured else "Set GROQ_API_KEY in .env — get free key at console.groq.com",
+        "concurrency": ai_governor.stats(),
     }
@@ -1,23 +1,91 @@
-"""Compatibility API Router"""
-from fastapi import APIRouter
+"""Compatibility API Router — Ashtakoota (Guna Milan) matching"""
+import uuid
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from app.services.ashtakoota import bulk_match, match, pada_index, pada_indices, rashi_match
+from app.services.astrology_engine import RASHIS
+from app.services.partner_search import InvalidCursorError, partner_search
+
 router = APIRouter()
 
+MAX_CANDIDATES = 100_000
+
+
+# ── Schemas ───────────────────────────────────────────────────────────────
+
+class MatchRequest(BaseModel):
+    groom_moon_longitude: float = Field(..., ge=0, lt=360, description="Sidereal Moon longitude")
+    bride_moon_longitude: float = Field(..., ge=0, lt=360)
+
+
+class Candidate(BaseModel):
+    id: str
+    moon_longitude: float = Field(..., ge=0, lt=360)
+
+
+class BulkMatchRequest(BaseModel):
+    moon_longitude: float = Field(..., ge=0, lt=360, description="Sidereal Moon of the searching profile")
+    role: Literal["groom", "bride"] = "groom"
+    candidates: List[Candidate] = Field(..., max_length=MAX_CANDIDATES)
+    top_k: int = Field(10, ge=1, le=1000)
+    min_score: float = Field(0, ge=0, le=36)
+
+
+# ── Routes ────────────────────────────────────────────────────────────────
+
+@router.post("/match")
+async def match_charts(request: MatchRequest):
+    """Full eight-koota breakdown for one couple from their Moon positions."""
+    return match(pada_index(request.groom_moon_longitude), pada_index(request.bride_moon_longitude))
+
+
+@router.post("/bulk")
+async def bulk_compatibility(request: BulkMatchRequest):
+    """
+    Score one chart against up to 100k candidates in a single vectorized
+    lookup; the best `top_k` (at or above `min_score`) come back with their
+    per-koota breakdown.
+    """
+    result = bulk_match(
+        pada_index(request.moon_longitude),
+        pada_indices([c.moon_longitude for c in request.candidates]),
+        role=request.role, top_k=request.top_k, min_score=request.min_score,
+    )
+    result["top"] = [
+        {"id": request.candidates[entry.pop("index")].id, **entry} for entry in result["top"]
+    ]
+    return result
+
+
+@router.get("/search/{kundli_id}")
+async def search_partners(
+    kundli_id: uuid.UUID,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="`next_cursor` from the previous page"),
+    min_score: float = Query(18, ge=0, le=36),
+):
+    """
+    Best matches for a stored Kundli among public profiles of the opposite
+    gender: highest Guna score first, then matching Manglik status.
+    """
+    try:
+        result = await partner_search.search(kundli_id, limit, cursor, min_score)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Kundli not found")
+    return result
+
 
 @router.get("/{rashi1}/{rashi2}")
 async def get_compatibility(rashi1: int, rashi2: int):
-    RASHIS = ["Mesha","Vrishabha","Mithuna","Karka","Simha","Kanya",
-              "Tula","Vrischika","Dhanu","Makara","Kumbha","Meena"]
+    """Moon-sign compatibility (1–12, groom first); nakshatra kootas are averaged."""
     if not (1 <= rashi1 <= 12 and 1 <= rashi2 <= 12):
         return {"error": "Rashi must be between 1 and 12"}
     r1, r2 = rashi1 - 1, rashi2 - 1
-    diff = abs(r1 - r2)
-    if diff > 6:
-        diff = 12 - diff
-    score_map = {0: 36, 1: 20, 2: 28, 3: 30, 4: 20, 5: 18, 6: 25}
-    score = score_map.get(diff, 20)
-    return {
-        "rashi_1": RASHIS[r1], "rashi_2": RASHIS[r2],
-        "total_score": score, "max_score": 36,
-        "percentage": round(score / 36 * 100),
-        "recommendation": "Excellent" if score >= 30 else "Good" if score >= 24 else "Average" if score >= 18 else "Challenging"
-    }
+    return {"rashi_1": RASHIS[r1], "rashi_2": RASHIS[r2], **rashi_match(r1, r2)}
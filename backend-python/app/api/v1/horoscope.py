@@ -1,12 +1,19 @@
 """Horoscope API Router"""
 
-from fastapi import APIRouter, Depends, Query
+import asyncio
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from datetime import date, timedelta
-from typing import Optional
+from typing import Any, Dict, Optional
+import structlog
 
 from app.core.database import get_db
+from app.core.snapshot import snapshots
+from app.services.astrology_engine import RASHIS_ENGLISH
+from app.services.horoscope_store import horoscope_store
+
+logger = structlog.get_logger()
 
 router = APIRouter()
 
@@ -16,7 +23,7 @@ RASHI_NAMES = [
     "Dhanu", "Makara", "Kumbha", "Meena"
 ]
 
-# Static horoscope data (in production, this would be AI-generated and stored in DB)
+# Static fallback, used when no stored reading exists and Groq is unavailable
 HOROSCOPE_DATA = {
     "Mesha": {
         "daily": "Powerful solar energies propel you forward. Leadership opportunities arise — trust your instincts and act decisively. Courage creates positive momentum in all spheres today.",
@@ -129,11 +136,31 @@ HOROSCOPE_DATA = {
 }
 
 
+async def _horoscope_data(rashi_name: str, period_type: str) -> Optional[Dict[str, Any]]:
+    """Stored (or freshly generated) AI reading in HOROSCOPE_DATA's shape, else the static entry."""
+    if rashi_name not in HOROSCOPE_DATA:
+        return None
+    try:
+        english = RASHIS_ENGLISH[RASHI_NAMES.index(rashi_name)]
+        reading = await horoscope_store.get(rashi_name, english, period_type)
+    except Exception as e:
+        logger.warning("Horoscope store unavailable, serving static text",
+                       rashi=rashi_name, period=period_type, error=str(e))
+        return HOROSCOPE_DATA[rashi_name]
+
+    fallback = HOROSCOPE_DATA[rashi_name]
+    data = {period_type: reading.get("main_prediction") or fallback[period_type]}
+    for key in ("love", "career", "health", "lucky_color", "lucky_number", "lucky_gem", "lucky_day",
+                "love_score", "career_score", "health_score", "finance_score"):
+        data[key] = reading.get(key, fallback[key])
+    return data
+
+
 @router.get("/daily/{rashi_name}")
 async def get_daily_horoscope(rashi_name: str):
     """Get today's horoscope for a specific rashi."""
     rashi_name = rashi_name.capitalize()
-    data = HOROSCOPE_DATA.get(rashi_name)
+    data = await _horoscope_data(rashi_name, "daily")
     if not data:
         rashi_names_list = list(HOROSCOPE_DATA.keys())
         return {"error": f"Rashi '{rashi_name}' not found", "valid_rashis": rashi_names_list}
@@ -165,7 +192,7 @@ async def get_daily_horoscope(rashi_name: str):
 async def get_weekly_horoscope(rashi_name: str):
     """Get this week's horoscope."""
     rashi_name = rashi_name.capitalize()
-    data = HOROSCOPE_DATA.get(rashi_name)
+    data = await _horoscope_data(rashi_name, "weekly")
     if not data:
         return {"error": f"Rashi not found"}
 
@@ -189,19 +216,33 @@ async def get_weekly_horoscope(rashi_name: str):
 
 
 @router.get("/all/daily")
-async def get_all_daily_horoscopes():
+async def get_all_daily_horoscopes(request: Request):
     """Get today's horoscope for all 12 rashis."""
-    result = {}
-    for rashi, data in HOROSCOPE_DATA.items():
-        result[rashi] = {
-            "prediction": data["daily"],
-            "scores": {
-                "love": data["love_score"],
-                "career": data["career_score"],
-                "health": data["health_score"],
-                "finance": data["finance_score"]
-            },
-            "lucky_color": data["lucky_color"],
-            "lucky_gem": data["lucky_gem"]
-        }
-    return {"date": str(date.today()), "horoscopes": result}
+    today = date.today()
+
+    async def build():
+        result = {}
+        all_data = await asyncio.gather(*(_horoscope_data(rashi, "daily") for rashi in HOROSCOPE_DATA))
+        for rashi, data in zip(HOROSCOPE_DATA, all_data):
+            result[rashi] = {
+                "prediction": data["daily"],
+                "scores": {
+                    "love": data["love_score"],
+                    "career": data["career_score"],
+                    "health": data["health_score"],
+                    "finance": data["finance_score"]
+                },
+                "lucky_color": data["lucky_color"],
+                "lucky_gem": data["lucky_gem"]
+            }
+        return {"date": str(today), "horoscopes": result}
+
+    try:
+        version = (today, await horoscope_store.version(today))
+    except Exception:
+        version = None
+    # The TTL bounds how long static fallback text is served once Groq is back
+    return await snapshots.respond(
+        request, "horoscope:all:daily", build, version=version,
+        ttl=horoscope_store.refresh_seconds, max_age=300,
+    )
@@ -0,0 +1,111 @@
+"""
+Background Jobs API Router
+Long AI reports and bulk chart runs are queued to the Celery workers
+(app.worker) instead of holding a request open; clients poll for the result.
+"""
+
+import asyncio
+import uuid
+from typing import Any, Dict, Optional, Tuple, Type
+
+import structlog
+from fastapi import APIRouter, Body, HTTPException, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from app.api.v1.ai import KundliReadingRequest, YearlyRequest
+from app.api.v1.kundli import KundliBatchRequest
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.worker import JOB_QUEUES, celery_app, job_key, kundli_batch_job, kundli_reading_job, yearly_job
+
+logger = structlog.get_logger()
+
+router = APIRouter()
+
+# kind → (request body, task); each result is the matching synchronous route's response
+JOB_KINDS: Dict[str, Tuple[Type[BaseModel], Any]] = {
+    "yearly": (YearlyRequest, yearly_job),
+    "kundli-reading": (KundliReadingRequest, kundli_reading_job),
+    "kundli-batch": (KundliBatchRequest, kundli_batch_job),
+}
+
+STATUS = {
+    "PENDING": "queued",
+    "RECEIVED": "queued",
+    "STARTED": "running",
+    "RETRY": "retrying",
+    "SUCCESS": "succeeded",
+    "FAILURE": "failed",
+    "REVOKED": "expired",
+}
+
+
+@router.post("/{kind}", status_code=status.HTTP_202_ACCEPTED)
+async def create_job(kind: str, body: Dict[str, Any] = Body(...)):
+    """
+    Queue a job: `yearly` and `kundli-reading` take the body of /ai/yearly and
+    /ai/kundli-reading, `kundli-batch` that of /kundli/generate-batch. Poll
+    GET /jobs/{id} for its status and result.
+    """
+    if kind not in JOB_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown job kind {kind!r}; choose from {', '.join(JOB_KINDS)}",
+        )
+    model, task = JOB_KINDS[kind]
+    try:
+        request = model.model_validate(body)
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+
+    job_id = str(uuid.uuid4())
+    queue = task.name.split(".")[1]
+    # Registered first so a job is never reported unknown while it runs; kept
+    # until its result expires
+    ttl = settings.JOBS_QUEUED_EXPIRES_SECONDS + JOB_QUEUES[queue]["result_ttl"]
+    try:
+        await get_redis().set(job_key(job_id), kind, ex=ttl)
+        await asyncio.to_thread(
+            task.apply_async, (request.model_dump(mode="json"),),
+            task_id=job_id, expires=settings.JOBS_QUEUED_EXPIRES_SECONDS,
+        )
+    except Exception as e:
+        logger.warning("Job enqueue failed", kind=kind, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job queue is unavailable, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+    return {"id": job_id, "kind": kind, "status": "queued", "status_url": f"/api/v1/jobs/{job_id}"}
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: uuid.UUID):
+    """
+    A job's status: queued, running, retrying, succeeded (with `result`),
+    failed (with `error`) or expired (not started within
+    JOBS_QUEUED_EXPIRES_SECONDS).
+    """
+    job_id = str(job_id)
+    try:
+        kind = await get_redis().get(job_key(job_id))
+        meta = await asyncio.to_thread(celery_app.backend.get_task_meta, job_id) if kind else None
+    except Exception as e:
+        logger.warning("Job lookup failed", job_id=job_id, error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job queue is unavailable, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+    if kind is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found or expired")
+
+    state = meta["status"]
+    job: Dict[str, Any] = {"id": job_id, "kind": kind.decode(), "status": STATUS.get(state, state.lower())}
+    result: Optional[Any] = meta.get("result")
+    if state == "SUCCESS":
+        job["result"] = result
+    elif state in ("FAILURE", "RETRY"):
+        job["error"] = f"{type(result).__name__}: {result}" if isinstance(result, BaseException) else str(result)
+    return job
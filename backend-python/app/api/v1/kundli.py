@@ -3,15 +3,27 @@ Kundli API Router
 Handles birth chart generation, storage, and retrieval
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import date
+from typing import Any, Dict, Optional, List
+from datetime import date, datetime
 import uuid
 
 from app.core.database import get_db
-from app.services.astrology_engine import astrology_engine
+from app.core.metrics import stage
+from app.services.ashtakoota import rashi_match
+from app.services.astrology_engine import astrology_engine, KundliData, RASHIS
+from app.services import chart_cache as cache_codec
+from app.services.chart_cache import chart_cache, canonical_birth
+from app.services.chart_pool import chart_pool, ChartPoolOverloadedError
+from app.services.dasha_engine import MAX_DEPTH
+from app.services.single_flight import LeaderFailedError, single_flight
+from app.services.varga import VARGA_CODES, divisional_charts, chart_points, parse_vargas, stored_points
+from app.services.gazetteer import PlaceNotFoundError
+from app.services.kundli_store import PendingKundli, kundli_store
+from app.services.partner_search import match_columns
 
 router = APIRouter()
 
@@ -22,12 +34,13 @@ class KundliRequest(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
     date_of_birth: date
     time_of_birth: str = Field(..., pattern=r"^\d{2}:\d{2}$")
-    place_of_birth: str
+    place_of_birth: str = Field(..., max_length=500)
     latitude: Optional[float] = None
     longitude: Optional[float] = None
-    timezone: Optional[str] = None
-    gender: Optional[str] = None
+    timezone: Optional[str] = Field(None, max_length=100)
+    gender: Optional[str] = Field(None, max_length=20)
     chart_style: str = "north"   # north | south
+    is_public: bool = False      # opt in to being found by partner search
 
     class Config:
         json_schema_extra = {
@@ -83,15 +96,150 @@ class KundliResponse(BaseModel):
     dasha_periods: Optional[List] = None
 
 
+class VargaPlanet(BaseModel):
+    rashi: str
+    house: int
+
+
+class VargaChart(BaseModel):
+    name: str
+    ascendant_rashi: str
+    planets: Dict[str, VargaPlanet]
+
+
+class KundliVargaResponse(KundliResponse):
+    vargas: Optional[Dict[str, VargaChart]] = None
+
+
+class KundliBatchRequest(BaseModel):
+    charts: List[KundliRequest] = Field(..., min_length=1, max_length=5000)
+    include_dasha: bool = False
+
+
+class KundliBatchResponse(BaseModel):
+    count: int
+    kundlis: List[KundliResponse]
+
+
 class DashaRequest(BaseModel):
     date_of_birth: date
     moon_longitude: float
 
 
+# ── Helpers ──────────────────────────────────────────────────────────────
+
+def _kundli_payload(
+    request: KundliRequest, kundli_data: KundliData, dashas: Optional[List]
+) -> dict:
+    """
+    A KundliResponse as plain JSON types, in the model's field order. It is
+    built straight from the engine's output and serialized with orjson, so
+    the hot path skips Pydantic validation; `response_model` still documents it.
+    """
+    planets = {
+        name: {
+            "name": p.name,
+            "sanskrit": p.sanskrit,
+            "symbol": p.symbol,
+            "sidereal_longitude": round(float(p.sidereal_longitude), 4),
+            "rashi": p.rashi,
+            "rashi_symbol": p.rashi_symbol,
+            "degree_in_rashi": round(float(p.degree_in_rashi), 4),
+            "nakshatra": p.nakshatra,
+            "nakshatra_pada": int(p.nakshatra_pada),
+            "is_retrograde": bool(p.is_retrograde),
+            "house": int(p.house),
+        }
+        for name, p in kundli_data.planets.items()
+    }
+    houses = [
+        {
+            "house": h["house"],
+            "rashi": h["rashi"],
+            "rashi_symbol": h["rashi_symbol"],
+            "planets": h["planets"],
+            "significance": h["significance"],
+        }
+        for h in kundli_data.houses
+    ]
+    return {
+        "id": str(uuid.uuid4()),
+        "name": request.name,
+        "date_of_birth": str(request.date_of_birth),
+        "time_of_birth": request.time_of_birth,
+        "place_of_birth": request.place_of_birth,
+        "ascendant_rashi": kundli_data.ascendant_rashi,
+        "ascendant_degree": round(float(kundli_data.ascendant_degree), 4),
+        "moon_sign": kundli_data.moon_sign,
+        "sun_sign": kundli_data.sun_sign,
+        "nakshatra": kundli_data.nakshatra,
+        "nakshatra_pada": int(kundli_data.nakshatra_pada),
+        "nakshatra_lord": kundli_data.nakshatra_lord,
+        "planets": planets,
+        "houses": houses,
+        "yogas": list(kundli_data.yogas),
+        "ayanamsa": round(float(kundli_data.ayanamsa), 4),
+        "dasha_periods": dashas,
+    }
+
+
+async def _stored_chart(kundli_id: uuid.UUID) -> dict:
+    try:
+        chart = await kundli_store.get(kundli_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Kundli lookup failed: {str(e)}"
+        )
+    if chart is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kundli not found")
+    return chart
+
+
+async def kundli_batch_payload(request: KundliBatchRequest) -> Dict[str, Any]:
+    """A KundliBatchResponse as plain JSON types (also the result of a kundli-batch job)."""
+    charts = await chart_pool.kundli_batch([
+        {
+            "dob": c.date_of_birth,
+            "tob": c.time_of_birth,
+            "place": c.place_of_birth,
+            "lat": c.latitude,
+            "lon": c.longitude,
+            "timezone": c.timezone,
+        }
+        for c in request.charts
+    ], include_dasha=request.include_dasha)
+
+    with stage("serialize_batch"):
+        kundlis = [
+            _kundli_payload(chart_request, kundli_data, dashas)
+            for chart_request, (kundli_data, dashas) in zip(request.charts, charts)
+        ]
+    return {"count": len(kundlis), "kundlis": kundlis}
+
+
+def _requested_vargas(text: Optional[str]) -> List[str]:
+    try:
+        return parse_vargas(text)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+
+def _overloaded(e: ChartPoolOverloadedError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"},
+    )
+
+
 # ── Endpoints ────────────────────────────────────────────────────────────
 
-@router.post("/generate", response_model=KundliResponse, status_code=status.HTTP_200_OK)
-async def generate_kundli(request: KundliRequest):
+@router.post("/generate", response_model=KundliVargaResponse, status_code=status.HTTP_200_OK)
+async def generate_kundli(
+    request: KundliRequest,
+    vargas: Optional[str] = Query(None, description="Divisional charts to add, e.g. D9,D10, or all"),
+):
     """
     Generate a complete Vedic birth chart (Kundli).
 
@@ -101,114 +249,167 @@ async def generate_kundli(request: KundliRequest):
     - Rahu/Ketu (lunar nodes)
     - Vimshottari Dasha periods
     - Yogas present in the chart
+    - Divisional charts (D1–D60) named in `vargas`
     """
+    varga_codes = _requested_vargas(vargas)
     try:
-        kundli_data = astrology_engine.calculate_kundli(
-            dob=request.date_of_birth,
-            tob=request.time_of_birth,
-            place=request.place_of_birth,
-            lat=request.latitude,
-            lon=request.longitude,
-            timezone=request.timezone
+        lat, lon, timezone = astrology_engine.resolve_location(
+            request.place_of_birth, request.latitude, request.longitude, request.timezone
+        )
+        lat, lon, cache_key = canonical_birth(
+            request.date_of_birth, request.time_of_birth, lat, lon, timezone
         )
 
-        # Calculate dasha periods
-        moon_long = kundli_data.planets["Moon"].sidereal_longitude
-        dashas = astrology_engine.calculate_vimshottari_dasha(
-            dob=request.date_of_birth,
-            moon_longitude=moon_long
+        cached = await chart_cache.get(cache_key)
+        if cached is not None:
+            kundli_data, dashas = cached
+        else:
+            async def compute():
+                # Chart + dasha periods, computed off the event loop
+                result = await chart_pool.kundli(
+                    dob=request.date_of_birth,
+                    tob=request.time_of_birth,
+                    place=request.place_of_birth,
+                    lat=lat,
+                    lon=lon,
+                    timezone=timezone
+                )
+                await chart_cache.put(cache_key, *result)
+                return result
+
+            # Identical concurrent requests (any worker) share one computation
+            try:
+                kundli_data, dashas = await single_flight.do(
+                    cache_key, compute, encode=lambda r: cache_codec.encode(*r), decode=cache_codec.decode
+                )
+            except LeaderFailedError as e:
+                if e.kind == ChartPoolOverloadedError.__name__:
+                    raise ChartPoolOverloadedError(e.detail) from e
+                raise
+
+        with stage("serialize"):
+            chart = _kundli_payload(request, kundli_data, dashas)
+            body = chart
+            if varga_codes:
+                with stage("vargas"):
+                    body = {**chart, "vargas": divisional_charts(chart_points(kundli_data), varga_codes)}
+            response = ORJSONResponse(body)
+        # Persisted write-behind; the response never waits on the database
+        kundli_store.save(PendingKundli(
+            chart=chart, latitude=lat, longitude=lon, timezone=timezone,
+            gender=request.gender, match=match_columns(kundli_data),
+            is_public=request.is_public,
+        ))
+        return response
+
+    except ChartPoolOverloadedError as e:
+        raise _overloaded(e)
+    except PlaceNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{str(e)} — supply latitude, longitude and timezone"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Kundli calculation error: {str(e)}"
         )
 
-        planets_response = {}
-        for name, planet in kundli_data.planets.items():
-            planets_response[name] = {
-                "name": planet.name,
-                "sanskrit": planet.sanskrit,
-                "symbol": planet.symbol,
-                "sidereal_longitude": round(planet.sidereal_longitude, 4),
-                "rashi": planet.rashi,
-                "rashi_symbol": planet.rashi_symbol,
-                "degree_in_rashi": round(planet.degree_in_rashi, 4),
-                "nakshatra": planet.nakshatra,
-                "nakshatra_pada": planet.nakshatra_pada,
-                "is_retrograde": planet.is_retrograde,
-                "house": planet.house
-            }
 
-        return KundliResponse(
-            id=str(uuid.uuid4()),
-            name=request.name,
-            date_of_birth=str(request.date_of_birth),
-            time_of_birth=request.time_of_birth,
-            place_of_birth=request.place_of_birth,
-            ascendant_rashi=kundli_data.ascendant_rashi,
-            ascendant_degree=round(kundli_data.ascendant_degree, 4),
-            moon_sign=kundli_data.moon_sign,
-            sun_sign=kundli_data.sun_sign,
-            nakshatra=kundli_data.nakshatra,
-            nakshatra_pada=kundli_data.nakshatra_pada,
-            nakshatra_lord=kundli_data.nakshatra_lord,
-            planets=planets_response,
-            houses=[HouseResponse(**h) for h in kundli_data.houses],
-            yogas=kundli_data.yogas,
-            ayanamsa=round(kundli_data.ayanamsa, 4),
-            dasha_periods=dashas
-        )
+@router.post("/generate-batch", response_model=KundliBatchResponse, status_code=status.HTTP_200_OK)
+async def generate_kundli_batch(request: KundliBatchRequest):
+    """
+    Generate many birth charts in one call (onboarding imports, matchmaking campaigns).
 
+    Each chart is identical to what `/generate` returns for the same input;
+    dasha periods are included only when `include_dasha` is set.
+    """
+    try:
+        return ORJSONResponse(await kundli_batch_payload(request))
+
+    except ChartPoolOverloadedError as e:
+        raise _overloaded(e)
+    except PlaceNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{str(e)} — supply latitude, longitude and timezone"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Kundli calculation error: {str(e)}"
+            detail=f"Kundli batch calculation error: {str(e)}"
         )
 
 
 @router.post("/dasha")
-async def get_dasha_periods(request: DashaRequest):
-    """Calculate Vimshottari Dasha timeline from birth date and Moon position."""
-    dashas = astrology_engine.calculate_vimshottari_dasha(
-        dob=request.date_of_birth,
-        moon_longitude=request.moon_longitude
-    )
-    return {"dasha_periods": dashas}
+async def get_dasha_periods(
+    request: DashaRequest,
+    depth: int = Query(2, ge=1, le=MAX_DEPTH, description="1 = mahadasha … 5 = prana"),
+    start: Optional[date] = Query(None, description="Only periods overlapping [start, end)"),
+    end: Optional[date] = Query(None),
+    at: Optional[datetime] = Query(None, description="Instant for `current`; defaults to now"),
+):
+    """
+    Calculate Vimshottari Dasha timeline from birth date and Moon position.
+    Deeper levels are expanded only inside the requested window, and
+    `current` is the dasha chain active at `at`.
+    """
+    if start and end and start >= end:
+        raise HTTPException(status_code=422, detail="start must be before end")
+    try:
+        return await chart_pool.dasha(
+            request.date_of_birth, request.moon_longitude, depth, start, end, at
+        )
+    except ChartPoolOverloadedError as e:
+        raise _overloaded(e)
 
 
 @router.get("/compatibility/{rashi1}/{rashi2}")
 async def check_compatibility(rashi1: int, rashi2: int):
     """
-    Check basic Kuta compatibility between two Moon signs (Rashis).
-    Returns Ashtakoota-based compatibility score.
+    Check basic Kuta compatibility between two Moon signs (Rashis, groom first).
+    Returns Ashtakoota-based compatibility score; nakshatra kootas are averaged.
     """
     if not (0 <= rashi1 <= 11 and 0 <= rashi2 <= 11):
         raise HTTPException(status_code=400, detail="Rashi index must be between 0 and 11")
 
-    RASHIS = [
-        "Mesha", "Vrishabha", "Mithuna", "Karka",
-        "Simha", "Kanya", "Tula", "Vrischika",
-        "Dhanu", "Makara", "Kumbha", "Meena"
-    ]
-
-    diff = abs(rashi1 - rashi2)
-    if diff > 6:
-        diff = 12 - diff
-
-    # Simplified scoring
-    scores = {0: 36, 1: 20, 2: 28, 3: 30, 4: 20, 5: 18, 6: 25}
-    score = scores.get(diff, 20)
-
     return {
         "rashi_1": RASHIS[rashi1],
         "rashi_2": RASHIS[rashi2],
-        "total_score": score,
-        "max_score": 36,
-        "percentage": round(score / 36 * 100),
-        "recommendation": "Excellent" if score >= 30 else "Good" if score >= 24 else "Average" if score >= 18 else "Challenging"
+        **rashi_match(rashi1, rashi2),
     }
 
 
 @router.get("/yogas/{kundli_id}")
-async def get_yogas(kundli_id: str):
-    """Get yoga analysis for a Kundli (placeholder — extend with DB lookup)."""
+async def get_yogas(kundli_id: uuid.UUID):
+    """Yogas of a stored Kundli."""
+    chart = await _stored_chart(kundli_id)
+    return {
+        "kundli_id": chart["id"],
+        "name": chart["name"],
+        "count": len(chart["yogas"]),
+        "yogas": chart["yogas"],
+    }
+
+
+@router.get("/vargas/{kundli_id}")
+async def get_vargas(
+    kundli_id: uuid.UUID,
+    vargas: str = Query("all", description="Divisional charts, e.g. D9,D10, or all"),
+):
+    """Divisional charts (Shodashavarga, D1–D60) of a stored Kundli."""
+    varga_codes = _requested_vargas(vargas) or VARGA_CODES
+    chart = await _stored_chart(kundli_id)
+    with stage("vargas"):
+        charts = divisional_charts(stored_points(chart), varga_codes)
     return {
-        "kundli_id": kundli_id,
-        "message": "Yoga analysis requires computed kundli data. Use /generate endpoint first."
+        "kundli_id": chart["id"],
+        "name": chart["name"],
+        "vargas": charts,
     }
+
+
+@router.get("/{kundli_id}", response_model=KundliResponse)
+async def get_kundli(kundli_id: uuid.UUID):
+    """A Kundli previously generated by /generate."""
+    return await _stored_chart(kundli_id)
@@ -0,0 +1,142 @@
+"""Panchang API Router"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import AsyncIterator, Optional
+
+import orjson
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.services.astrology_engine import NAKSHATRAS, RASHIS, astrology_engine
+from app.services.chart_pool import ChartPoolOverloadedError
+from app.services.gazetteer import PlaceNotFoundError
+from app.services.muhurta import EVENTS, find_muhurta
+from app.services.panchang import panchang_engine
+
+logger = structlog.get_logger()
+
+router = APIRouter()
+
+
+@dataclass
+class Location:
+    latitude: float
+    longitude: float
+    timezone: str
+
+
+def location(
+    place: Optional[str] = Query(None, description="Place name; or give latitude and longitude"),
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    timezone: Optional[str] = Query(None, description="IANA name; looked up from the coordinates if omitted"),
+) -> Location:
+    if not place and (latitude is None or longitude is None):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Supply place, or latitude and longitude",
+        )
+    try:
+        return Location(*astrology_engine.resolve_location(place or "", latitude, longitude, timezone))
+    except PlaceNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{str(e)} — supply latitude, longitude and timezone"
+        )
+
+
+def _year_from(start: date) -> date:
+    """The day before the same date next year."""
+    try:
+        return start.replace(year=start.year + 1) - timedelta(days=1)
+    except ValueError:                                  # 29 February
+        return date(start.year + 1, 2, 28)
+
+
+# /range and /muhurta are declared before /{day} so they are not parsed as dates
+@router.get("/range")
+async def get_panchang_range(
+    start: date,
+    end: Optional[date] = Query(None, description="Last date, inclusive; defaults to a year from start"),
+    where: Location = Depends(location),
+):
+    """
+    Panchang for every date from `start` to `end`, streamed as newline-delimited
+    JSON (one day per line, same fields as /panchang/{date}), computed a chunk
+    of PANCHANG_CHUNK_DAYS at a time off the event loop.
+    """
+    end = end or _year_from(start)
+    count = (end - start).days + 1
+    if not 1 <= count <= settings.PANCHANG_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"end must be on or after start and at most {settings.PANCHANG_MAX_RANGE_DAYS} days later",
+        )
+
+    async def lines() -> AsyncIterator[bytes]:
+        try:
+            for offset in range(0, count, settings.PANCHANG_CHUNK_DAYS):
+                days = await asyncio.to_thread(
+                    panchang_engine.days, where.latitude, where.longitude, where.timezone,
+                    start + timedelta(days=offset), min(settings.PANCHANG_CHUNK_DAYS, count - offset),
+                )
+                yield b"".join(orjson.dumps(day) + b"\n" for day in days)
+        except Exception as e:
+            # The 200 has been sent; end the stream with an error line
+            logger.warning("Panchang range failed", error=str(e))
+            yield orjson.dumps({"error": f"Panchang calculation error: {str(e)}"}) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/muhurta")
+async def get_muhurta(
+    event: str = Query(..., description=f"Free text, matched to one of: {', '.join(EVENTS)}"),
+    month: str = Query(..., description='"2026-03", "March 2026" or "March"'),
+    nakshatra: Optional[str] = Query(None, description="Janma nakshatra, for Tara bala"),
+    moon_sign: Optional[str] = Query(None, description="Natal Moon rashi, for Chandra bala"),
+    limit: int = Query(10, ge=1, le=settings.MUHURTA_MAX_WINDOWS),
+    where: Location = Depends(location),
+):
+    """
+    Ranked auspicious windows for an event in a month: each one's local start
+    and end, score, and the tithi, nakshatra, vara and lagna that hold
+    throughout, outside Rahu Kalam, Yamaganda and Vishti karana.
+    """
+    if nakshatra is not None and nakshatra not in NAKSHATRAS or moon_sign is not None and moon_sign not in RASHIS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="nakshatra and moon_sign take the names used in kundli charts",
+        )
+    try:
+        return await find_muhurta(
+            event, month, lat=where.latitude, lon=where.longitude, timezone=where.timezone,
+            kundli_data={"nakshatra": nakshatra, "moon_sign": moon_sign}, limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except ChartPoolOverloadedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": "1"}
+        )
+
+
+@router.get("/{day}")
+async def get_panchang(day: date, where: Location = Depends(location)):
+    """
+    Panchang of one date: vara, sunrise and sunset, each limb (tithi, nakshatra,
+    yoga, karana) current at sunrise and any that begin before the next sunrise
+    with their end times, and Rahu Kalam, Yamaganda and Gulika Kalam.
+    """
+    try:
+        panchang = panchang_engine.days(where.latitude, where.longitude, where.timezone, day, 1)[0]
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Panchang calculation error: {str(e)}"
+        )
+    return {"latitude": where.latitude, "longitude": where.longitude, "timezone": where.timezone, **panchang}
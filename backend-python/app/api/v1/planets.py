@@ -1,5 +1,8 @@
 """Planets API Router"""
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from app.core.snapshot import snapshots
+
 router = APIRouter()
 
 PLANETS_DATA = [
@@ -43,8 +46,10 @@ PLANETS_DATA = [
 
 
 @router.get("/")
-async def get_all_planets():
-    return {"count": len(PLANETS_DATA), "planets": PLANETS_DATA}
+async def get_all_planets(request: Request):
+    return await snapshots.respond(
+        request, "planets", lambda: {"count": len(PLANETS_DATA), "planets": PLANETS_DATA}, max_age=86400
+    )
 
 
 @router.get("/{planet_name}")
@@ -1,5 +1,8 @@
 """Rashis API Router"""
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from app.core.snapshot import snapshots
+
 router = APIRouter()
 
 RASHIS_DATA = [
@@ -55,8 +58,10 @@ RASHIS_DATA = [
 
 
 @router.get("/")
-async def get_all_rashis():
-    return {"count": 12, "rashis": RASHIS_DATA}
+async def get_all_rashis(request: Request):
+    return await snapshots.respond(
+        request, "rashis", lambda: {"count": 12, "rashis": RASHIS_DATA}, max_age=86400
+    )
 
 
 @router.get("/{rashi_id}")
@@ -1,5 +1,8 @@
 """Remedies API Router"""
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from app.core.snapshot import snapshots
+
 router = APIRouter()
 
 REMEDIES = [
@@ -51,13 +54,18 @@ REMEDIES = [
 
 
 @router.get("/")
-async def get_all_remedies(category: str = None, planet: str = None):
-    remedies = REMEDIES
-    if category:
-        remedies = [r for r in remedies if r["category"] == category.lower()]
-    if planet:
-        remedies = [r for r in remedies if r["planet"] and r["planet"].lower() == planet.lower()]
-    return {"count": len(remedies), "remedies": remedies}
+async def get_all_remedies(request: Request, category: str = None, planet: str = None):
+    category, planet = (category or "").lower(), (planet or "").lower()
+
+    def build():
+        remedies = REMEDIES
+        if category:
+            remedies = [r for r in remedies if r["category"] == category]
+        if planet:
+            remedies = [r for r in remedies if r["planet"] and r["planet"].lower() == planet]
+        return {"count": len(remedies), "remedies": remedies}
+
+    return await snapshots.respond(request, ("remedies", category, planet), build, max_age=86400)
 
 
 @router.get("/planet/{planet_name}")
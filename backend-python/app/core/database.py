@@ -1,3 +1,6 @@
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import settings
@@ -30,3 +33,18 @@ async def get_db():
             raise
         finally:
             await session.close()
+
+
+@asynccontextmanager
+async def raw_connection() -> AsyncIterator[Any]:
+    """The asyncpg connection behind a pooled engine connection, for COPY and bulk writes."""
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        yield raw.driver_connection
+
+
+def pool_stats() -> Dict[str, int]:
+    """Connection counts of the engine's pool, for /metrics."""
+    pool = engine.pool
+    return {"size": pool.size(), "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(), "overflow": pool.overflow()}
@@ -0,0 +1,194 @@
+"""
+Prometheus metrics, served at /metrics.
+
+Covers request latency per route, AstrologyEngine stage timings, Groq
+latency and token usage per AI endpoint, and gauges read from each
+component's stats() at scrape time. With METRICS_ENABLED off, the request
+middleware is not installed and `stage()` hands back a shared no-op context.
+"""
+
+import asyncio
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.config import settings
+
+enabled = settings.METRICS_ENABLED
+registry = CollectorRegistry()
+
+REQUEST_SECONDS = Histogram(
+    "jyotish_http_request_duration_seconds", "HTTP request latency, to the last body byte",
+    ["method", "route", "status"], registry=registry,
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "jyotish_http_requests_in_progress", "HTTP requests being served", ["method"], registry=registry,
+)
+STAGE_SECONDS = Histogram(
+    "jyotish_engine_stage_duration_seconds", "Time spent in one stage of chart computation",
+    ["stage"], registry=registry,
+    buckets=(.00001, .000025, .00005, .0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1, .25, 1),
+)
+GROQ_SECONDS = Histogram(
+    "jyotish_groq_request_duration_seconds", "Groq chat completion latency (streams: until the last chunk)",
+    ["endpoint", "mode", "outcome"], registry=registry,
+    buckets=(.1, .25, .5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+GROQ_TOKENS = Counter(
+    "jyotish_groq_tokens", "Tokens used by Groq calls", ["endpoint", "kind"], registry=registry,
+)
+
+
+# ── Engine stages ──────────────────────────────────────────────────────────
+# In chart-pool workers timings are kept in _shipped and returned with each
+# result, so the serving process records them (see chart_pool._run).
+_shipped: Optional[List[Tuple[str, float]]] = None
+_stage_children: Dict[str, Any] = {}
+_NULL_STAGE = nullcontext()
+
+
+def _observe_stage(name: str, seconds: float) -> None:
+    child = _stage_children.get(name)
+    if child is None:
+        child = _stage_children[name] = STAGE_SECONDS.labels(name)
+    child.observe(seconds)
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.started
+        if _shipped is not None:
+            _shipped.append((self.name, elapsed))
+        else:
+            _observe_stage(self.name, elapsed)
+
+
+def stage(name: str):
+    """Context manager timing one stage of chart computation."""
+    return _Stage(name) if enabled else _NULL_STAGE
+
+
+def ship_stages() -> None:
+    """In a worker process: keep stage timings for shipped_stages() instead of recording them."""
+    global _shipped
+    _shipped = []
+
+
+def shipped_stages() -> List[Tuple[str, float]]:
+    """Stage timings kept since the last call (worker side)."""
+    global _shipped
+    if _shipped is None:
+        return []
+    timings, _shipped = _shipped, []
+    return timings
+
+
+def observe_stages(timings: Iterable[Tuple[str, float]]) -> None:
+    for name, seconds in timings:
+        _observe_stage(name, seconds)
+
+
+# ── Groq ───────────────────────────────────────────────────────────────────
+class GroqCall:
+    """Times one Groq request; set `usage` from the response to count its tokens."""
+
+    __slots__ = ("endpoint", "mode", "started", "usage")
+
+    def __init__(self, endpoint: str, mode: str):
+        self.endpoint = endpoint
+        self.mode = mode
+        self.usage = None
+
+    def __enter__(self) -> "GroqCall":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Optional[type], *exc: Any) -> None:
+        if not enabled:
+            return
+        if exc_type is None:
+            outcome = "ok"
+        elif issubclass(exc_type, (GeneratorExit, asyncio.CancelledError)):
+            outcome = "cancelled"
+        else:
+            outcome = "error"
+        GROQ_SECONDS.labels(self.endpoint, self.mode, outcome).observe(time.perf_counter() - self.started)
+        if self.usage is not None:
+            GROQ_TOKENS.labels(self.endpoint, "prompt").inc(self.usage.prompt_tokens or 0)
+            GROQ_TOKENS.labels(self.endpoint, "completion").inc(self.usage.completion_tokens or 0)
+
+
+# ── Component gauges ───────────────────────────────────────────────────────
+class _StatsCollector:
+    """Exports the top-level numbers of each registered stats() as gauges, read at scrape time."""
+
+    def __init__(self) -> None:
+        self.sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def collect(self):
+        for name, stats in self.sources.items():
+            try:
+                values = stats()
+            except Exception:
+                continue
+            for key, value in values.items():
+                if isinstance(value, (bool, int, float)):
+                    yield GaugeMetricFamily(f"jyotish_{name}_{key}", f"{name} {key}", value=float(value))
+
+
+_stats = _StatsCollector()
+registry.register(_stats)
+
+
+def register_stats(name: str, stats: Callable[[], Dict[str, Any]]) -> None:
+    _stats.sources[name] = stats
+
+
+# ── HTTP ───────────────────────────────────────────────────────────────────
+class MetricsMiddleware:
+    """Request latency per route template. Pure ASGI, so streamed responses are timed to the end."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # The router records the matched route in the scope; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.labels(method, route, str(status)).observe(time.perf_counter() - started)
+
+
+def render() -> Tuple[bytes, str]:
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,292 @@
+"""
+On-demand request profiling.
+
+With PROFILING_ENABLED set, a PROFILING_SAMPLE_RATE fraction of requests,
+plus any request sent with `X-Profile: 1` and the admin token, is profiled:
+
+- a sampling profiler records the serving thread's Python stack every
+  PROFILING_INTERVAL_MS into folded stacks (`<id>.folded`, for
+  flamegraph.pl, speedscope or inferno);
+- tracemalloc snapshots taken before and after the request give the
+  allocations it left behind and the traced peak (`<id>.alloc.txt`).
+
+Captures go to PROFILING_DIR and are listed and downloaded through the
+/admin/profiles endpoints. Requests run concurrently on one event loop, so
+a capture also contains whatever else the loop ran meanwhile. Chart-pool
+work runs in worker processes and shows up only as the wait for the pool;
+profile with CHART_POOL_ENABLED=false to see inside the engine. With
+profiling off, the middleware is not installed at all.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+CAPTURE_ID = re.compile(r"^[\w.-]+$")
+ARTIFACTS = {"flamegraph": ".folded", "allocations": ".alloc.txt"}
+
+
+def admin_token_valid(token: Optional[str]) -> bool:
+    """True when PROFILING_ADMIN_TOKEN is set and `token` matches it."""
+    expected = settings.PROFILING_ADMIN_TOKEN
+    return bool(expected) and token is not None and hmac.compare_digest(token, expected)
+
+
+# ── Stack sampling ─────────────────────────────────────────────────────────
+class StackSampler:
+    """
+    Wall-clock sampler: a daemon thread reads the watched threads' frames
+    every `interval` seconds and counts folded stacks. It runs only while
+    at least one capture is open.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._captures: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[CodeType, str] = {}
+
+    def open(self, thread_id: int) -> Counter:
+        counts: Counter = Counter()
+        with self._lock:
+            self._captures[id(counts)] = (thread_id, counts)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        return counts
+
+    def close(self, counts: Counter) -> None:
+        with self._lock:
+            self._captures.pop(id(counts), None)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._captures:
+                    self._thread = None
+                    return
+                captures = list(self._captures.values())
+            frames = sys._current_frames()
+            for thread_id, counts in captures:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    counts[self._fold(frame)] += 1
+
+    def _fold(self, frame: Optional[FrameType]) -> str:
+        stack: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            stack.append(label)
+            frame = frame.f_back
+        stack.reverse()
+        return ";".join(stack)
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to the longest sys.path entry containing it."""
+    best = ""
+    for entry in sys.path:
+        if entry and filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    return filename[len(best):].lstrip(os.sep) if best else filename
+
+
+# ── Allocation tracking ────────────────────────────────────────────────────
+class AllocationTracker:
+    """Runs tracemalloc while any capture needs it, unless it was already running."""
+
+    def __init__(self, frames: int, top: int):
+        self.frames = frames
+        self.top = top
+        self._users = 0
+        self._owned = False
+
+    def start(self) -> tracemalloc.Snapshot:
+        if self._users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owned = True
+        self._users += 1
+        tracemalloc.reset_peak()
+        return tracemalloc.take_snapshot()
+
+    def stop(self, before: tracemalloc.Snapshot) -> str:
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        self._users -= 1
+        if self._users == 0 and self._owned:
+            tracemalloc.stop()
+            self._owned = False
+        return self._report(before, after, current, peak)
+
+    def _report(self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot,
+                current: int, peak: int) -> str:
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__),
+                  tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+        diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+        lines = [
+            f"traced now: {current / 1024:,.1f} KiB   peak during request: {peak / 1024:,.1f} KiB",
+            "",
+            f"Top {self.top} lines by memory still allocated at the end of the request:",
+        ]
+        lines += [f"{i:>3}. {stat}" for i, stat in enumerate(diff[:self.top], 1)]
+        grown = sorted((s for s in diff if s.size_diff > 0), key=lambda s: s.size_diff, reverse=True)
+        if grown:
+            lines += ["", "Largest allocation site, full traceback:"]
+            lines += [f"    {line}" for line in grown[0].traceback.format()]
+        return "\n".join(lines) + "\n"
+
+
+# ── Captures ───────────────────────────────────────────────────────────────
+class Profiler:
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float,
+        interval_ms: float,
+        trace_allocations: bool,
+        tracemalloc_frames: int,
+        top_allocations: int,
+        max_captures: int,
+    ):
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.trace_allocations = trace_allocations
+        self.max_captures = max_captures
+        self.sampler = StackSampler(interval_ms / 1000)
+        self.allocations = AllocationTracker(tracemalloc_frames, top_allocations)
+        self.captured = 0
+
+    def wanted(self, forced: bool) -> bool:
+        return forced or random.random() < self.sample_rate
+
+    async def profile(self, app: Callable, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        """Serve one request under the profilers and write its capture (also when it fails)."""
+        status = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        snapshot = self.allocations.start() if self.trace_allocations else None
+        counts = self.sampler.open(threading.get_ident())
+        started = time.perf_counter()
+        try:
+            await app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - started
+            self.sampler.close(counts)
+            allocations = self.allocations.stop(snapshot) if snapshot is not None else None
+            meta = {
+                "method": scope["method"], "route": getattr(scope.get("route"), "path", scope["path"]),
+                "path": scope["path"], "status": status, "duration_ms": round(seconds * 1000, 2),
+                "samples": sum(counts.values()),
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            try:
+                await asyncio.to_thread(self._write, meta, counts, allocations)
+            except OSError as e:
+                logger.warning("Could not write profile", error=str(e))
+
+    def _write(self, meta: Dict[str, Any], counts: Counter, allocations: Optional[str]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^\w]+", "-", meta["route"]).strip("-") or "root"
+        capture_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{meta['method'].lower()}-{slug}-{uuid.uuid4().hex[:6]}"
+        meta["id"] = capture_id
+        meta["artifacts"] = ["flamegraph"] + (["allocations"] if allocations is not None else [])
+
+        (self.directory / f"{capture_id}.folded").write_text(
+            "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+        )
+        if allocations is not None:
+            (self.directory / f"{capture_id}.alloc.txt").write_text(allocations)
+        (self.directory / f"{capture_id}.json").write_text(json.dumps(meta))
+        self.captured += 1
+        self._prune()
+
+    def _prune(self) -> None:
+        metas = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in metas[:max(len(metas) - self.max_captures, 0)]:
+            for suffix in (".json", *ARTIFACTS.values()):
+                (self.directory / f"{path.stem}{suffix}").unlink(missing_ok=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        captures = []
+        for path in self.directory.glob("*.json"):
+            try:
+                captures.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return sorted(captures, key=lambda m: m["id"], reverse=True)
+
+    def artifact(self, capture_id: str, kind: str) -> Optional[Path]:
+        """Path of one capture's artifact, or None if there is no such capture or artifact."""
+        if kind not in ARTIFACTS or not CAPTURE_ID.match(capture_id):
+            return None
+        path = self.directory / f"{capture_id}{ARTIFACTS[kind]}"
+        return path if path.is_file() else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.PROFILING_ENABLED,
+            "sample_rate": self.sample_rate,
+            "captured": self.captured,
+        }
+
+
+profiler = Profiler(
+    directory=settings.PROFILING_DIR,
+    sample_rate=settings.PROFILING_SAMPLE_RATE,
+    interval_ms=settings.PROFILING_INTERVAL_MS,
+    trace_allocations=settings.PROFILING_TRACEMALLOC,
+    tracemalloc_frames=settings.PROFILING_TRACEMALLOC_FRAMES,
+    top_allocations=settings.PROFILING_TOP_ALLOCATIONS,
+    max_captures=settings.PROFILING_MAX_CAPTURES,
+)
+
+
+class ProfilingMiddleware:
+    """Profiles a sampled fraction of requests, and those forced by an admin."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        forced = headers.get(b"x-profile") == b"1" and admin_token_valid(
+            headers.get(b"x-admin-token", b"").decode("latin-1") or None
+        )
+        if profiler.wanted(forced):
+            await profiler.profile(self.app, scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
@@ -0,0 +1,133 @@
+"""
+Response snapshots for read-only endpoints.
+
+A payload is serialized once per content version and kept in memory as raw,
+gzip and (when the brotli package is installed) brotli bytes. Requests get
+the best encoding they accept with a strong ETag and Cache-Control, and
+conditional requests get 304 Not Modified. Precompressed bodies carry
+Content-Encoding, so GZipMiddleware passes them through untouched.
+"""
+
+import gzip
+import hashlib
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import brotli
+except ImportError:         # optional: gzip only
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1000   # same threshold as the GZipMiddleware in app.main
+
+
+class Snapshot:
+    __slots__ = ("version", "built_at", "etag", "bodies")
+
+    def __init__(self, version: Hashable, payload: Any):
+        self.version = version
+        self.built_at = time.monotonic()
+        body = orjson.dumps(jsonable_encoder(payload))
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        # encoding → bytes; a strong ETag names one representation, so each gets its own
+        self.bodies: Dict[str, bytes] = {"identity": body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(body, quality=11)
+
+    def tag(self, encoding: str) -> str:
+        return f'"{self.etag}"' if encoding == "identity" else f'"{self.etag}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """Weak comparison, as RFC 9110 prescribes for If-None-Match."""
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return "*" in tags or any(self.tag(encoding) in tags for encoding in self.bodies)
+
+
+def _accepted(accept_encoding: str) -> set:
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        q = params.strip().removeprefix("q=") if params.strip().startswith("q=") else "1"
+        try:
+            if float(q) > 0:
+                accepted.add(coding.strip())
+        except ValueError:
+            pass
+    return accepted
+
+
+class SnapshotCache:
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Snapshot]" = OrderedDict()
+        self.builds = 0
+        self.hits = 0
+        self.not_modified = 0
+
+    async def get(
+        self, key: Hashable, build: Callable[[], Any],
+        version: Hashable = None, ttl: Optional[float] = None,
+    ) -> Snapshot:
+        """Snapshot of `build()` for `key`, rebuilt when `version` changes or `ttl` runs out."""
+        snap = self._entries.get(key)
+        if snap is not None and snap.version == version and (
+            ttl is None or time.monotonic() - snap.built_at < ttl
+        ):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return snap
+
+        payload = build()
+        if inspect.isawaitable(payload):
+            payload = await payload
+        snap = Snapshot(version, payload)
+        self.builds += 1
+        self._entries[key] = snap
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return snap
+
+    async def respond(
+        self, request: Request, key: Hashable, build: Callable[[], Any],
+        version: Hashable = None, ttl: Optional[float] = None, max_age: int = 3600,
+    ) -> Response:
+        snap = await self.get(key, build, version, ttl)
+        accepted = _accepted(request.headers.get("accept-encoding", ""))
+        encoding = next((e for e in ("br", "gzip") if e in accepted and e in snap.bodies), "identity")
+        headers = {
+            "Cache-Control": f"public, max-age={max(int(max_age), 0)}",
+            "Vary": "Accept-Encoding",
+            "ETag": snap.tag(encoding),
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and snap.matches(if_none_match):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=snap.bodies[encoding], media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": sum(len(b) for s in self._entries.values() for b in s.bodies.values()),
+            "builds": self.builds,
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+            "brotli": brotli is not None,
+        }
+
+
+snapshots = SnapshotCache()
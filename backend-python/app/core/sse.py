@@ -0,0 +1,66 @@
+"""Server-Sent Events responses"""
+
+import json
+from typing import Any, AsyncIterator, Optional, Tuple
+
+import structlog
+from fastapi.responses import StreamingResponse
+
+logger = structlog.get_logger()
+
+
+async def start_events(events: AsyncIterator[Tuple[str, Any]]) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Run `events` up to its first event and return the whole stream. Whatever
+    it raises before then (e.g. AIOverloadedError while queued for a slot)
+    reaches the route, which can still answer with an error status. AI
+    streams yield "open" as soon as they hold their slot, so this only waits
+    for admission, not for the model.
+    """
+    first: Optional[Tuple[str, Any]]
+    try:
+        first = await events.__anext__()
+    except StopAsyncIteration:
+        first = None
+
+    async def replay() -> AsyncIterator[Tuple[str, Any]]:
+        if first is not None:
+            yield first
+            async for event in events:
+                yield event
+
+    return replay()
+
+
+def format_event(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    Streams (event, data) pairs as text/event-stream. Errors raised mid-stream
+    become a final "error" event, since the 200 status has already been sent.
+    """
+
+    media_type = "text/event-stream"
+
+    def __init__(self, events: AsyncIterator[Tuple[str, Any]], error_prefix: str = "Stream error"):
+        super().__init__(
+            self._encode(events, error_prefix),
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",      # nginx: pass events through unbuffered
+                # An explicit encoding makes GZipMiddleware pass the stream through
+                # instead of holding events inside its compressor.
+                "Content-Encoding": "identity",
+            },
+        )
+
+    @staticmethod
+    async def _encode(events: AsyncIterator[Tuple[str, Any]], error_prefix: str) -> AsyncIterator[bytes]:
+        try:
+            async for event, data in events:
+                yield format_event(event, data)
+        except Exception as e:
+            logger.warning(error_prefix, error=str(e))
+            yield format_event("error", {"detail": f"{error_prefix}: {str(e)}"})
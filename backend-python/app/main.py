@@ -1,14 +1,29 @@
 """Jyotish Darshan — FastAPI Main Application"""
 
-from fastapi import FastAPI
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 import structlog
 
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api.v1 import kundli, horoscope, transits, remedies, rashis, compatibility, planets, ai
+from app.core import metrics
+from app.core.database import engine, Base, pool_stats
+from app.core.profiling import ProfilingMiddleware, admin_token_valid, profiler
+from app.api.v1 import kundli, horoscope, transits, remedies, rashis, compatibility, planets, ai, panchang, jobs
+from app.core.redis import close_redis
+from app.core.snapshot import snapshots
+from app.services.ai_governor import ai_governor
+from app.services.ai_service import close_client as close_ai_client
+from app.services.chart_cache import chart_cache
+from app.services.chart_pool import chart_pool
+from app.services.horoscope_store import horoscope_store
+from app.services.kundli_store import kundli_store
+from app.services.panchang import panchang_engine
+from app.services.single_flight import single_flight
 
 logger = structlog.get_logger()
 
@@ -18,8 +33,15 @@ async def lifespan(app: FastAPI):
     logger.info("🔮 Jyotish Darshan API starting...")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await chart_pool.start()
+    await horoscope_store.refresh()
+    await kundli_store.start()
     yield
     logger.info("🌙 Shutting down...")
+    await kundli_store.stop()
+    chart_pool.shutdown()
+    await close_redis()
+    await close_ai_client()
 
 
 app = FastAPI(
@@ -27,11 +49,25 @@ app = FastAPI(
     description="Vedic Astrology Platform with AI — Kundli, Horoscope, Dasha, Transits & Remedies",
     version="2.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(CORSMiddleware, allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 app.add_middleware(GZipMiddleware, minimum_size=1000)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+if metrics.enabled:
+    # Outermost, so compression and CORS count towards request latency
+    app.add_middleware(metrics.MetricsMiddleware)
+
+for name, stats in {
+    "db_pool": pool_stats, "chart_pool": chart_pool.stats, "chart_cache": chart_cache.stats,
+    "horoscope_store": horoscope_store.stats, "ai": ai_governor.stats,
+    "single_flight": single_flight.stats, "kundli_store": kundli_store.stats,
+    "snapshots": snapshots.stats, "profiler": profiler.stats, "panchang": panchang_engine.stats,
+}.items():
+    metrics.register_stats(name, stats)
 
 app.include_router(kundli.router,        prefix="/api/v1/kundli",        tags=["Kundli"])
 app.include_router(horoscope.router,     prefix="/api/v1/horoscope",     tags=["Horoscope"])
@@ -41,6 +77,8 @@ app.include_router(rashis.router,        prefix="/api/v1/rashis",        tags=["
 app.include_router(compatibility.router, prefix="/api/v1/compatibility", tags=["Compatibility"])
 app.include_router(planets.router,       prefix="/api/v1/planets",       tags=["Planets"])
 app.include_router(ai.router,            prefix="/api/v1/ai",            tags=["AI Astrology"])
+app.include_router(panchang.router,      prefix="/api/v1/panchang",      tags=["Panchang"])
+app.include_router(jobs.router,          prefix="/api/v1/jobs",          tags=["Jobs"])
 
 
 @app.get("/", tags=["Health"])
@@ -50,4 +88,40 @@ async def root():
 
 @app.get("/health", tags=["Health"])
 async def health():
-    return {"status": "healthy", "service": "python-api", "version": "2.0.0"}
+    return {"status": "healthy", "service": "python-api", "version": "2.0.0",
+            "chart_pool": chart_pool.stats(), "chart_cache": chart_cache.stats(),
+            "horoscope_store": horoscope_store.stats(), "ai": ai_governor.stats(),
+            "single_flight": single_flight.stats(), "kundli_store": kundli_store.stats(),
+            "snapshots": snapshots.stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body, content_type = metrics.render()
+    return Response(body, headers={"Content-Type": content_type})
+
+
+# ── Profiling admin ──────────────────────────────────────────────────────────
+def _require_admin(token: Optional[str]) -> None:
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not admin_token_valid(token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@app.get("/admin/profiles", include_in_schema=False)
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return {"profiler": profiler.stats(), "captures": profiler.list()}
+
+
+@app.get("/admin/profiles/{capture_id}/{kind}", include_in_schema=False)
+async def download_profile(capture_id: str, kind: str, x_admin_token: Optional[str] = Header(None)):
+    """kind: flamegraph (folded stacks) or allocations (tracemalloc report)."""
+    _require_admin(x_admin_token)
+    path = profiler.artifact(capture_id, kind)
+    if path is None:
+        raise HTTPException(status_code=404, detail="No such profile")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=path.name)
@@ -0,0 +1,6 @@
+"""SQLAlchemy models for the tables in database/migrations"""
+
+from app.models.horoscope import Horoscope
+from app.models.kundli import Kundli
+
+__all__ = ["Horoscope", "Kundli"]
@@ -0,0 +1,39 @@
+"""horoscopes table (001_init.sql, 003_horoscope_store.sql)"""
+
+import uuid
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Date, DateTime, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class Horoscope(Base):
+    __tablename__ = "horoscopes"
+    __table_args__ = (
+        Index("uq_horoscopes_reading", "rashi_id", "type", "date_from", "dasha", unique=True),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    rashi_id: Mapped[int] = mapped_column(Integer)              # rashis.id, 1 = Mesha … 12 = Meena
+    type: Mapped[str] = mapped_column(String(50))               # daily | weekly | monthly | yearly
+    date_from: Mapped[date] = mapped_column(Date)
+    date_to: Mapped[date] = mapped_column(Date)
+    dasha: Mapped[str] = mapped_column(String(50), default="")
+    prediction: Mapped[str] = mapped_column(Text)
+    love_score: Mapped[Optional[int]] = mapped_column(Integer)
+    career_score: Mapped[Optional[int]] = mapped_column(Integer)
+    health_score: Mapped[Optional[int]] = mapped_column(Integer)
+    finance_score: Mapped[Optional[int]] = mapped_column(Integer)
+    lucky_color: Mapped[Optional[str]] = mapped_column(String(100))
+    lucky_number: Mapped[Optional[int]] = mapped_column(Integer)
+    lucky_gem: Mapped[Optional[str]] = mapped_column(String(100))
+    lucky_day: Mapped[Optional[str]] = mapped_column(String(50))
+    love_prediction: Mapped[Optional[str]] = mapped_column(Text)
+    career_prediction: Mapped[Optional[str]] = mapped_column(Text)
+    health_prediction: Mapped[Optional[str]] = mapped_column(Text)
+    reading: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,59 @@
+"""kundlis table (001_init.sql, 004_partner_search.sql)"""
+
+import uuid
+from datetime import date, datetime, time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import (
+    Boolean, Date, DateTime, Float, Index, Integer, Numeric, SmallInteger, String, Text, Time,
+    func, text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class Kundli(Base):
+    __tablename__ = "kundlis"
+    __table_args__ = (
+        Index(
+            "idx_kundlis_partner_search", "gender", "is_manglik", "moon_pada", "id",
+            postgresql_where=text("is_public AND moon_pada IS NOT NULL"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True))
+    name: Mapped[str] = mapped_column(String(255))
+    date_of_birth: Mapped[date] = mapped_column(Date)
+    time_of_birth: Mapped[time] = mapped_column(Time)
+    place_of_birth: Mapped[str] = mapped_column(String(500))
+    latitude: Mapped[float] = mapped_column(Numeric(10, 7, asdecimal=False))
+    longitude: Mapped[float] = mapped_column(Numeric(10, 7, asdecimal=False))
+    timezone: Mapped[str] = mapped_column(String(100))
+    gender: Mapped[Optional[str]] = mapped_column(String(20))      # male | female
+    is_primary: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    ascendant: Mapped[Optional[str]] = mapped_column(String(50))
+    moon_sign: Mapped[Optional[str]] = mapped_column(String(50))
+    sun_sign: Mapped[Optional[str]] = mapped_column(String(50))
+    nakshatra: Mapped[Optional[str]] = mapped_column(String(100))
+    nakshatra_pada: Mapped[Optional[int]] = mapped_column(Integer)
+    yoga: Mapped[Optional[str]] = mapped_column(String(100))
+    karana: Mapped[Optional[str]] = mapped_column(String(100))
+    tithi: Mapped[Optional[str]] = mapped_column(String(100))
+
+    # Matchmaking (004): sidereal Moon, its pada (0–107 = nakshatra × 4 + pada) and Kuja dosha
+    moon_longitude: Mapped[Optional[float]] = mapped_column(Float)
+    moon_pada: Mapped[Optional[int]] = mapped_column(SmallInteger)
+    is_manglik: Mapped[Optional[bool]] = mapped_column(Boolean)
+
+    planetary_positions: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
+    house_positions: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
+    chart_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
+
+    is_public: Mapped[bool] = mapped_column(Boolean, default=False)
+    notes: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,107 @@
+"""
+AI Concurrency Governor
+Bounds in-flight Groq calls globally and per endpoint, so a burst on one
+AI feature cannot starve the others. Callers beyond the waiting limit, or
+still waiting after the queue timeout, get AIOverloadedError (served as 503).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict
+
+from app.core.config import settings
+
+
+class AIOverloadedError(RuntimeError):
+    """Raised when the AI service has too many calls queued."""
+
+
+@dataclass
+class EndpointStats:
+    waiting: int = 0
+    in_flight: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+
+
+class AIGovernor:
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        endpoint_concurrency: int = 16,
+        max_waiting: int = 256,
+        queue_timeout: float = 30.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.endpoint_concurrency = endpoint_concurrency
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._endpoints: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, EndpointStats] = {}
+        self.waiting = 0
+        self.in_flight = 0
+
+    async def _acquire(self, endpoint_sem: asyncio.Semaphore) -> None:
+        await endpoint_sem.acquire()
+        try:
+            await self._global.acquire()
+        except BaseException:
+            endpoint_sem.release()
+            raise
+
+    @asynccontextmanager
+    async def slot(self, endpoint: str) -> AsyncIterator[None]:
+        """Hold one global and one `endpoint` slot for the duration of a Groq call."""
+        stats = self._stats.setdefault(endpoint, EndpointStats())
+        endpoint_sem = self._endpoints.setdefault(
+            endpoint, asyncio.Semaphore(self.endpoint_concurrency)
+        )
+        if self.waiting >= self.max_waiting:
+            stats.rejected += 1
+            raise AIOverloadedError("AI service is at capacity, please retry shortly")
+
+        self.waiting += 1
+        stats.waiting += 1
+        try:
+            await asyncio.wait_for(self._acquire(endpoint_sem), self.queue_timeout)
+        except asyncio.TimeoutError:
+            stats.rejected += 1
+            raise AIOverloadedError(f"AI request queued for more than {self.queue_timeout:g}s")
+        finally:
+            self.waiting -= 1
+            stats.waiting -= 1
+
+        self.in_flight += 1
+        stats.in_flight += 1
+        try:
+            yield
+            stats.completed += 1
+        except BaseException:
+            stats.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            stats.in_flight -= 1
+            self._global.release()
+            endpoint_sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "endpoint_concurrency": self.endpoint_concurrency,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "endpoints": {name: asdict(s) for name, s in sorted(self._stats.items())},
+        }
+
+
+ai_governor = AIGovernor(
+    max_concurrency=settings.GROQ_MAX_CONCURRENCY,
+    endpoint_concurrency=settings.GROQ_ENDPOINT_CONCURRENCY,
+    max_waiting=settings.GROQ_MAX_WAITING,
+    queue_timeout=settings.GROQ_QUEUE_TIMEOUT_SECONDS,
+)
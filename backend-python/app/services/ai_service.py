@@ -3,24 +3,57 @@ Bhramhlekh — AI Service
 Provider: Groq Cloud (Free Tier)
 Model: openai/gpt-oss-120b
 Generates: horoscopes, kundli readings, compatibility, dasha, muhurta, chat
+Each generator has a stream_* variant relaying Groq's streamed tokens (SSE routes)
 """
 
 from __future__ import annotations
 
-import asyncio
+import hashlib
 import json
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from groq import Groq
+import httpx
+from groq import AsyncGroq, DefaultAsyncHttpxClient
 
 # ── Settings import ────────────────────────────────────────────────────────
 # Ensure `settings` provides the following attributes:
 #   GROQ_API_KEY, GROQ_MODEL, GROQ_MAX_TOKENS
 from app.core.config import settings
+from app.core.metrics import GroqCall
+from app.services.ai_governor import AIOverloadedError, ai_governor
+from app.services.single_flight import LeaderFailedError, single_flight
 
 # ── Groq client ─────────────────────────────────────────────────────────────
-client = Groq(api_key=settings.GROQ_API_KEY)
+# One async client over a keep-alive connection pool; no threads are held while
+# the model generates. Every call goes through ai_governor's concurrency slots.
+_client: Optional[AsyncGroq] = None
+
+
+def get_client() -> AsyncGroq:
+    global _client
+    if _client is None or _client.is_closed():
+        _client = AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            timeout=settings.GROQ_TIMEOUT_SECONDS,
+            http_client=DefaultAsyncHttpxClient(
+                timeout=settings.GROQ_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.GROQ_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GROQ_MAX_CONNECTIONS,
+                    keepalive_expiry=60,
+                ),
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the connection pool (app shutdown, or the end of a Celery task's event loop)."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
 
 # ── System Prompt ───────────────────────────────────────────────────────────
 JYOTISH_SYSTEM_PROMPT = """You are Jyotish Guru — an ancient and wise Vedic astrology master with deep knowledge of:
@@ -61,40 +94,166 @@ def _parse_json(text: str) -> Dict[str, Any]:
     return json.loads(cleaned)
 
 
-async def _call_groq(prompt: str, *, max_tokens: Optional[int] = None) -> str:
-    """Execute a Groq chat completion in a thread‑pool to keep the event loop non‑blocking."""
-    tokens = max_tokens or settings.GROQ_MAX_TOKENS
+async def _complete(
+    messages: List[Dict[str, str]], *, endpoint: str, max_tokens: int, temperature: float = 0.7
+) -> str:
+    """
+    One governed, non-streaming Groq chat completion. Identical concurrent
+    requests (same rendered messages and model parameters) share one call.
+    """
+    params = {"model": settings.GROQ_MODEL, "max_tokens": max_tokens, "temperature": temperature}
+    key = "ai:" + hashlib.sha256(
+        json.dumps([params, messages], sort_keys=True, ensure_ascii=False).encode()
+    ).hexdigest()
+
+    async def call() -> str:
+        async with ai_governor.slot(endpoint):
+            with GroqCall(endpoint, "complete") as timing:
+                resp = await get_client().chat.completions.create(messages=messages, **params)
+                timing.usage = resp.usage
+        return resp.choices[0].message.content or ""
+
+    try:
+        return await single_flight.do(key, call)
+    except LeaderFailedError as e:
+        # Another worker's identical call was shed; so is this one (503, not 500)
+        if e.kind == AIOverloadedError.__name__:
+            raise AIOverloadedError(e.detail) from e
+        raise
+
+
+async def _call_groq(
+    prompt: str, *, endpoint: str, max_tokens: Optional[int] = None, system: str = JYOTISH_SYSTEM_PROMPT
+) -> str:
+    """Groq chat completion with the Jyotish system prompt (or `system`)."""
     messages = [
-        {"role": "system", "content": JYOTISH_SYSTEM_PROMPT},
+        {"role": "system", "content": system},
         {"role": "user", "content": prompt},
     ]
+    return await _complete(
+        messages, endpoint=endpoint, max_tokens=max_tokens or settings.GROQ_MAX_TOKENS
+    )
 
-    def _sync_call() -> str:
-        resp = client.chat.completions.create(
-            model=settings.GROQ_MODEL,
-            max_tokens=tokens,
-            temperature=0.7,
-            messages=messages,
-        )
-        return resp.choices[0].message.content or ""
 
-    return await asyncio.to_thread(_sync_call)
+# ── Streaming ────────────────────────────────────────────────────────────────
+# Streamed endpoints yield (event, data) pairs: "open" once the AI slot is held,
+# "field" per completed top-level JSON field, "token" per chat text delta, then
+# "done" with the full result.
+async def _stream_groq(
+    messages: List[Dict[str, str]], *, endpoint: str, max_tokens: int, temperature: float = 0.7
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    "open" as soon as the governor slot is acquired, then a "delta" per content
+    delta of a streamed Groq chat completion (holds its slot until done).
+    """
+    async with ai_governor.slot(endpoint):
+        yield "open", {}
+        with GroqCall(endpoint, "stream") as timing:
+            stream = await get_client().chat.completions.create(
+                model=settings.GROQ_MODEL,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=messages,
+                stream=True,
+            )
+            async for chunk in stream:
+                # Groq reports token usage on the final chunk
+                usage = chunk.usage or (chunk.x_groq.usage if chunk.x_groq else None)
+                if usage is not None:
+                    timing.usage = usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield "delta", chunk.choices[0].delta.content
+
+
+class JsonFieldStream:
+    """
+    Incremental scanner over a streamed JSON object. `feed` returns the
+    top-level (key, value) pairs completed by the new text; anything before
+    the opening brace (e.g. a markdown fence) is skipped.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._member_start: Optional[int] = None
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, delta: str) -> List[Tuple[str, Any]]:
+        self.text += delta
+        fields: List[Tuple[str, Any]] = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif self._member_start is None:
+                if ch == "{" and self._depth == 0:
+                    self._depth = 1
+                    self._member_start = i + 1
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    fields += self._member(self._member_start, i)
+                    self._member_start = len(text) + 1   # object closed; ignore the rest
+                    self._pos = len(text)
+                    return fields
+            elif ch == "," and self._depth == 1:
+                fields += self._member(self._member_start, i)
+                self._member_start = i + 1
+        self._pos = len(text)
+        return fields
+
+    def _member(self, start: int, end: int) -> List[Tuple[str, Any]]:
+        member = self.text[start:end].strip()
+        if not member:
+            return []
+        return list(json.loads("{" + member + "}").items())
+
+    def result(self) -> Dict[str, Any]:
+        return _parse_json(self.text)
+
+
+async def _stream_json(
+    prompt: str, *, endpoint: str, max_tokens: int, system: str = JYOTISH_SYSTEM_PROMPT
+) -> AsyncIterator[Tuple[str, Any]]:
+    messages = [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt},
+    ]
+    fields = JsonFieldStream()
+    async for event, delta in _stream_groq(messages, endpoint=endpoint, max_tokens=max_tokens):
+        if event == "open":
+            yield event, delta
+            continue
+        for key, value in fields.feed(delta):
+            yield "field", {"key": key, "value": value}
+    yield "done", fields.result()
 
 
 # ── Horoscope ────────────────────────────────────────────────────────────────
-async def generate_ai_horoscope(
+def _horoscope_prompt(
     rashi: str,
     rashi_english: str,
     period_type: str,
     date_context: str,
     current_transits: List[Dict[str, Any]],
     current_dasha: Optional[str] = None,
-) -> Dict[str, Any]:
-    """Return a JSON horoscope for the supplied parameters."""
+) -> str:
     transit_lines = [
-        f"- {t['planet']} in {t['sign']} at {t.get('deg', '?')}°"
-        f"{' (Retrograde)' if t.get('retro') else ''}: {t.get('effect', '')}"
-        for t in current_transits[:5]
+        f"- {t['planet']} in {t['rashi']} ({t['sign']}) at {t['degree']}°, {t['nakshatra']}"
+        f"{' (Retrograde)' if t['is_retrograde'] else ''}"
+        for t in current_transits
     ]
     transit_text = "\n".join(transit_lines)
 
@@ -124,13 +283,42 @@ Respond ONLY with this JSON (no other text):
   "remedy": "one specific Vedic remedy for this period",
   "mantra": "Sanskrit mantra with transliteration"
 }}"""
-    raw = await _call_groq(prompt, max_tokens=1024)
+    return prompt
+
+
+async def generate_ai_horoscope(
+    rashi: str,
+    rashi_english: str,
+    period_type: str,
+    date_context: str,
+    current_transits: List[Dict[str, Any]],
+    current_dasha: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Return a JSON horoscope for the supplied parameters."""
+    prompt = _horoscope_prompt(
+        rashi, rashi_english, period_type, date_context, current_transits, current_dasha
+    )
+    raw = await _call_groq(prompt, endpoint="horoscope", max_tokens=1024)
     return _parse_json(raw)
 
 
+def stream_ai_horoscope(
+    rashi: str,
+    rashi_english: str,
+    period_type: str,
+    date_context: str,
+    current_transits: List[Dict[str, Any]],
+    current_dasha: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming variant: each top-level field as it completes, then the whole reading."""
+    prompt = _horoscope_prompt(
+        rashi, rashi_english, period_type, date_context, current_transits, current_dasha
+    )
+    return _stream_json(prompt, endpoint="horoscope", max_tokens=1024)
+
+
 # ── Kundli Reading ───────────────────────────────────────────────────────────
-async def generate_kundli_reading(kundli_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Return a comprehensive Vedic Kundli analysis in JSON."""
+def _kundli_reading_prompt(kundli_data: Dict[str, Any]) -> str:
     planets_text = "\n".join(
         f"- {name}: {p['rashi']} ({p['rashi_symbol']}), House {p['house']}, "
         f"{p['degree_in_rashi']:.1f}°, Nakshatra: {p['nakshatra']} Pada {p['nakshatra_pada']}"
@@ -180,17 +368,28 @@ Respond ONLY with this JSON (no other text):
   "lucky_period": "best upcoming time period",
   "power_planet": "the strongest planet in this chart"
 }}"""
-    raw = await _call_groq(prompt, max_tokens=2048)
+    return prompt
+
+
+async def generate_kundli_reading(kundli_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a comprehensive Vedic Kundli analysis in JSON."""
+    prompt = _kundli_reading_prompt(kundli_data)
+    raw = await _call_groq(prompt, endpoint="kundli_reading", max_tokens=2048)
     return _parse_json(raw)
 
 
+def stream_kundli_reading(kundli_data: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming variant: each top-level field as it completes, then the whole reading."""
+    prompt = _kundli_reading_prompt(kundli_data)
+    return _stream_json(prompt, endpoint="kundli_reading", max_tokens=2048)
+
+
 # ── Compatibility ───────────────────────────────────────────────────────────
-async def generate_compatibility_reading(
+def _compatibility_prompt(
     person1: Dict[str, Any],
     person2: Dict[str, Any],
     score: int,
-) -> Dict[str, Any]:
-    """Return a Vedic Kundli Milan (compatibility) analysis in JSON."""
+) -> str:
     prompt = f"""Perform a Vedic Kundli Milan (compatibility analysis) for this couple:
 
 PERSON 1:
@@ -227,18 +426,37 @@ Respond ONLY with this JSON (no other text):
 }}
 
 For verdict use exactly one of: Highly Compatible | Compatible | Moderately Compatible | Needs Work"""
-    raw = await _call_groq(prompt, max_tokens=1500)
+    return prompt
+
+
+async def generate_compatibility_reading(
+    person1: Dict[str, Any],
+    person2: Dict[str, Any],
+    score: int,
+) -> Dict[str, Any]:
+    """Return a Vedic Kundli Milan (compatibility) analysis in JSON."""
+    prompt = _compatibility_prompt(person1, person2, score)
+    raw = await _call_groq(prompt, endpoint="compatibility", max_tokens=1500)
     return _parse_json(raw)
 
 
+def stream_compatibility_reading(
+    person1: Dict[str, Any],
+    person2: Dict[str, Any],
+    score: int,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming variant: each top-level field as it completes, then the whole reading."""
+    prompt = _compatibility_prompt(person1, person2, score)
+    return _stream_json(prompt, endpoint="compatibility", max_tokens=1500)
+
+
 # ── Dasha Reading ───────────────────────────────────────────────────────────
-async def generate_dasha_reading(
+def _dasha_prompt(
     kundli_data: Dict[str, Any],
     current_dasha: str,
     next_dasha: str,
     dasha_end_date: str,
-) -> Dict[str, Any]:
-    """Return a Vimshottari Dasha period analysis in JSON."""
+) -> str:
     prompt = f"""Analyze the current Vimshottari Dasha period for:
 
 Name: {kundli_data.get('name', 'Native')}
@@ -266,16 +484,41 @@ Respond ONLY with this JSON (no other text):
   ],
   "overall_message": "2-sentence inspiring summary for this period"
 }}"""
-    raw = await _call_groq(prompt, max_tokens=1200)
+    return prompt
+
+
+async def generate_dasha_reading(
+    kundli_data: Dict[str, Any],
+    current_dasha: str,
+    next_dasha: str,
+    dasha_end_date: str,
+) -> Dict[str, Any]:
+    """Return a Vimshottari Dasha period analysis in JSON."""
+    prompt = _dasha_prompt(kundli_data, current_dasha, next_dasha, dasha_end_date)
+    raw = await _call_groq(prompt, endpoint="dasha", max_tokens=1200)
     return _parse_json(raw)
 
 
+def stream_dasha_reading(
+    kundli_data: Dict[str, Any],
+    current_dasha: str,
+    next_dasha: str,
+    dasha_end_date: str,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming variant: each top-level field as it completes, then the whole reading."""
+    prompt = _dasha_prompt(kundli_data, current_dasha, next_dasha, dasha_end_date)
+    return _stream_json(prompt, endpoint="dasha", max_tokens=1200)
+
+
 # ── Chat ─────────────────────────────────────────────────────────────────────
-async def chat_with_astrologer(
+CHAT_GREETING = "Namaste 🙏 Please ask your question and I will illuminate your path."
+
+
+def _chat_messages(
     messages: List[Dict[str, str]],
     user_context: Optional[Dict[str, str]] = None,
-) -> str:
-    """Conversational chat – returns plain‑text response (no JSON)."""
+) -> Optional[List[Dict[str, str]]]:
+    """Groq messages for a chat turn, or None when there is no user message yet."""
     context_note = ""
     if user_context:
         context_note = (
@@ -300,63 +543,148 @@ async def chat_with_astrologer(
         filtered = filtered[1:]
 
     if not filtered:
-        return "Namaste 🙏 Please ask your question and I will illuminate your path."
+        return None
+    return [{"role": "system", "content": chat_system}] + filtered
 
-    groq_messages = [{"role": "system", "content": chat_system}] + filtered
 
-    def _sync_call() -> str:
-        resp = client.chat.completions.create(
-            model=settings.GROQ_MODEL,
-            max_tokens=800,
-            temperature=0.75,
-            messages=groq_messages,
-        )
-        return resp.choices[0].message.content or ""
+async def chat_with_astrologer(
+    messages: List[Dict[str, str]],
+    user_context: Optional[Dict[str, str]] = None,
+) -> str:
+    """Conversational chat – returns plain‑text response (no JSON)."""
+    groq_messages = _chat_messages(messages, user_context)
+    if groq_messages is None:
+        return CHAT_GREETING
+    return await _complete(groq_messages, endpoint="chat", max_tokens=800, temperature=0.75)
+
 
-    return await asyncio.to_thread(_sync_call)
+async def stream_chat_with_astrologer(
+    messages: List[Dict[str, str]],
+    user_context: Optional[Dict[str, str]] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming chat: a "token" event per text delta, then the full response."""
+    groq_messages = _chat_messages(messages, user_context)
+    if groq_messages is None:
+        yield "token", {"text": CHAT_GREETING}
+        yield "done", {"response": CHAT_GREETING}
+        return
+
+    parts = []
+    async for event, delta in _stream_groq(
+        groq_messages, endpoint="chat", max_tokens=800, temperature=0.75
+    ):
+        if event == "open":
+            yield event, delta
+            continue
+        parts.append(delta)
+        yield "token", {"text": delta}
+    yield "done", {"response": "".join(parts)}
 
 
 # ── Muhurta ───────────────────────────────────────────────────────────────────
-async def generate_muhurta(
+# The windows come from app.services.muhurta; the model only narrates them, so
+# it gets a short system prompt and a small token budget.
+MUHURTA_SYSTEM_PROMPT = """You are a Vedic astrologer explaining Muhurta windows that have already been
+calculated from the Panchang. Never change, add or invent dates, times, tithis or nakshatras.
+Respond with valid JSON only, no markdown fences. Never mention that you are an AI."""
+
+
+def muhurta_summary(windows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The reading's factual fields, read straight off the ranked windows."""
+    if not windows:
+        return {"best_days": [], "best_tithis": [], "favorable_nakshatras": [], "ideal_time": ""}
+    best = windows[0]
+    return {
+        "best_days": list(dict.fromkeys(f"{w['date']} ({w['vara']})" for w in windows)),
+        "best_tithis": list(dict.fromkeys(w["tithi"] for w in windows)),
+        "favorable_nakshatras": list(dict.fromkeys(w["nakshatra"] for w in windows)),
+        "ideal_time": (
+            f"{best['start'][11:16]}–{best['end'][11:16]} on {best['date']} ({best['vara']}), "
+            f"{best['tithi']} in {best['nakshatra']} with {best['lagna']} rising"
+        ),
+    }
+
+
+NO_MUHURTA = {
+    "avoid": "Rahu Kalam, Yamaganda, Vishti karana and the Rikta tithis.",
+    "ritual": "",
+    "mantras": [],
+    "general_guidance": "No window in this month meets the rules for this event; consider the following month.",
+}
+
+
+def _muhurta_prompt(
     event_type: str,
-    preferred_month: str,
+    windows: List[Dict[str, Any]],
     kundli_data: Optional[Dict[str, Any]] = None,
-) -> Dict[str, Any]:
-    """Return auspicious Muhurta timing in JSON."""
+) -> str:
     chart_ctx = ""
     if kundli_data:
         chart_ctx = (
-            f"Person's Ascendant: {kundli_data.get('ascendant_rashi')}, "
+            f"\nAscendant: {kundli_data.get('ascendant_rashi')}, "
             f"Moon Sign: {kundli_data.get('moon_sign')}"
         )
+    lines = "\n".join(
+        f"- {w['date']} {w['vara']} {w['start'][11:16]}–{w['end'][11:16]}: {w['tithi']}, "
+        f"{w['nakshatra']}, {w['lagna']} lagna (score {w['score']:g})"
+        for w in windows[:5]
+    )
 
-    prompt = f"""Select the most auspicious Muhurta (timing) for:
-
-Event: {event_type}
-Preferred Month: {preferred_month}
-{chart_ctx}
+    prompt = f"""Event: {event_type}{chart_ctx}
+Calculated Muhurta windows, best first:
+{lines}
 
-Respond ONLY with this JSON (no other text):
+Respond ONLY with this JSON:
 {{
-  "best_days": ["Monday", "Thursday"],
-  "best_tithis": ["Panchami", "Dashami"],
-  "favorable_nakshatras": ["Rohini", "Pushya", "Uttara Phalguni"],
-  "avoid": "what times, days, or conditions to strictly avoid",
-  "ideal_time": "best time of day with explanation",
-  "ritual": "brief ritual to maximize the chosen timing",
-  "mantras": ["mantra 1", "mantra 2"],
-  "general_guidance": "2-3 sentences of overall Muhurta guidance for this event"
+  "general_guidance": "2-3 sentences on why these windows suit the event",
+  "avoid": "what to avoid around these windows",
+  "ritual": "brief ritual for the chosen window",
+  "mantras": ["mantra 1", "mantra 2"]
 }}"""
-    raw = await _call_groq(prompt, max_tokens=800)
-    return _parse_json(raw)
+    return prompt
+
+
+async def generate_muhurta(
+    event_type: str,
+    windows: List[Dict[str, Any]],
+    kundli_data: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Narrate precomputed Muhurta windows; no Groq call when there are none."""
+    if not windows:
+        return {**muhurta_summary(windows), **NO_MUHURTA}
+    prompt = _muhurta_prompt(event_type, windows, kundli_data)
+    raw = await _call_groq(prompt, endpoint="muhurta", max_tokens=400, system=MUHURTA_SYSTEM_PROMPT)
+    return {**muhurta_summary(windows), **_parse_json(raw)}
+
+
+async def stream_muhurta(
+    event_type: str,
+    windows: List[Dict[str, Any]],
+    kundli_data: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming variant: the calculated fields first, then each narrated field, then the whole reading."""
+    summary = muhurta_summary(windows)
+    if not windows:
+        for key, value in summary.items():
+            yield "field", {"key": key, "value": value}
+        for key, value in NO_MUHURTA.items():
+            yield "field", {"key": key, "value": value}
+        yield "done", {**summary, **NO_MUHURTA}
+        return
+    prompt = _muhurta_prompt(event_type, windows, kundli_data)
+    reading = _stream_json(prompt, endpoint="muhurta", max_tokens=400, system=MUHURTA_SYSTEM_PROMPT)
+    yield await reading.__anext__()         # "open": the AI slot is held
+    for key, value in summary.items():
+        yield "field", {"key": key, "value": value}
+    async for event, data in reading:
+        yield event, {**summary, **data} if event == "done" else data
 
 
 # ── Yearly Prediction ────────────────────────────────────────────────────────
-async def generate_yearly_prediction(
+def _yearly_prompt(
     kundli_data: Dict[str, Any],
     year: int,
-) -> Dict[str, Any]:
-    """Return a Varshphal (annual) prediction in JSON."""
+) -> str:
     prompt = f"""Generate a detailed annual Varshphal prediction for {year}:
 
 Name: {kundli_data.get('name', 'Native')}
@@ -393,5 +721,23 @@ Respond ONLY with this JSON (no other text):
   "annual_mantra": "Sanskrit mantra for the year",
   "annual_remedy": "one key remedy to practice throughout {year}"
 }}"""
-    raw = await _call_groq(prompt, max_tokens=2000)
-    return _parse_json(raw)
\ No newline at end of file
+    return prompt
+
+
+async def generate_yearly_prediction(
+    kundli_data: Dict[str, Any],
+    year: int,
+) -> Dict[str, Any]:
+    """Return a Varshphal (annual) prediction in JSON."""
+    prompt = _yearly_prompt(kundli_data, year)
+    raw = await _call_groq(prompt, endpoint="yearly", max_tokens=2000)
+    return _parse_json(raw)
+
+
+def stream_yearly_prediction(
+    kundli_data: Dict[str, Any],
+    year: int,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming variant: each top-level field as it completes, then the whole reading."""
+    prompt = _yearly_prompt(kundli_data, year)
+    return _stream_json(prompt, endpoint="yearly", max_tokens=2000)
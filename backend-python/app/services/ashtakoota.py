@@ -0,0 +1,247 @@
+"""
+Ashtakoota (Guna Milan) Engine
+All eight kootas depend only on the two Moons' nakshatra padas, so each is
+precomputed once as a 108×108 table (groom pada × bride pada). Scoring a pair
+is one lookup per koota and scoring a profile against N candidates is a single
+NumPy gather over the summed table.
+"""
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+from app.services.astrology_engine import NAKSHATRAS, RASHIS, KundliData
+
+KOOTAS = ("varna", "vashya", "tara", "yoni", "graha_maitri", "gana", "bhakoot", "nadi")
+MAX_POINTS = (1, 2, 3, 4, 5, 6, 7, 8)
+MAX_SCORE = sum(MAX_POINTS)
+PADAS = 108
+PADA_SPAN = 360 / PADAS
+MANGLIK_HOUSES = (1, 2, 4, 7, 8, 12)
+
+# ── Per-rashi attributes ───────────────────────────────────────────────────
+# Varna rank: Shudra 0 < Vaishya 1 < Kshatriya 2 < Brahmin 3
+RASHI_VARNA = (2, 1, 0, 3, 2, 1, 0, 3, 2, 1, 0, 3)
+RASHI_LORD = ("Mars", "Venus", "Mercury", "Moon", "Sun", "Mercury",
+              "Venus", "Mars", "Jupiter", "Saturn", "Saturn", "Jupiter")
+
+# Vashya groups: Chatushpada, Manava, Jalachara, Vanachara, Keeta
+CHATUSHPADA, MANAVA, JALACHARA, VANACHARA, KEETA = range(5)
+RASHI_VASHYA = (CHATUSHPADA, CHATUSHPADA, MANAVA, JALACHARA, VANACHARA, MANAVA,
+                MANAVA, KEETA, MANAVA, CHATUSHPADA, MANAVA, JALACHARA)
+# Dhanu is Manava then Chatushpada, Makara is Chatushpada then Jalachara,
+# split at 15° (pada 4 of the sign, which straddles it, goes to the first half)
+VASHYA_SECOND_HALF = {8: CHATUSHPADA, 9: JALACHARA}
+
+VASHYA_POINTS = np.array([
+    [2, 1, 1, 0.5, 1],
+    [1, 2, 0.5, 0, 1],
+    [1, 0.5, 2, 1, 1],
+    [0.5, 0, 1, 2, 0],
+    [1, 1, 1, 0, 2],
+], dtype=np.float32)
+
+# ── Per-nakshatra attributes ───────────────────────────────────────────────
+YONIS = ("Horse", "Elephant", "Sheep", "Serpent", "Dog", "Cat", "Rat",
+         "Cow", "Buffalo", "Tiger", "Deer", "Monkey", "Mongoose", "Lion")
+NAKSHATRA_YONI = (0, 1, 2, 3, 3, 4, 5, 2, 5, 6, 6, 7, 8, 9,
+                  8, 9, 10, 10, 4, 11, 12, 11, 13, 0, 13, 7, 1)
+YONI_POINTS = np.array([
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4],
+], dtype=np.float32)
+
+# Gana: Deva 0, Manushya 1, Rakshasa 2
+NAKSHATRA_GANA = (0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2,
+                  0, 2, 0, 2, 2, 1, 1, 0, 2, 2, 1, 1, 0)
+GANA_POINTS = np.array([      # groom row, bride column
+    [6, 6, 1],
+    [5, 6, 0],
+    [1, 0, 6],
+], dtype=np.float32)
+
+# Nadi runs Adi, Madhya, Antya, Antya, Madhya, Adi, … through the nakshatras
+NAKSHATRA_NADI = tuple((0, 1, 2, 2, 1, 0)[i % 6] for i in range(27))
+
+# ── Graha Maitri ───────────────────────────────────────────────────────────
+FRIENDS = {
+    "Sun": {"Moon", "Mars", "Jupiter"},
+    "Moon": {"Sun", "Mercury"},
+    "Mars": {"Sun", "Moon", "Jupiter"},
+    "Mercury": {"Sun", "Venus"},
+    "Jupiter": {"Sun", "Moon", "Mars"},
+    "Venus": {"Mercury", "Saturn"},
+    "Saturn": {"Mercury", "Venus"},
+}
+ENEMIES = {
+    "Sun": {"Venus", "Saturn"},
+    "Moon": set(),
+    "Mars": {"Mercury"},
+    "Mercury": {"Moon"},
+    "Jupiter": {"Mercury", "Venus"},
+    "Venus": {"Sun", "Moon"},
+    "Saturn": {"Sun", "Moon", "Mars"},
+}
+# Points by the two one-way relationships (friend 2, neutral 1, enemy 0), sorted
+_MAITRI_POINTS = {(2, 2): 5, (1, 2): 4, (1, 1): 3, (0, 2): 1, (0, 1): 0.5, (0, 0): 0}
+
+
+def _relation(a: str, b: str) -> int:
+    if a == b or b in FRIENDS[a]:
+        return 2
+    return 0 if b in ENEMIES[a] else 1
+
+
+def _maitri(lord1: str, lord2: str) -> float:
+    return _MAITRI_POINTS[tuple(sorted((_relation(lord1, lord2), _relation(lord2, lord1))))]
+
+
+# ── Tables ─────────────────────────────────────────────────────────────────
+def _build_tables() -> np.ndarray:
+    pada = np.arange(PADAS)
+    nak, rashi = pada // 4, pada // 9
+    vashya = np.array([
+        VASHYA_SECOND_HALF.get(r, RASHI_VASHYA[r]) if p % 9 > 4 else RASHI_VASHYA[r]
+        for p, r in zip(pada, rashi)
+    ])
+    varna = np.array(RASHI_VARNA)[rashi]
+    yoni = np.array(NAKSHATRA_YONI)[nak]
+    gana = np.array(NAKSHATRA_GANA)[nak]
+    nadi = np.array(NAKSHATRA_NADI)[nak]
+    maitri = np.array([[_maitri(a, b) for b in RASHI_LORD] for a in RASHI_LORD], dtype=np.float32)
+
+    g, b = np.ix_(pada, pada)               # groom rows, bride columns
+    tables = np.zeros((len(KOOTAS), PADAS, PADAS), dtype=np.float32)
+    tables[0] = varna[g] >= varna[b]
+    tables[1] = VASHYA_POINTS[vashya[g], vashya[b]]
+
+    # Tara: count each way (inclusive); remainders 3, 5 and 7 (of 9) are inauspicious
+    def auspicious(frm, to):
+        return ~np.isin(((to - frm) % 27 + 1) % 9, (3, 5, 7))
+    tables[2] = 1.5 * auspicious(nak[b], nak[g]) + 1.5 * auspicious(nak[g], nak[b])
+
+    tables[3] = YONI_POINTS[yoni[g], yoni[b]]
+    tables[4] = maitri[rashi[g], rashi[b]]
+    tables[5] = GANA_POINTS[gana[g], gana[b]]
+    # Bhakoot: 2/12, 5/9 and 6/8 placements (counted from the bride) carry dosha
+    tables[6] = 7 * ~np.isin((rashi[g] - rashi[b]) % 12 + 1, (2, 12, 5, 9, 6, 8))
+    tables[7] = 8 * (nadi[g] != nadi[b])
+    tables.setflags(write=False)
+    return tables
+
+
+KOOTA_TABLES = _build_tables()                  # (8, 108, 108) float32
+TOTAL_TABLE = KOOTA_TABLES.sum(axis=0)          # (108, 108)
+TOTAL_TABLE.setflags(write=False)
+
+
+def pada_index(moon_longitude: float) -> int:
+    """0–107: nakshatra × 4 + pada of a sidereal Moon longitude."""
+    return int(moon_longitude % 360 / PADA_SPAN)
+
+
+def pada_indices(moon_longitudes: Sequence[float]) -> np.ndarray:
+    lon = np.asarray(moon_longitudes, dtype=np.float64) % 360
+    return np.minimum((lon / PADA_SPAN).astype(np.intp), PADAS - 1)
+
+
+def is_manglik(kundli_data: KundliData) -> bool:
+    """Kuja dosha: Mars in the 1st, 2nd, 4th, 7th, 8th or 12th house from the Lagna."""
+    return kundli_data.planets["Mars"].house in MANGLIK_HOUSES
+
+
+def recommendation(score: float) -> str:
+    return "Excellent" if score >= 30 else "Good" if score >= 24 else "Average" if score >= 18 else "Challenging"
+
+
+def _result(kootas: Sequence[float]) -> Dict[str, Any]:
+    total = float(sum(kootas))
+    return {
+        "total_score": round(total, 1),
+        "max_score": MAX_SCORE,
+        "percentage": round(total / MAX_SCORE * 100),
+        "recommendation": recommendation(total),
+        "kootas": {
+            name: {"score": round(float(score), 2), "max": points}
+            for name, score, points in zip(KOOTAS, kootas, MAX_POINTS)
+        },
+        "nadi_dosha": bool(kootas[7] == 0),
+        "bhakoot_dosha": bool(kootas[6] == 0),
+    }
+
+
+def _describe(pada: int) -> Dict[str, Any]:
+    return {"rashi": RASHIS[pada // 9], "nakshatra": NAKSHATRAS[pada // 4], "pada": pada % 4 + 1}
+
+
+# ── Matching ───────────────────────────────────────────────────────────────
+def breakdown(groom_pada: int, bride_pada: int) -> Dict[str, Any]:
+    """Total, recommendation and per-koota scores for one couple."""
+    return _result(KOOTA_TABLES[:, groom_pada, bride_pada])
+
+
+def match(groom_pada: int, bride_pada: int) -> Dict[str, Any]:
+    """Full 36-point breakdown for one couple."""
+    return {
+        "groom": _describe(groom_pada),
+        "bride": _describe(bride_pada),
+        **breakdown(groom_pada, bride_pada),
+    }
+
+
+def rashi_match(groom_rashi: int, bride_rashi: int) -> Dict[str, Any]:
+    """
+    Score from Moon signs alone (0-based). Varna, Vashya, Graha Maitri and
+    Bhakoot are exact; the nakshatra kootas are averaged over the nine padas
+    of each sign.
+    """
+    g, b = slice(9 * groom_rashi, 9 * groom_rashi + 9), slice(9 * bride_rashi, 9 * bride_rashi + 9)
+    return _result(KOOTA_TABLES[:, g, b].mean(axis=(1, 2)))
+
+
+def bulk_match(
+    pada: int, candidate_padas: np.ndarray, role: str = "groom",
+    top_k: int = 10, min_score: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Score one chart (as `role`) against every candidate with a single gather,
+    then break down only the top `top_k` at or above `min_score`.
+    """
+    if role == "groom":
+        totals = TOTAL_TABLE[pada, candidate_padas]
+    else:
+        totals = TOTAL_TABLE[candidate_padas, pada]
+
+    eligible = np.flatnonzero(totals >= min_score)
+    k = min(top_k, len(eligible))
+    if k < len(eligible):
+        eligible = eligible[np.argpartition(-totals[eligible], k - 1)[:k]]
+    # Highest score first; ties keep candidate order
+    ranked = eligible[np.lexsort((eligible, -totals[eligible]))]
+
+    if role == "groom":
+        breakdown = KOOTA_TABLES[:, pada, candidate_padas[ranked]]
+    else:
+        breakdown = KOOTA_TABLES[:, candidate_padas[ranked], pada]
+
+    return {
+        "count": len(candidate_padas),
+        "eligible": int((totals >= min_score).sum()),
+        "mean_score": round(float(totals.mean()), 2) if len(totals) else None,
+        "top": [
+            {"index": int(i), **_describe(int(candidate_padas[i])), **_result(breakdown[:, n])}
+            for n, i in enumerate(ranked)
+        ],
+    }
@@ -4,13 +4,17 @@ Calculates planetary positions, houses, dashas, nakshatras using Ephem + Swiss E
 """
 
 import ephem
+import itertools
 import math
-from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from datetime import datetime, date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
 import pytz
-from geopy.geocoders import Nominatim
-from timezonefinder import TimezoneFinder
+
+from app.core.metrics import stage
+from app.services.ephemeris_table import EphemerisTable, get_ephemeris_table
+from app.services.gazetteer import lookup_place, timezone_at
 
 
 # ── Constants ──────────────────────────────────────────────────────────────
@@ -23,6 +27,11 @@ RASHIS = [
     "Dhanu", "Makara", "Kumbha", "Meena"
 ]
 
+RASHIS_ENGLISH = [
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
+]
+
 RASHI_SYMBOLS = ["♈","♉","♊","♋","♌","♍","♎","♏","♐","♑","♒","♓"]
 
 NAKSHATRAS = [
@@ -49,46 +58,219 @@ DASHA_YEARS = {
 
 DASHA_ORDER = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
 
+# Navagraha in chart order: (name, sanskrit, symbol)
+GRAHAS = [
+    ("Sun",     "Surya",   "☉"),
+    ("Moon",    "Chandra", "☽"),
+    ("Mars",    "Mangal",  "♂"),
+    ("Mercury", "Budha",   "☿"),
+    ("Jupiter", "Guru",    "♃"),
+    ("Venus",   "Shukra",  "♀"),
+    ("Saturn",  "Shani",   "♄"),
+    ("Rahu",    "Rahu",    "☊"),
+    ("Ketu",    "Ketu",    "☋"),
+]
+GRAHA_INDEX = {name: i for i, (name, _, _) in enumerate(GRAHAS)}
+
+# PyEphem bodies for the seven visible grahas, in GRAHAS order
+EPHEM_BODIES = [ephem.Sun, ephem.Moon, ephem.Mars, ephem.Mercury,
+                ephem.Jupiter, ephem.Venus, ephem.Saturn]
+
+NAKSHATRA_SPAN = 360 / 27  # 13.333...°
+OBLIQUITY_RAD = math.radians(23.4397)  # approximate
+
+
+# ── Chart record ───────────────────────────────────────────────────────────
+# KundliData.longitudes layout: ayanamsa, sidereal ascendant, then the nine
+# grahas' tropical and sidereal longitudes (GRAHAS order)
+AYANAMSA_FIELD = 0
+ASCENDANT_FIELD = 1
+TROPICAL_FIELDS = slice(2, 11)
+SIDEREAL_FIELDS = slice(11, 20)
+CHART_FIELDS = 20
+
+
+def _nakshatra_index(sidereal_longitude: float) -> int:
+    return min(int(sidereal_longitude / NAKSHATRA_SPAN), 26)
+
+
+def _nakshatra_pada(sidereal_longitude: float) -> int:
+    return min(int(sidereal_longitude % NAKSHATRA_SPAN / (NAKSHATRA_SPAN / 4)) + 1, 4)
+
 
-@dataclass
 class PlanetPosition:
-    name: str
-    sanskrit: str
-    symbol: str
-    longitude: float        # 0–360 tropical
-    sidereal_longitude: float  # After ayanamsa correction
-    rashi_index: int
-    rashi: str
-    rashi_symbol: str
-    degree_in_rashi: float
-    nakshatra: str
-    nakshatra_pada: int
-    is_retrograde: bool
-    house: int
-
-
-@dataclass
+    """One graha of a KundliData; every field is derived from the chart's longitudes."""
+
+    __slots__ = ("_chart", "_index")
+
+    def __init__(self, chart: "KundliData", index: int):
+        self._chart = chart
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return GRAHAS[self._index][0]
+
+    @property
+    def sanskrit(self) -> str:
+        return GRAHAS[self._index][1]
+
+    @property
+    def symbol(self) -> str:
+        return GRAHAS[self._index][2]
+
+    @property
+    def longitude(self) -> float:
+        """0–360 tropical"""
+        return self._chart.longitudes.item(TROPICAL_FIELDS.start + self._index)
+
+    @property
+    def sidereal_longitude(self) -> float:
+        """After ayanamsa correction"""
+        return self._chart.longitudes.item(SIDEREAL_FIELDS.start + self._index)
+
+    @property
+    def rashi_index(self) -> int:
+        return int(self.sidereal_longitude / 30)
+
+    @property
+    def rashi(self) -> str:
+        return RASHIS[self.rashi_index]
+
+    @property
+    def rashi_symbol(self) -> str:
+        return RASHI_SYMBOLS[self.rashi_index]
+
+    @property
+    def degree_in_rashi(self) -> float:
+        return self.sidereal_longitude % 30
+
+    @property
+    def nakshatra(self) -> str:
+        return NAKSHATRAS[_nakshatra_index(self.sidereal_longitude)]
+
+    @property
+    def nakshatra_pada(self) -> int:
+        return _nakshatra_pada(self.sidereal_longitude)
+
+    @property
+    def is_retrograde(self) -> bool:
+        return self._index >= GRAHA_INDEX["Rahu"]      # the nodes are always retrograde
+
+    @property
+    def house(self) -> int:
+        """Whole sign system"""
+        return (self.rashi_index - self._chart.ascendant_index) % 12 + 1
+
+    def __repr__(self) -> str:
+        return f"PlanetPosition({self.name}, {self.sidereal_longitude:.4f})"
+
+
 class KundliData:
-    ascendant_longitude: float
-    ascendant_rashi: str
-    ascendant_degree: float
-    moon_sign: str
-    sun_sign: str
-    nakshatra: str
-    nakshatra_pada: int
-    nakshatra_lord: str
-    planets: Dict[str, PlanetPosition]
-    houses: List[Dict]
-    yogas: List[str]
-    ayanamsa: float
+    """
+    A birth chart as one read-only float64 vector (layout above) plus the
+    detected yogas as a bitmask over YOGAS. Rashis, nakshatras, houses and
+    all names are materialized on access, so a chart held in a cache or a
+    batch costs a few hundred bytes rather than dozens of objects.
+    """
+
+    __slots__ = ("longitudes", "yoga_mask")
+
+    def __init__(self, longitudes: np.ndarray, yoga_mask: int):
+        self.longitudes = longitudes
+        self.yoga_mask = yoga_mask
+
+    @property
+    def ayanamsa(self) -> float:
+        return self.longitudes.item(AYANAMSA_FIELD)
+
+    @property
+    def ascendant_longitude(self) -> float:
+        return self.longitudes.item(ASCENDANT_FIELD)
+
+    @property
+    def ascendant_index(self) -> int:
+        return int(self.ascendant_longitude / 30)
+
+    @property
+    def ascendant_rashi(self) -> str:
+        return RASHIS[self.ascendant_index]
+
+    @property
+    def ascendant_degree(self) -> float:
+        return self.ascendant_longitude % 30
+
+    @property
+    def planets(self) -> Dict[str, PlanetPosition]:
+        return {name: PlanetPosition(self, i) for i, (name, _, _) in enumerate(GRAHAS)}
+
+    def planet(self, name: str) -> PlanetPosition:
+        return PlanetPosition(self, GRAHA_INDEX[name])
+
+    @property
+    def moon_sign(self) -> str:
+        return self.planet("Moon").rashi
+
+    @property
+    def sun_sign(self) -> str:
+        return self.planet("Sun").rashi
+
+    @property
+    def nakshatra(self) -> str:
+        return NAKSHATRAS[_nakshatra_index(self.planet("Moon").sidereal_longitude)]
+
+    @property
+    def nakshatra_pada(self) -> int:
+        return _nakshatra_pada(self.planet("Moon").sidereal_longitude)
+
+    @property
+    def nakshatra_lord(self) -> str:
+        return NAKSHATRA_LORDS[_nakshatra_index(self.planet("Moon").sidereal_longitude)]
+
+    @property
+    def houses(self) -> List[Dict]:
+        return build_houses(self.ascendant_index, [p.house for p in self.planets.values()])
+
+    @property
+    def yogas(self) -> List[str]:
+        return yogas_from_mask(self.yoga_mask)
+
+    def __repr__(self) -> str:
+        return f"KundliData(ascendant={self.ascendant_rashi}, moon={self.moon_sign}, yogas={self.yoga_mask:#x})"
+
+
+def build_houses(asc_rashi_idx: int, planet_houses: Sequence[int]) -> List[Dict]:
+    """Whole-sign houses with their occupants, given each graha's house (GRAHAS order)."""
+    houses = []
+    for i in range(12):
+        h_rashi_idx = (asc_rashi_idx + i) % 12
+        houses.append({
+            "house": i + 1,
+            "rashi": RASHIS[h_rashi_idx],
+            "rashi_symbol": RASHI_SYMBOLS[h_rashi_idx],
+            "start_degree": h_rashi_idx * 30.0,
+            "planets": [
+                GRAHAS[j][0] for j, h in enumerate(planet_houses) if h == i + 1
+            ],
+            "significance": HOUSE_SIGNIFICANCE.get(i + 1, "")
+        })
+    return houses
+
+
+def yogas_from_mask(mask: int) -> List[str]:
+    return [text for i, text in enumerate(YOGAS) if mask >> i & 1]
 
 
 class AstrologyEngine:
 
-    def __init__(self, ayanamsa: str = "lahiri"):
+    def __init__(self, ayanamsa: str = "lahiri", use_ephemeris_table: bool = True):
         self.ayanamsa = ayanamsa
-        self.geolocator = Nominatim(user_agent="jyotish_darshan")
-        self.tf = TimezoneFinder()
+        self.use_ephemeris_table = use_ephemeris_table
+
+    @property
+    def ephemeris_table(self) -> Optional[EphemerisTable]:
+        """Precomputed tables when built and enabled; dates outside them use live PyEphem."""
+        return get_ephemeris_table() if self.use_ephemeris_table else None
 
     def get_ayanamsa(self, dt: datetime) -> float:
         """Calculate Lahiri ayanamsa for given datetime."""
@@ -117,16 +299,24 @@ class AstrologyEngine:
         return NAKSHATRAS[nakshatra_idx], pada, NAKSHATRA_LORDS[nakshatra_idx]
 
     def geocode_place(self, place: str) -> Tuple[float, float, str]:
-        """Geocode a place name to lat, lon, timezone."""
-        try:
-            location = self.geolocator.geocode(place)
-            if location:
-                tz = self.tf.timezone_at(lat=location.latitude, lng=location.longitude)
-                return location.latitude, location.longitude, tz or "UTC"
-        except Exception:
-            pass
-        # Fallback: Delhi, India
-        return 28.6139, 77.2090, "Asia/Kolkata"
+        """
+        Resolve a place name to lat, lon, timezone from the offline gazetteer.
+        Raises PlaceNotFoundError for unknown places.
+        """
+        found = lookup_place(place)
+        return found.latitude, found.longitude, found.timezone
+
+    def resolve_location(
+        self, place: str, lat: Optional[float], lon: Optional[float], timezone: Optional[str]
+    ) -> Tuple[float, float, str]:
+        """Fill in whatever of lat/lon/timezone the caller did not supply."""
+        if lat is None or lon is None:
+            with stage("geocode"):
+                return self.geocode_place(place)
+        if timezone:
+            return lat, lon, timezone
+        with stage("timezone"):
+            return lat, lon, timezone_at(lat, lon) or "Asia/Kolkata"
 
     def build_observer(self, dob: date, tob_str: str, lat: float, lon: float, tz: str) -> ephem.Observer:
         """Build PyEphem observer."""
@@ -146,44 +336,42 @@ class AstrologyEngine:
         obs.epoch = ephem.J2000
         return obs
 
-    def compute_planet_position(
-        self,
-        ephem_planet,
-        name: str,
-        sanskrit: str,
-        symbol: str,
-        observer: ephem.Observer,
-        ayanamsa: float,
-        ascendant_sidereal: float,
-        previous_long: Optional[float] = None
-    ) -> PlanetPosition:
-        """Compute full position data for a planet."""
-        ephem_planet.compute(observer)
-        tropical_long = math.degrees(ephem_planet.hlong) % 360
-        sidereal_long = self.tropical_to_sidereal(tropical_long, ayanamsa)
-
-        rashi_idx, rashi_name, degree_in_rashi = self.get_rashi(sidereal_long)
-        nakshatra, pada, _ = self.get_nakshatra(sidereal_long)
-
-        # Determine retrograde
-        is_retrograde = False
-        if previous_long is not None:
-            diff = (sidereal_long - previous_long) % 360
-            is_retrograde = diff > 180
-
-        # House calculation (whole sign system)
-        asc_rashi = int(ascendant_sidereal / 30)
-        house = ((rashi_idx - asc_rashi) % 12) + 1
-
-        return PlanetPosition(
-            name=name, sanskrit=sanskrit, symbol=symbol,
-            longitude=tropical_long, sidereal_longitude=sidereal_long,
-            rashi_index=rashi_idx, rashi=rashi_name,
-            rashi_symbol=RASHI_SYMBOLS[rashi_idx],
-            degree_in_rashi=degree_in_rashi,
-            nakshatra=nakshatra, nakshatra_pada=pada,
-            is_retrograde=is_retrograde, house=house
-        )
+    def _ascendant_tropical(self, observer: ephem.Observer, lat: float) -> float:
+        """Simplified tropical ascendant from local sidereal time and latitude."""
+        lst = observer.sidereal_time()  # in radians
+        lst_deg = math.degrees(lst) % 360
+        lat_rad = math.radians(lat)
+
+        y = -math.cos(math.radians(lst_deg))
+        x = math.sin(math.radians(lst_deg)) * math.cos(OBLIQUITY_RAD) + math.tan(lat_rad) * math.sin(OBLIQUITY_RAD)
+        return math.degrees(math.atan2(y, x)) % 360
+
+    def _ephemeris_pass(
+        self, observer: ephem.Observer, lat: float, bodies: Optional[List] = None
+    ) -> Tuple[float, List[float]]:
+        """
+        Single ephemeris pass for one chart (precomputed tables, else PyEphem).
+        Returns the tropical ascendant and tropical longitudes of the seven
+        visible grahas followed by Rahu (Ketu is derived from Rahu).
+        """
+        asc_tropical = self._ascendant_tropical(observer, lat)
+        table = self.ephemeris_table
+        djd = float(observer.date)
+        if table is not None and table.covers(djd):
+            longitudes = table.longitudes(djd)
+            return asc_tropical, longitudes[:7] + [(longitudes[7] - 90) % 360]
+
+        if bodies is None:
+            bodies = [body() for body in EPHEM_BODIES]
+
+        tropical = []
+        for body in bodies:
+            body.compute(observer)
+            tropical.append(math.degrees(body.hlong) % 360)
+
+        # Rahu from the Moon computed above (bodies[1])
+        tropical.append((math.degrees(bodies[1].g_ra) - 90) % 360)
+        return asc_tropical, tropical
 
     def calculate_kundli(
         self, dob: date, tob: str, place: str,
@@ -193,232 +381,435 @@ class AstrologyEngine:
         """Main method: calculate full Vedic birth chart."""
 
         # Geocode if not provided
-        if lat is None or lon is None:
-            lat, lon, timezone = self.geocode_place(place)
+        lat, lon, timezone = self.resolve_location(place, lat, lon, timezone)
 
         dt = datetime(dob.year, dob.month, dob.day,
                       int(tob[:2]), int(tob[3:5]))
         ayanamsa = self.get_ayanamsa(dt)
-        observer = self.build_observer(dob, tob, lat, lon, timezone or "Asia/Kolkata")
+        with stage("observer"):
+            observer = self.build_observer(dob, tob, lat, lon, timezone)
+        with stage("planets"):
+            asc_tropical, tropical = self._ephemeris_pass(observer, lat)
 
-        # ── Ascendant (Lagna) ──────────────────────────────────────
-        # Compute sidereal time and ascendant
-        lst = observer.sidereal_time()  # in radians
-        lst_deg = math.degrees(lst) % 360
-        lat_rad = math.radians(lat)
-        obliquity = math.radians(23.4397)  # approximate
+        # ── Planets + Rahu / Ketu (Moon's nodes) ───────────────────
+        rahu_sidereal = self.tropical_to_sidereal(tropical[7], ayanamsa)
+        sidereal = [self.tropical_to_sidereal(t, ayanamsa) for t in tropical]
+        sidereal.append((rahu_sidereal + 180) % 360)
+        tropical = tropical + [(tropical[7] + 180) % 360]
 
-        # Simplified ascendant calculation
-        y = -math.cos(math.radians(lst_deg))
-        x = math.sin(math.radians(lst_deg)) * math.cos(obliquity) + math.tan(lat_rad) * math.sin(obliquity)
-        asc_tropical = (math.degrees(math.atan2(y, x)) % 360)
         asc_sidereal = self.tropical_to_sidereal(asc_tropical, ayanamsa)
-        asc_rashi_idx, asc_rashi, asc_degree = self.get_rashi(asc_sidereal)
-
-        # ── Planets ────────────────────────────────────────────────
-        planets_config = [
-            (ephem.Sun(),     "Sun",     "Surya",   "☉"),
-            (ephem.Moon(),    "Moon",    "Chandra", "☽"),
-            (ephem.Mars(),    "Mars",    "Mangal",  "♂"),
-            (ephem.Mercury(), "Mercury", "Budha",   "☿"),
-            (ephem.Jupiter(), "Jupiter", "Guru",    "♃"),
-            (ephem.Venus(),   "Venus",   "Shukra",  "♀"),
-            (ephem.Saturn(),  "Saturn",  "Shani",   "♄"),
-        ]
-
-        planets = {}
-        for ephem_obj, name, sanskrit, symbol in planets_config:
-            planets[name] = self.compute_planet_position(
-                ephem_obj, name, sanskrit, symbol,
-                observer, ayanamsa, asc_sidereal
-            )
+        return self.kundli_from_longitudes(ayanamsa, asc_sidereal, tropical, sidereal)
 
-        # ── Rahu / Ketu (Moon's nodes) ─────────────────────────────
-        moon = ephem.Moon()
-        moon.compute(observer)
-        rahu_tropical = (math.degrees(moon.g_ra) - 90) % 360
-        rahu_sidereal = self.tropical_to_sidereal(rahu_tropical, ayanamsa)
-        ketu_sidereal = (rahu_sidereal + 180) % 360
-
-        r_idx, r_rashi, r_deg = self.get_rashi(rahu_sidereal)
-        k_idx, k_rashi, k_deg = self.get_rashi(ketu_sidereal)
-        r_nak, r_pada, _ = self.get_nakshatra(rahu_sidereal)
-        k_nak, k_pada, _ = self.get_nakshatra(ketu_sidereal)
-        asc_rashi_for_house = int(asc_sidereal / 30)
-
-        planets["Rahu"] = PlanetPosition(
-            name="Rahu", sanskrit="Rahu", symbol="☊",
-            longitude=rahu_tropical, sidereal_longitude=rahu_sidereal,
-            rashi_index=r_idx, rashi=r_rashi, rashi_symbol=RASHI_SYMBOLS[r_idx],
-            degree_in_rashi=r_deg, nakshatra=r_nak, nakshatra_pada=r_pada,
-            is_retrograde=True, house=((r_idx - asc_rashi_for_house) % 12) + 1
-        )
-        planets["Ketu"] = PlanetPosition(
-            name="Ketu", sanskrit="Ketu", symbol="☋",
-            longitude=(rahu_tropical + 180) % 360, sidereal_longitude=ketu_sidereal,
-            rashi_index=k_idx, rashi=k_rashi, rashi_symbol=RASHI_SYMBOLS[k_idx],
-            degree_in_rashi=k_deg, nakshatra=k_nak, nakshatra_pada=k_pada,
-            is_retrograde=True, house=((k_idx - asc_rashi_for_house) % 12) + 1
-        )
+    def kundli_from_longitudes(
+        self, ayanamsa: float, asc_sidereal: float,
+        tropical: Sequence[float], sidereal: Sequence[float]
+    ) -> KundliData:
+        """
+        Assemble a KundliData from the ascendant and the nine graha longitudes
+        (GRAHAS order). Everything else in the chart is derived from these.
+        """
+        longitudes = np.empty(CHART_FIELDS)
+        longitudes[AYANAMSA_FIELD] = ayanamsa
+        longitudes[ASCENDANT_FIELD] = asc_sidereal
+        longitudes[TROPICAL_FIELDS] = tropical
+        longitudes[SIDEREAL_FIELDS] = sidereal
+        longitudes.flags.writeable = False
+        with stage("yogas"):
+            mask = self._yoga_masks(longitudes[None])[0]
+        return KundliData(longitudes, mask)
+
+    def calculate_kundli_batch(self, births: Sequence[Dict[str, Any]]) -> List[KundliData]:
+        """
+        Calculate many birth charts at once.
+
+        Each birth is a dict with the keyword arguments of `calculate_kundli`
+        (dob, tob, place, and optionally lat, lon, timezone). PyEphem runs
+        at most once per chart with shared body objects; ayanamsa, sidereal
+        conversion and yogas are computed as array operations over the whole
+        batch, as are graha longitudes when the ephemeris tables cover the
+        dates. The charts are rows of one shared array. Results match
+        `calculate_kundli`.
+        """
+        n = len(births)
+        if n == 0:
+            return []
+
+        bodies = [body() for body in EPHEM_BODIES]
+        year_frac = np.empty(n)
+        asc_tropical = np.empty(n)
+        djd = np.empty(n)
+        tropical = np.empty((n, 9))
+        observers = []
+
+        for i, birth in enumerate(births):
+            dob, tob = birth["dob"], birth["tob"]
+            lat, lon, timezone = self.resolve_location(
+                birth.get("place", ""), birth.get("lat"), birth.get("lon"), birth.get("timezone")
+            )
 
-        # ── Moon sign ──────────────────────────────────────────────
-        moon_sign = planets["Moon"].rashi
-        sun_sign = planets["Sun"].rashi
-        moon_nak, moon_pada, moon_nak_lord = self.get_nakshatra(planets["Moon"].sidereal_longitude)
-
-        # ── Houses ────────────────────────────────────────────────
-        houses = []
-        for i in range(12):
-            h_rashi_idx = (asc_rashi_idx + i) % 12
-            h_start = h_rashi_idx * 30.0
-            planets_in_house = [
-                p.name for p in planets.values() if p.house == i + 1
-            ]
-            houses.append({
-                "house": i + 1,
-                "rashi": RASHIS[h_rashi_idx],
-                "rashi_symbol": RASHI_SYMBOLS[h_rashi_idx],
-                "start_degree": h_start,
-                "planets": planets_in_house,
-                "significance": self._house_significance(i + 1)
-            })
-
-        # ── Yogas ─────────────────────────────────────────────────
-        yogas = self._detect_yogas(planets, asc_rashi_idx)
-
-        return KundliData(
-            ascendant_longitude=asc_sidereal,
-            ascendant_rashi=asc_rashi,
-            ascendant_degree=asc_degree,
-            moon_sign=moon_sign,
-            sun_sign=sun_sign,
-            nakshatra=moon_nak,
-            nakshatra_pada=moon_pada,
-            nakshatra_lord=moon_nak_lord,
-            planets=planets,
-            houses=houses,
-            yogas=yogas,
-            ayanamsa=ayanamsa
-        )
+            dt = datetime(dob.year, dob.month, dob.day, int(tob[:2]), int(tob[3:5]))
+            year_frac[i] = dt.year + (dt.timetuple().tm_yday / 365.25)
+            with stage("observer"):
+                observer = self.build_observer(dob, tob, lat, lon, timezone)
+            asc_tropical[i] = self._ascendant_tropical(observer, lat)
+            djd[i] = float(observer.date)
+            observers.append((observer, lat))
+
+        # ── Graha longitudes: one vectorised table lookup, live PyEphem for the rest ──
+        table = self.ephemeris_table
+        covered = (djd >= table.start) & (djd < table.end) if table is not None \
+            else np.zeros(n, dtype=bool)
+        with stage("planets_batch"):
+            if covered.any():
+                longitudes = table.longitudes_array(djd[covered])
+                tropical[covered, :7] = longitudes[:, :7]
+                tropical[covered, 7] = np.mod(longitudes[:, 7] - 90, 360)
+            for i in np.flatnonzero(~covered).tolist():
+                observer, lat = observers[i]
+                _, tropical[i, :8] = self._ephemeris_pass(observer, lat, bodies)
+
+        # ── Vectorised sidereal math ──────────────────────────────
+        ayanamsa = LAHIRI_AYANAMSA_2000 + (year_frac - 2000) * AYANAMSA_ANNUAL_PRECESSION
+        tropical[:, 8] = np.mod(tropical[:, 7] + 180, 360)
+
+        # One (n, CHART_FIELDS) block; each chart is a read-only row of it
+        charts = np.empty((n, CHART_FIELDS))
+        charts[:, AYANAMSA_FIELD] = ayanamsa
+        charts[:, ASCENDANT_FIELD] = np.mod(asc_tropical - ayanamsa, 360)
+        charts[:, TROPICAL_FIELDS] = tropical
+        sidereal = charts[:, SIDEREAL_FIELDS]
+        sidereal[:] = np.mod(tropical - ayanamsa[:, None], 360)
+        sidereal[:, 8] = np.mod(sidereal[:, 7] + 180, 360)
+        charts.flags.writeable = False
+
+        with stage("yogas_batch"):
+            masks = self._yoga_masks(charts)
+        return [KundliData(row, mask) for row, mask in zip(charts, masks)]
+
+    def geocentric_longitudes(self, moment: datetime) -> Tuple[List[float], List[float]]:
+        """
+        Tropical geocentric ecliptic longitudes (of date) of the nine grahas at a
+        UTC instant, with daily motion in °/day (negative = retrograde). Rahu is
+        the mean lunar node; Ketu is opposite it.
+        """
+        djd = ephem.Date(moment)
+        longitudes, speeds = [], []
+        for body_cls in EPHEM_BODIES:
+            body = body_cls()
+            before, after = (self._ecliptic_longitude(body, djd + dt) for dt in (-0.5, 0.5))
+            longitudes.append(self._ecliptic_longitude(body, djd))
+            speeds.append((after - before + 180) % 360 - 180)
+
+        # Mean node (Meeus 47.7), T in Julian centuries from J2000
+        t = (float(djd) - float(ephem.J2000)) / 36525
+        rahu = (125.0445479 - 1934.1362891 * t + 0.0020754 * t * t) % 360
+        node_speed = -1934.1362891 / 36525
+        longitudes += [rahu, (rahu + 180) % 360]
+        speeds += [node_speed, node_speed]
+        return longitudes, speeds
+
+    @staticmethod
+    def _ecliptic_longitude(body, djd: float) -> float:
+        body.compute(djd, epoch=djd)
+        return math.degrees(ephem.Ecliptic(body, epoch=djd).lon) % 360
 
     def calculate_vimshottari_dasha(
-        self, dob: date, moon_longitude: float
+        self, dob: date, moon_longitude: float, depth: int = 2
     ) -> List[Dict]:
-        """Calculate Vimshottari Dasha periods from birth."""
-        nak_span = 360 / 27
-        nak_idx = int(moon_longitude / nak_span)
-        nak_lord = NAKSHATRA_LORDS[nak_idx]
-        pos_in_nak = moon_longitude % nak_span
-        completed_fraction = pos_in_nak / nak_span
-
-        # Find starting point in dasha order
-        dasha_start_idx = DASHA_ORDER.index(nak_lord)
-        total_years_in_first = DASHA_YEARS[nak_lord]
-        elapsed_years = completed_fraction * total_years_in_first
-        remaining_years = total_years_in_first - elapsed_years
-
-        dashas = []
-        current_date = datetime(dob.year, dob.month, dob.day)
-
-        for i in range(9):
-            dasha_idx = (dasha_start_idx + i) % 9
-            planet = DASHA_ORDER[dasha_idx]
-            years = DASHA_YEARS[planet] if i > 0 else remaining_years
-
-            start = current_date
-            end = start + timedelta(days=years * 365.25)
-
-            # Antardasha breakdown
-            antardashas = []
-            ad_start = start
-            for j in range(9):
-                ad_idx = (dasha_idx + j) % 9
-                ad_planet = DASHA_ORDER[ad_idx]
-                ad_years = years * DASHA_YEARS[ad_planet] / 120
-                ad_end = ad_start + timedelta(days=ad_years * 365.25)
-                antardashas.append({
-                    "planet": ad_planet,
-                    "start_date": ad_start.date().isoformat(),
-                    "end_date": ad_end.date().isoformat(),
-                    "years": round(ad_years, 2)
-                })
-                ad_start = ad_end
-
-            dashas.append({
-                "planet": planet,
-                "start_date": start.date().isoformat(),
-                "end_date": end.date().isoformat(),
-                "years": round(years, 2),
-                "is_current": start.date() <= date.today() <= end.date(),
-                "antardashas": antardashas
-            })
-            current_date = end
-
-        return dashas
+        """Calculate Vimshottari Dasha periods from birth (mahadashas + antardashas by default)."""
+        from app.services.dasha_engine import VimshottariDasha
+        with stage("dasha"):
+            return VimshottariDasha.from_moon(dob, moon_longitude).tree(depth)
 
     def _house_significance(self, house: int) -> str:
-        meanings = {
-            1: "Self, personality, physical appearance, health",
-            2: "Wealth, family, speech, food, accumulated assets",
-            3: "Siblings, courage, communication, short journeys",
-            4: "Mother, home, happiness, property, education",
-            5: "Children, creativity, intelligence, past life merit",
-            6: "Enemies, diseases, debts, service, daily routine",
-            7: "Marriage, partnerships, business, foreign travel",
-            8: "Transformation, secrets, occult, death, inheritance",
-            9: "Fortune, dharma, father, guru, long journeys, religion",
-            10: "Career, fame, status, government, authority",
-            11: "Gains, income, friends, elder siblings, aspirations",
-            12: "Losses, expenses, liberation, foreign lands, spiritual growth"
-        }
-        return meanings.get(house, "")
-
-    def _detect_yogas(self, planets: Dict, asc_rashi: int) -> List[str]:
-        """Detect major Vedic yogas in the chart."""
-        yogas = []
-
-        # Gajakesari Yoga: Moon and Jupiter in mutual kendras (1,4,7,10)
-        moon_house = planets["Moon"].house
-        jupiter_house = planets["Jupiter"].house
-        if (jupiter_house - moon_house) % 3 == 0:
-            yogas.append("Gajakesari Yoga — Moon and Jupiter in mutual kendra: prosperity and wisdom")
-
-        # Budhaditya Yoga: Sun and Mercury conjunct
-        if planets["Sun"].rashi == planets["Mercury"].rashi:
-            yogas.append("Budhaditya Yoga — Sun and Mercury conjunct: sharp intellect and fame")
-
-        # Pancha Mahapurusha Yogas
-        mahapurusha = {
-            "Mars": "Ruchaka Yoga — Mars exalted or in own sign in kendra",
-            "Mercury": "Bhadra Yoga — Mercury exalted or in own sign in kendra",
-            "Jupiter": "Hamsa Yoga — Jupiter exalted or in own sign in kendra",
-            "Venus": "Malavya Yoga — Venus exalted or in own sign in kendra",
-            "Saturn": "Shasha Yoga — Saturn exalted or in own sign in kendra",
-        }
-        exaltation_rashis = {
-            "Sun": 0, "Moon": 1, "Mars": 9, "Mercury": 5,
-            "Jupiter": 3, "Venus": 11, "Saturn": 6
-        }
-        own_rashis = {
-            "Sun": [4], "Moon": [3], "Mars": [0, 7], "Mercury": [2, 5],
-            "Jupiter": [8, 11], "Venus": [1, 6], "Saturn": [9, 10]
-        }
-        kendras = [1, 4, 7, 10]
-
-        for planet_name, yoga_name in mahapurusha.items():
-            if planet_name in planets:
-                p = planets[planet_name]
-                in_kendra = p.house in kendras
-                exalted = p.rashi_index == exaltation_rashis.get(planet_name, -1)
-                in_own = p.rashi_index in own_rashis.get(planet_name, [])
-                if in_kendra and (exalted or in_own):
-                    yogas.append(yoga_name)
-
-        # Dhana Yoga: 2nd and 11th lord relationship
-        if not yogas:
-            yogas.append("Chart contains Subha (auspicious) planetary configurations")
-
-        return yogas
+        return HOUSE_SIGNIFICANCE.get(house, "")
+
+    def _yoga_masks(self, charts: np.ndarray) -> List[int]:
+        """Yoga bitmask (bit i = YOGAS[i]) for each row of an (n, CHART_FIELDS) array."""
+        rashi = (charts[:, SIDEREAL_FIELDS] / 30).astype(np.int64)
+        asc_rashi = (charts[:, ASCENDANT_FIELD] / 30).astype(np.int64)
+        return YOGA_RULES.masks(rashi, asc_rashi)
+
+
+HOUSE_SIGNIFICANCE = {
+    1: "Self, personality, physical appearance, health",
+    2: "Wealth, family, speech, food, accumulated assets",
+    3: "Siblings, courage, communication, short journeys",
+    4: "Mother, home, happiness, property, education",
+    5: "Children, creativity, intelligence, past life merit",
+    6: "Enemies, diseases, debts, service, daily routine",
+    7: "Marriage, partnerships, business, foreign travel",
+    8: "Transformation, secrets, occult, death, inheritance",
+    9: "Fortune, dharma, father, guru, long journeys, religion",
+    10: "Career, fame, status, government, authority",
+    11: "Gains, income, friends, elder siblings, aspirations",
+    12: "Losses, expenses, liberation, foreign lands, spiritual growth"
+}
+
+# ── Yoga rule engine ───────────────────────────────────────────────────────
+# Yogas are declared in yoga_rules.yaml and compiled once into
+#   points — columns of a per-chart (n, POINTS) matrix: the rashi of each
+#            graha, the Lagna, Aries (for absolute signs), each house lord and
+#            each graha's dispositor, plus which graha each point is;
+#   atoms  — placements, dignities, aspects and identities over points, each
+#            kind evaluated for every rule at once;
+#   gates  — threshold gates (all / any / at_least, with NOTs pushed onto the
+#            atoms), each nesting level one gather-and-count over the rows
+#            below it.
+# A batch of charts or a single one costs the same handful of array
+# operations however many yogas are declared.
+YOGA_RULES_PATH = Path(__file__).with_name("yoga_rules.yaml")
+
+RASHI_LORD = np.array([GRAHA_INDEX[p] for p in (
+    "Mars", "Venus", "Mercury", "Moon", "Sun", "Mercury",
+    "Venus", "Mars", "Jupiter", "Saturn", "Saturn", "Jupiter",
+)], dtype=np.int16)
+
+DIGNITIES = {"exalted": 1, "debilitated": 2, "own": 4, "moolatrikona": 8}
+DIGNITY = np.zeros((9, 12), dtype=np.int64)       # bits of DIGNITIES per graha and rashi
+for _graha, (_exalted, _moolatrikona) in enumerate([(0, 4), (1, 1), (9, 0), (5, 5), (3, 8), (11, 6), (6, 10)]):
+    DIGNITY[_graha, _exalted] |= DIGNITIES["exalted"]
+    DIGNITY[_graha, (_exalted + 6) % 12] |= DIGNITIES["debilitated"]
+    DIGNITY[_graha, _moolatrikona] |= DIGNITIES["moolatrikona"]
+DIGNITY[RASHI_LORD, np.arange(12)] |= DIGNITIES["own"]
+
+# Graha drishti: houses aspected, counted from the graha, as bits (house h → bit h-1)
+ASPECT_MASK = np.full(9, 1 << 6)
+for _graha, _houses in {"Mars": (4, 8), "Jupiter": (5, 9), "Saturn": (3, 10)}.items():
+    for _house in _houses:
+        ASPECT_MASK[GRAHA_INDEX[_graha]] |= 1 << (_house - 1)
+
+# Lookups indexed by a sum or difference of two rashis, so no modulo is needed
+RASHI_LORD_24 = np.tile(RASHI_LORD, 2)
+ASPECT_MASK_24 = ASPECT_MASK | ASPECT_MASK << 12
+
+POINT_LAGNA, POINT_ARIES, POINT_LORD, POINT_DISPOSITOR = 9, 10, 11, 23
+POINTS = 32
+FIXED_POINTS = np.arange(POINT_LORD, dtype=np.int16)[:, None]      # grahas, Lagna, Aries
+
+
+def _point(ref: Any, needs_graha: bool = False) -> int:
+    """Column of a planet reference: a graha, Lagna, "lord N" or "dispositor X"."""
+    words = str(ref).split()
+    if len(words) == 1 and words[0] in GRAHA_INDEX:
+        return GRAHA_INDEX[words[0]]
+    if words == ["Lagna"] and not needs_graha:
+        return POINT_LAGNA
+    if len(words) == 2 and words[0] == "lord" and words[1].isdigit() and 1 <= int(words[1]) <= 12:
+        return POINT_LORD + int(words[1]) - 1
+    if len(words) == 2 and words[0] == "dispositor" and words[1] in GRAHA_INDEX:
+        return POINT_DISPOSITOR + GRAHA_INDEX[words[1]]
+    raise ValueError(f"{ref!r} is not a {'graha' if needs_graha else 'planet'} reference")
+
+
+def _bits(values: Sequence[int], low: int, high: int) -> int:
+    mask = 0
+    for value in values:
+        if not isinstance(value, int) or not low <= value <= high:
+            raise ValueError(f"{value!r} is not in {low}..{high}")
+        mask |= 1 << (value - low)
+    return mask
+
+
+def _substitute(cond: Any, values: Dict[str, Any]) -> Any:
+    if isinstance(cond, dict):
+        return {k: _substitute(v, values) for k, v in cond.items()}
+    if isinstance(cond, list):
+        return [_substitute(c, values) for c in cond]
+    if isinstance(cond, str):
+        if cond in values:
+            return values[cond]
+        for name, value in values.items():
+            cond = cond.replace(name, str(value))
+    return cond
+
+
+class YogaRules:
+    """Yoga declarations compiled to vectorised atom and gate evaluation (see above)."""
+
+    def __init__(self, rules: Sequence[Dict[str, Any]]):
+        self.texts: List[str] = []
+        self._atoms: Dict[tuple, int] = {}
+        self._gates: Dict[Tuple[int, tuple], int] = {}
+        self._gate_list: List[Tuple[int, tuple]] = []
+        roots = []
+        for rule in rules:
+            try:
+                self.texts.append(f"{rule['name']} — {rule['description']}")
+                roots.append(self._compile(rule["when"], False))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"Yoga rule {rule.get('name', rule)!r}: {e}") from e
+        self._build(roots)
+
+    @classmethod
+    def load(cls, path: Path = YOGA_RULES_PATH) -> "YogaRules":
+        import yaml
+        with open(path, encoding="utf-8") as f:
+            return cls(yaml.safe_load(f))
+
+    # ── Compilation ───────────────────────────────────────────
+    # A compiled node is ("lit", atom, negated) or ("gate", id)
+    def _compile(self, cond: Any, negate: bool) -> tuple:
+        if isinstance(cond, list):
+            cond = {"all": cond}
+        if not isinstance(cond, dict):
+            raise ValueError(f"expected a condition, got {cond!r}")
+        if "planet" in cond:
+            return ("lit", self._atom(cond), negate)
+        if "not" in cond:
+            return self._compile(cond["not"], not negate)
+        if "for_any" in cond or "for_all" in cond:
+            combine = "any" if "for_any" in cond else "all"
+            domain = cond[f"for_{combine}"]
+            names = list(domain)
+            combos = itertools.product(*(domain[n] for n in names))
+            return self._compile({combine: [
+                _substitute(cond["where"], dict(zip(names, combo))) for combo in combos
+            ]}, negate)
+        if "all" in cond or "any" in cond:
+            children = cond.get("all", cond.get("any"))
+            return self._compile({"at_least": len(children) if "all" in cond else 1, "of": children}, negate)
+        if "at_least" in cond:
+            children, k = cond["of"], cond["at_least"]
+            if not 1 <= k <= len(children):
+                raise ValueError(f"at_least {k} of {len(children)} conditions")
+            if negate:
+                # not (at least k of n)  ==  at least n-k+1 of the negations
+                k = len(children) - k + 1
+            return self._gate(k, [self._compile(c, negate) for c in children])
+        raise ValueError(f"unknown condition {cond!r}")
+
+    def _atom(self, cond: Dict[str, Any]) -> int:
+        kinds = set(cond) - {"planet", "from"}
+        if len(kinds) != 1 or ("from" in cond and kinds != {"in"}):
+            raise ValueError(f"malformed condition {cond!r}")
+        kind = kinds.pop()
+        value = cond[kind]
+        if kind == "in":
+            key = ("place", _point(cond["planet"]), _point(cond.get("from", "Lagna")), _bits(value, 1, 12))
+        elif kind == "with":
+            key = ("place", _point(cond["planet"]), _point(value), 1)
+        elif kind == "rashi":
+            key = ("place", _point(cond["planet"]), POINT_ARIES, _bits([RASHIS.index(r) for r in value], 0, 11))
+        elif kind == "dignity":
+            mask = 0
+            for dignity in value:
+                mask |= DIGNITIES[dignity]
+            key = ("dignity", _point(cond["planet"], needs_graha=True), mask)
+        elif kind == "aspects":
+            key = ("aspect", _point(cond["planet"], needs_graha=True), _point(value))
+        elif kind == "same_as":
+            key = ("same", _point(cond["planet"], needs_graha=True), _point(value, needs_graha=True))
+        else:
+            raise ValueError(f"unknown condition {kind!r}")
+        return self._atoms.setdefault(key, len(self._atoms))
+
+    def _gate(self, threshold: int, inputs: List[tuple]) -> tuple:
+        if len(inputs) == 1:
+            return inputs[0]
+        key = (threshold, tuple(sorted(set(inputs))))
+        if len(key[1]) < len(inputs):
+            raise ValueError("repeated condition")
+        if key not in self._gates:
+            self._gates[key] = len(self._gate_list)
+            self._gate_list.append(key)
+        return ("gate", self._gates[key])
+
+    def _build(self, roots: List[tuple]) -> None:
+        """Lay out atoms by kind and gates by depth as index arrays for `flags`."""
+        n_atoms = len(self._atoms)
+        self._kinds: Dict[str, Tuple[np.ndarray, ...]] = {}
+        for kind in ("place", "dignity", "aspect", "same"):
+            entries = [(i, *key[1:]) for key, i in self._atoms.items() if key[0] == kind]
+            if entries:
+                self._kinds[kind] = tuple(np.array(column) for column in zip(*entries))
+        if "place" in self._kinds:
+            # Masks repeated over 24 bits, so an offset of -11..11 (+12) needs no modulo
+            i, p, q, mask = self._kinds["place"]
+            self._kinds["place"] = (i, p, q, (mask | mask << 12)[:, None])
+
+        # Rows: atoms, their negations, a constant 0 (padding), then gates by depth
+        depth: Dict[int, int] = {}
+
+        def depth_of(node: tuple) -> int:
+            return 0 if node[0] == "lit" else depth[node[1]]
+
+        for gate, (_, inputs) in enumerate(self._gate_list):
+            depth[gate] = 1 + max(depth_of(node) for node in inputs)
+        order = sorted(range(len(self._gate_list)), key=depth.__getitem__)
+        zero = 2 * n_atoms
+        row = {("gate", g): zero + 1 + i for i, g in enumerate(order)}
+
+        def row_of(node: tuple) -> int:
+            return node[1] + n_atoms * node[2] if node[0] == "lit" else row[node]
+
+        self._levels: List[Tuple[np.ndarray, np.ndarray]] = []
+        for _, level in itertools.groupby(order, key=depth.__getitem__):
+            gates = [self._gate_list[g] for g in level]
+            width = max(len(inputs) for _, inputs in gates)
+            if width > 255:
+                raise ValueError("a condition combines more than 255 terms")
+            inputs = np.full((len(gates), width), zero)
+            for j, (_, gate_inputs) in enumerate(gates):
+                inputs[j, :len(gate_inputs)] = [row_of(node) for node in gate_inputs]
+            thresholds = np.array([[t] for t, _ in gates], dtype=np.uint8)
+            self._levels.append((inputs, thresholds))
+        self._n_atoms = n_atoms
+        self._rows = zero + 1 + len(order)
+        self._roots = np.array([row_of(node) for node in roots], dtype=np.int64)
+
+    # ── Evaluation ────────────────────────────────────────────
+    def flags(self, rashi: np.ndarray, asc_rashi: np.ndarray) -> np.ndarray:
+        """
+        `rashi` is (n, 9) in GRAHAS order and `asc_rashi` (n,), both 0-11;
+        returns (len(texts), n) uint8 flags.
+        """
+        n = rashi.shape[0]
+        rashi = rashi.T.astype(np.int16)
+        asc_rashi = asc_rashi.astype(np.int16)
+        # Each point's rashi is a row of `sources`, which doubles as the graha
+        # of the point (Lagna and Aries are never looked up as grahas)
+        sources = np.concatenate([
+            np.broadcast_to(FIXED_POINTS, (POINT_LORD, n)),
+            RASHI_LORD_24[np.arange(12)[:, None] + asc_rashi],
+            RASHI_LORD[rashi],
+        ])
+        pos = np.concatenate([rashi, asc_rashi[None], np.zeros((1, n), dtype=np.int16)])
+        pos = np.take_along_axis(pos, sources, 0)
+        graha = sources
+
+        values = np.empty((self._rows, n), dtype=np.uint8)
+        positive = values[:self._n_atoms]
+        if "place" in self._kinds:
+            i, p, q, mask = self._kinds["place"]
+            positive[i] = (mask >> (pos[p] - pos[q] + 12)) & 1
+        if "dignity" in self._kinds:
+            i, p, mask = self._kinds["dignity"]
+            positive[i] = (DIGNITY.ravel()[graha[p] * 12 + pos[p]] & mask[:, None]) != 0
+        if "aspect" in self._kinds:
+            i, p, q = self._kinds["aspect"]
+            positive[i] = (ASPECT_MASK_24[graha[p]] >> (pos[q] - pos[p] + 12)) & 1
+        if "same" in self._kinds:
+            i, p, q = self._kinds["same"]
+            positive[i] = graha[p] == graha[q]
+        np.subtract(1, positive, out=values[self._n_atoms:2 * self._n_atoms])
+        values[2 * self._n_atoms] = 0
+
+        row = 2 * self._n_atoms + 1
+        for inputs, thresholds in self._levels:
+            counts = values[inputs].sum(axis=1, dtype=np.uint8)
+            values[row:row + len(inputs)] = counts >= thresholds
+            row += len(inputs)
+        return values[self._roots]
+
+    def masks(self, rashi: np.ndarray, asc_rashi: np.ndarray) -> List[int]:
+        """Yoga bitmask (bit i = texts[i]) per chart."""
+        packed = np.packbits(self.flags(rashi, asc_rashi), axis=0, bitorder="little").T.copy()
+        return [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+
+YOGA_RULES = YogaRules.load()
+YOGAS = YOGA_RULES.texts
 
 
 # Global engine instance
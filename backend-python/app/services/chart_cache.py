@@ -0,0 +1,172 @@
+"""
+Kundli Result Cache
+Two tiers in front of chart + dasha computation: an in-process LRU bounded
+by bytes, and Redis shared by all workers. Entries are keyed by canonical
+birth inputs and stored in a compact binary form — only the longitudes and
+dasha boundaries are kept; the rest of the chart is re-derived on read.
+"""
+
+import hashlib
+import struct
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.services.astrology_engine import DASHA_ORDER, KundliData, astrology_engine
+from app.services.dasha_engine import VimshottariDasha
+
+logger = structlog.get_logger()
+
+COORD_PRECISION = 4          # decimal places (~11 m) — charts are computed at this precision
+FORMAT_VERSION = 2
+
+_CHART = struct.Struct("<B20d")         # version, ayanamsa, ascendant, 9 tropical, 9 sidereal
+_PERIOD = struct.Struct("<BIId")        # planet index, start ordinal, end ordinal, years
+_COUNT = struct.Struct("<B")            # antardashas following each mahadasha
+
+
+def canonical_birth(
+    dob: date, tob: str, lat: float, lon: float, timezone: str
+) -> Tuple[float, float, str]:
+    """Round coordinates to the cache precision; returns (lat, lon, cache key)."""
+    lat, lon = round(lat, COORD_PRECISION), round(lon, COORD_PRECISION)
+    raw = f"{dob.isoformat()}|{tob}|{lat:.{COORD_PRECISION}f}|{lon:.{COORD_PRECISION}f}|" \
+          f"{timezone}|{astrology_engine.ayanamsa}"
+    return lat, lon, "kundli:v%d:%s" % (FORMAT_VERSION, hashlib.sha1(raw.encode()).hexdigest())
+
+
+# ── Codec ──────────────────────────────────────────────────────────────────
+def encode(kundli_data: KundliData, dashas: List[Dict]) -> bytes:
+    # Same field order as KundliData.longitudes
+    parts = [_CHART.pack(FORMAT_VERSION, *kundli_data.longitudes.tolist())]
+    for maha in dashas:
+        parts.append(_COUNT.pack(len(maha["antardashas"])))
+        for period in [maha] + maha["antardashas"]:
+            parts.append(_PERIOD.pack(
+                DASHA_ORDER.index(period["planet"]),
+                date.fromisoformat(period["start_date"]).toordinal(),
+                date.fromisoformat(period["end_date"]).toordinal(),
+                period["years"],
+            ))
+    return b"".join(parts)
+
+
+def _period(buf: bytes, offset: int) -> Dict[str, Any]:
+    planet, start, end, years = _PERIOD.unpack_from(buf, offset)
+    return {
+        "planet": DASHA_ORDER[planet],
+        "start_date": date.fromordinal(start).isoformat(),
+        "end_date": date.fromordinal(end).isoformat(),
+        "years": years,
+        "is_current": False,
+    }
+
+
+def decode(buf: bytes) -> Tuple[KundliData, List[Dict]]:
+    version, ayanamsa, asc, *longitudes = _CHART.unpack_from(buf, 0)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache entry version {version}")
+    kundli_data = astrology_engine.kundli_from_longitudes(
+        ayanamsa, asc, longitudes[:9], longitudes[9:]
+    )
+
+    dashas, offset = [], _CHART.size
+    while offset < len(buf):
+        (count,) = _COUNT.unpack_from(buf, offset)
+        offset += _COUNT.size
+        maha = _period(buf, offset)
+        offset += _PERIOD.size
+        antardashas = []
+        for _ in range(count):
+            antardashas.append(_period(buf, offset))
+            offset += _PERIOD.size
+        maha["antardashas"] = antardashas
+        dashas.append(maha)
+
+    # is_current depends on the moment, so it is always recomputed here, from
+    # the same exact boundaries as a fresh chart; the first mahadasha starts at birth
+    if dashas:
+        birth = date.fromisoformat(dashas[0]["start_date"])
+        moon = kundli_data.planets["Moon"].sidereal_longitude
+        dashas = VimshottariDasha.from_moon(birth, moon).mark_current(dashas)
+    return kundli_data, dashas
+
+
+# ── Tiers ──────────────────────────────────────────────────────────────────
+class ChartCache:
+
+    def __init__(self, max_bytes: int, ttl_seconds: int, redis_enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.redis_enabled = redis_enabled
+        self._lru: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self.hits_local = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.redis_errors = 0
+
+    def _remember(self, key: str, blob: bytes) -> None:
+        old = self._lru.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._lru[key] = blob
+        self._bytes += len(blob)
+        while self._bytes > self.max_bytes and self._lru:
+            _, evicted = self._lru.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    async def get(self, key: str) -> Optional[Tuple[KundliData, List[Dict]]]:
+        blob = self._lru.get(key)
+        if blob is not None:
+            self._lru.move_to_end(key)
+            self.hits_local += 1
+            return decode(blob)
+
+        if self.redis_enabled:
+            try:
+                blob = await get_redis().get(key)
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning("Chart cache Redis read failed", error=str(e))
+            if blob is not None:
+                self.hits_redis += 1
+                self._remember(key, blob)
+                return decode(blob)
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, kundli_data: KundliData, dashas: List[Dict]) -> None:
+        blob = encode(kundli_data, dashas)
+        self._remember(key, blob)
+        if self.redis_enabled:
+            try:
+                await get_redis().set(key, blob, ex=self.ttl_seconds)
+            except Exception as e:
+                self.redis_errors += 1
+                logger.warning("Chart cache Redis write failed", error=str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits_local + self.hits_redis + self.misses
+        return {
+            "entries": len(self._lru),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits_local": self.hits_local,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "hit_ratio": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+            "redis_errors": self.redis_errors,
+        }
+
+
+chart_cache = ChartCache(
+    max_bytes=settings.CHART_CACHE_MAX_BYTES,
+    ttl_seconds=settings.CHART_CACHE_TTL_SECONDS,
+    redis_enabled=settings.CHART_CACHE_REDIS,
+)
@@ -0,0 +1,226 @@
+"""
+Chart Computation Pool
+Runs CPU-bound AstrologyEngine work in a pre-warmed process pool so chart
+maths never stalls the event loop. Submissions are bounded: once the pool's
+workers and queue are full, new work is shed with ChartPoolOverloadedError
+(served as 503) instead of piling up latency for everyone.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import structlog
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.astrology_engine import AstrologyEngine, KundliData, astrology_engine
+from app.services.dasha_engine import LEVEL_NAMES, VimshottariDasha
+from app.services.muhurta import rank, search
+
+logger = structlog.get_logger()
+
+
+class ChartPoolOverloadedError(RuntimeError):
+    """Raised when the pool is saturated or a job exceeds its timeout."""
+
+
+# ── Worker side ────────────────────────────────────────────────────────────
+# Each worker process owns its own engine; in inline mode the shared one is used.
+_worker_engine: AstrologyEngine = astrology_engine
+
+
+def _init_worker(ayanamsa: str) -> None:
+    global _worker_engine
+    _worker_engine = AstrologyEngine(ayanamsa=ayanamsa)
+    # Warm-up: import-time tables, PyEphem and pytz caches
+    _worker_engine.calculate_kundli(
+        dob=date(2000, 1, 1), tob="12:00", place="",
+        lat=28.6139, lon=77.2090, timezone="Asia/Kolkata"
+    )
+    # From here on stage timings travel back with each result (see _run)
+    metrics.ship_stages()
+
+
+def _run(fn: Callable, *args: Any) -> Tuple[Any, List[Tuple[str, float]]]:
+    """Worker entry point: the job's result plus the engine stage timings it took."""
+    return fn(*args), metrics.shipped_stages()
+
+
+def compute_kundli(kwargs: Dict[str, Any]) -> Tuple[KundliData, List[Dict]]:
+    """Chart plus Vimshottari dasha in a single round-trip."""
+    kundli_data = _worker_engine.calculate_kundli(**kwargs)
+    dashas = _worker_engine.calculate_vimshottari_dasha(
+        dob=kwargs["dob"],
+        moon_longitude=kundli_data.planets["Moon"].sidereal_longitude
+    )
+    return kundli_data, dashas
+
+
+def compute_kundli_batch(
+    births: Sequence[Dict[str, Any]], include_dasha: bool
+) -> List[Tuple[KundliData, Optional[List[Dict]]]]:
+    charts = _worker_engine.calculate_kundli_batch(births)
+    return [
+        (kundli_data, _worker_engine.calculate_vimshottari_dasha(
+            dob=birth["dob"], moon_longitude=kundli_data.planets["Moon"].sidereal_longitude
+        ) if include_dasha else None)
+        for birth, kundli_data in zip(births, charts)
+    ]
+
+
+def compute_dasha(
+    dob: date, moon_longitude: float, depth: int,
+    start: Optional[date], end: Optional[date], at: Optional[datetime],
+) -> Dict[str, Any]:
+    with metrics.stage("dasha"):
+        dasha = VimshottariDasha.from_moon(dob, moon_longitude)
+        chain = dasha.at(at or datetime.now(), depth)
+        lords = chain[-1].lords if chain else ()
+        return {
+            "dasha_periods": dasha.tree(depth, start, end, at),
+            "current": [
+                {"level": LEVEL_NAMES[p.level - 1], **dasha.to_dict(p, lords)} for p in chain
+            ],
+        }
+
+
+def compute_muhurta(
+    lat: float, lon: float, timezone: str, start: date, count: int, event: str,
+    natal: Tuple[Optional[int], Optional[int]], limit: int,
+) -> List[Dict[str, Any]]:
+    return search(lat, lon, timezone, start, count, event, natal, limit)
+
+
+# ── Event-loop side ────────────────────────────────────────────────────────
+class ChartPool:
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        workers: int = 0,
+        queue_size: int = 64,
+        timeout: float = 10.0,
+        batch_timeout: float = 120.0,
+    ):
+        self.enabled = enabled
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers + queue_size
+        self.timeout = timeout
+        self.batch_timeout = batch_timeout
+        self.pending = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    async def start(self) -> None:
+        if not self.enabled or self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(settings.DEFAULT_AYANAMSA,),
+        )
+        # Spawn and warm every worker up front rather than on the first requests
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, os.getpid) for _ in range(self.workers)
+        ))
+        logger.info("Chart pool ready", workers=self.workers, max_pending=self.max_pending)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(self, fn: Callable, *args: Any, timeout: float) -> Any:
+        if self._executor is None:
+            return fn(*args)
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ChartPoolOverloadedError("Chart service is at capacity, please retry shortly")
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, _run, fn, *args)
+        self.pending += 1
+        # A job cannot be cancelled once a worker has it, so its slot is only
+        # released when it really finishes, timed out or not
+        future.add_done_callback(self._release)
+        try:
+            result, timings = await asyncio.wait_for(asyncio.shield(future), timeout)
+            metrics.observe_stages(timings)
+            return result
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise ChartPoolOverloadedError(f"Chart computation exceeded {timeout:g}s")
+
+    def _release(self, future: asyncio.Future) -> None:
+        self.pending -= 1
+        if not future.cancelled():
+            future.exception()          # retrieved, so an abandoned job's error is not logged as unhandled
+
+    async def kundli(self, **kwargs: Any) -> Tuple[KundliData, List[Dict]]:
+        """calculate_kundli + calculate_vimshottari_dasha for one birth."""
+        return await self._submit(compute_kundli, kwargs, timeout=self.timeout)
+
+    async def dasha(
+        self, dob: date, moon_longitude: float, depth: int = 2,
+        start: Optional[date] = None, end: Optional[date] = None,
+        at: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """Dasha tree down to `depth` within [start, end), plus the chain active at `at`."""
+        return await self._submit(
+            compute_dasha, dob, moon_longitude, depth, start, end, at, timeout=self.timeout
+        )
+
+    async def kundli_batch(
+        self, births: Sequence[Dict[str, Any]], include_dasha: bool = False
+    ) -> List[Tuple[KundliData, Optional[List[Dict]]]]:
+        """calculate_kundli_batch (+ dashas), split into one chunk per worker."""
+        size = math.ceil(len(births) / self.workers) if self._executor else len(births)
+        chunks = [list(births[i:i + size]) for i in range(0, len(births), max(size, 1))]
+        results = await asyncio.gather(*(
+            self._submit(compute_kundli_batch, chunk, include_dasha, timeout=self.batch_timeout)
+            for chunk in chunks
+        ))
+        return [item for chunk in results for item in chunk]
+
+    async def muhurta(
+        self, lat: float, lon: float, timezone: str, start: date, count: int, event: str,
+        natal: Tuple[Optional[int], Optional[int]] = (None, None), limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """Muhurta search over `count` days, split into one run of days per worker."""
+        size = math.ceil(count / self.workers) if self._executor else count
+        results = await asyncio.gather(*(
+            self._submit(
+                compute_muhurta, lat, lon, timezone, start + timedelta(days=offset),
+                min(size, count - offset), event, natal, limit, timeout=self.timeout,
+            )
+            for offset in range(0, count, max(size, 1))
+        ))
+        return rank([window for chunk in results for window in chunk], limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self._executor is not None,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+chart_pool = ChartPool(
+    enabled=settings.CHART_POOL_ENABLED,
+    workers=settings.CHART_POOL_WORKERS,
+    queue_size=settings.CHART_POOL_QUEUE_SIZE,
+    timeout=settings.CHART_TIMEOUT_SECONDS,
+    batch_timeout=settings.CHART_BATCH_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,214 @@
+"""
+Vimshottari Dasha Engine
+Every level of the Vimshottari tree splits its parent in the same 120-year
+proportions, starting from the parent's own lord. So the whole tree — down to
+prana dashas, 9^5 periods — is fixed by the mahadasha boundaries plus one
+9×10 table of cumulative offsets. Periods are expanded lazily and the active
+chain at any instant is found by bisection, one level at a time.
+"""
+
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from app.services.astrology_engine import DASHA_ORDER, DASHA_YEARS, NAKSHATRA_LORDS
+
+DAYS_PER_YEAR = 365.25
+CYCLE_YEARS = 120
+MAX_DEPTH = 5
+
+LEVEL_NAMES = ("mahadasha", "antardasha", "pratyantardasha", "sookshma", "prana")
+# Key under which a period's sub-periods are nested, by the parent's depth
+CHILD_KEYS = ("antardashas", "pratyantardashas", "sookshmadashas", "pranadashas")
+
+_YEARS = [DASHA_YEARS[planet] for planet in DASHA_ORDER]
+
+
+def _cumulative(lord: int) -> array:
+    """Fraction of a period at which each of its 9 sub-periods starts (10 entries, 0 → 1)."""
+    offsets, total = array("d", [0.0]), 0
+    for k in range(9):
+        total += _YEARS[(lord + k) % 9]
+        offsets.append(total / CYCLE_YEARS)
+    return offsets
+
+
+# _SUB_OFFSETS[lord] — cumulative offsets of the sub-periods of any period ruled by `lord`
+_SUB_OFFSETS = tuple(_cumulative(lord) for lord in range(9))
+
+
+class DashaPeriod(NamedTuple):
+    lords: Tuple[int, ...]      # DASHA_ORDER indices, mahadasha first
+    start: float                # days from the cycle epoch
+    end: float
+
+    @property
+    def level(self) -> int:
+        return len(self.lords)
+
+    @property
+    def planet(self) -> str:
+        return DASHA_ORDER[self.lords[-1]]
+
+
+class VimshottariDasha:
+    """
+    One native's Vimshottari cycle. The first mahadasha is partly spent at
+    birth, so the cycle epoch lies before birth; periods (or parts of them)
+    before birth are never reported.
+    """
+
+    def __init__(self, birth: datetime, first_lord: int, elapsed_fraction: float):
+        self.birth = birth
+        self.first_lord = first_lord
+        first_days = _YEARS[first_lord] * DAYS_PER_YEAR
+        self.epoch = birth - timedelta(days=elapsed_fraction * first_days)
+        self.birth_offset = elapsed_fraction * first_days
+        # Mahadasha boundaries, in days from the epoch (10 entries)
+        self.offsets = array("d", (x * CYCLE_YEARS * DAYS_PER_YEAR for x in _SUB_OFFSETS[first_lord]))
+
+    @classmethod
+    def from_moon(cls, birth: Union[date, datetime], moon_longitude: float) -> "VimshottariDasha":
+        """Cycle from the sidereal Moon: its nakshatra's lord rules the first mahadasha."""
+        if not isinstance(birth, datetime):
+            birth = datetime(birth.year, birth.month, birth.day)
+        nak_span = 360 / 27
+        nak_idx = int(moon_longitude % 360 / nak_span)
+        first_lord = DASHA_ORDER.index(NAKSHATRA_LORDS[nak_idx])
+        return cls(birth, first_lord, (moon_longitude % nak_span) / nak_span)
+
+    # ── Time conversion ────────────────────────────────────────────────────
+    def offset(self, moment: Union[date, datetime]) -> float:
+        if not isinstance(moment, datetime):
+            moment = datetime(moment.year, moment.month, moment.day)
+        return (moment.replace(tzinfo=None) - self.epoch) / timedelta(days=1)
+
+    def moment(self, offset: float) -> datetime:
+        return self.epoch + timedelta(days=offset)
+
+    def _window(
+        self, start: Optional[Union[date, datetime]], end: Optional[Union[date, datetime]]
+    ) -> Tuple[float, float]:
+        lo = max(self.birth_offset, self.offset(start)) if start else self.birth_offset
+        hi = min(self.offsets[-1], self.offset(end)) if end else self.offsets[-1]
+        return lo, hi
+
+    # ── Expansion ──────────────────────────────────────────────────────────
+    def mahadashas(self) -> Iterator[DashaPeriod]:
+        offsets = self.offsets
+        for k in range(9):
+            yield DashaPeriod(((self.first_lord + k) % 9,), offsets[k], offsets[k + 1])
+
+    @staticmethod
+    def children(period: DashaPeriod) -> Iterator[DashaPeriod]:
+        lord = period.lords[-1]
+        fractions, span = _SUB_OFFSETS[lord], period.end - period.start
+        for k in range(9):
+            yield DashaPeriod(
+                period.lords + ((lord + k) % 9,),
+                period.start + span * fractions[k],
+                period.start + span * fractions[k + 1],
+            )
+
+    def periods(
+        self, depth: int = 1,
+        start: Optional[Union[date, datetime]] = None,
+        end: Optional[Union[date, datetime]] = None,
+    ) -> Iterator[DashaPeriod]:
+        """Periods at `depth` overlapping [start, end), in order; other subtrees are never built."""
+        lo, hi = self._window(start, end)
+
+        def walk(periods: Iterator[DashaPeriod]) -> Iterator[DashaPeriod]:
+            for period in periods:
+                if period.end <= lo or period.start >= hi:
+                    continue
+                if period.level == depth:
+                    yield period
+                else:
+                    yield from walk(self.children(period))
+
+        return walk(self.mahadashas())
+
+    # ── Point-in-time lookup ───────────────────────────────────────────────
+    def at(self, moment: Union[date, datetime], depth: int = MAX_DEPTH) -> List[DashaPeriod]:
+        """Active chain at `moment`, mahadasha first; empty outside the cycle."""
+        t = self.offset(moment)
+        if not self.birth_offset <= t < self.offsets[-1]:
+            return []
+        k = bisect_right(self.offsets, t) - 1
+        period = DashaPeriod(((self.first_lord + k) % 9,), self.offsets[k], self.offsets[k + 1])
+        chain = [period]
+        while period.level < depth:
+            lord, span = period.lords[-1], period.end - period.start
+            fractions = _SUB_OFFSETS[lord]
+            k = min(max(bisect_right(fractions, (t - period.start) / span) - 1, 0), 8)
+            period = DashaPeriod(
+                period.lords + ((lord + k) % 9,),
+                period.start + span * fractions[k],
+                period.start + span * fractions[k + 1],
+            )
+            chain.append(period)
+        return chain
+
+    # ── Serialisation ──────────────────────────────────────────────────────
+    def to_dict(self, period: DashaPeriod, current: Tuple[int, ...] = ()) -> Dict[str, Any]:
+        start, end = max(period.start, self.birth_offset), period.end
+        start_at, end_at = self.moment(start), self.moment(end)
+        data = {
+            "planet": period.planet,
+            "start_date": start_at.date().isoformat(),
+            "end_date": end_at.date().isoformat(),
+            "years": round((end - start) / DAYS_PER_YEAR, 2),
+            "is_current": current[:period.level] == period.lords,
+        }
+        if period.level > 2:
+            # Pratyantar periods and below last weeks down to hours, so dates are not enough
+            data["start"] = start_at.isoformat(timespec="minutes")
+            data["end"] = end_at.isoformat(timespec="minutes")
+        return data
+
+    def tree(
+        self, depth: int = 2,
+        start: Optional[Union[date, datetime]] = None,
+        end: Optional[Union[date, datetime]] = None,
+        now: Optional[Union[date, datetime]] = None,
+    ) -> List[Dict]:
+        """Nested periods down to `depth` overlapping [start, end)."""
+        lo, hi = self._window(start, end)
+        chain = self.at(now or datetime.now(), depth)
+        current = chain[-1].lords if chain else ()
+
+        def build(periods: Iterator[DashaPeriod]) -> List[Dict]:
+            nodes = []
+            for period in periods:
+                if period.end <= lo or period.start >= hi:
+                    continue
+                node = self.to_dict(period, current)
+                if period.level < depth:
+                    node[CHILD_KEYS[period.level - 1]] = build(self.children(period))
+                nodes.append(node)
+            return nodes
+
+        return build(self.mahadashas())
+
+    def mark_current(self, nodes: List[Dict], now: Optional[Union[date, datetime]] = None) -> List[Dict]:
+        """
+        Copy of a serialised tree (cached or stored) with is_current set from
+        the chain active at `now`, exactly as tree() would set it.
+        """
+        chain = self.at(now or datetime.now())
+
+        def mark(nodes: List[Dict], level: int, active: bool) -> List[Dict]:
+            # A lord rules at most one period among siblings, so the planet identifies it
+            lord = chain[level].planet if active and level < len(chain) else None
+            marked = []
+            for node in nodes:
+                node = {**node, "is_current": node["planet"] == lord}
+                key = CHILD_KEYS[level] if level < len(CHILD_KEYS) else None
+                if key in node:
+                    node[key] = mark(node[key], level + 1, node["is_current"])
+                marked.append(node)
+            return marked
+
+        return mark(nodes, 0, True)
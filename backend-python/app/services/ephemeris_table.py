@@ -0,0 +1,243 @@
+"""
+Precomputed Ephemeris Tables
+Piecewise Chebyshev fits of exactly the longitudes AstrologyEngine reads from
+PyEphem (heliocentric longitude of the seven grahas and the Moon's apparent
+right ascension used for Rahu), written once to a binary file and mmap'ed at
+runtime so every uvicorn / pool worker shares the same pages copy-free.
+
+    python -m app.services.ephemeris_table build data/ephemeris.bin
+    python -m app.services.ephemeris_table report data/ephemeris.bin
+
+Longitudes are stored tropical and unwrapped; sidereal conversion stays in the
+engine so the ayanamsa model is unchanged. Speeds (°/day) come from the
+derivative of the same polynomials.
+"""
+
+import argparse
+import math
+import mmap
+import struct
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+import ephem
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from app.core.config import settings
+
+
+# ── File layout ────────────────────────────────────────────────────────────
+# header | channel table | coefficients (float64, one block per channel)
+MAGIC = b"BHEP"
+VERSION = 1
+HEADER = struct.Struct("<4sIIdd")       # magic, version, channels, start, end (Dublin JD)
+CHANNEL = struct.Struct("<16sdIIQ")     # name, segment days, degree, segments, byte offset
+
+# (channel, PyEphem body, attribute, segment length in days, polynomial degree)
+CHANNELS = [
+    ("Sun",     ephem.Sun,     "hlong", 32.0, 10),
+    ("Moon",    ephem.Moon,    "hlong", 4.0,  13),
+    ("Mars",    ephem.Mars,    "hlong", 32.0, 10),
+    ("Mercury", ephem.Mercury, "hlong", 8.0,  10),
+    ("Jupiter", ephem.Jupiter, "hlong", 32.0, 10),
+    ("Venus",   ephem.Venus,   "hlong", 16.0, 10),
+    ("Saturn",  ephem.Saturn,  "hlong", 32.0, 10),
+    ("MoonRA",  ephem.Moon,    "g_ra",  4.0,  13),
+]
+
+DEFAULT_START = float(ephem.Date("1900/01/01"))
+DEFAULT_END = float(ephem.Date("2101/01/01"))
+
+
+def _live_degrees(body, attribute: str, djd: float) -> float:
+    observer = ephem.Observer()
+    observer.pressure = 0
+    observer.epoch = ephem.J2000
+    observer.date = djd
+    body.compute(observer)
+    return math.degrees(getattr(body, attribute)) % 360
+
+
+class EphemerisTable:
+    """Read-only, mmap-backed Chebyshev tables for the engine's eight channels."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_channels, self.start, self.end = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} ephemeris table")
+
+        self.names: List[str] = []
+        self.segment_days: List[float] = []
+        self.coefficients: List[np.ndarray] = []
+        for i in range(n_channels):
+            name, seg_days, degree, segments, offset = CHANNEL.unpack_from(
+                self._mm, HEADER.size + i * CHANNEL.size
+            )
+            self.names.append(name.rstrip(b"\0").decode())
+            self.segment_days.append(seg_days)
+            self.coefficients.append(
+                np.frombuffer(self._mm, "<f8", segments * (degree + 1), offset)
+                .reshape(segments, degree + 1)
+            )
+
+    def covers(self, djd: float) -> bool:
+        return self.start <= djd < self.end
+
+    def longitudes(self, djd: float) -> List[float]:
+        """All channels at one instant (degrees, 0–360) — pure-Python Clenshaw."""
+        out = []
+        for seg_days, coef in zip(self.segment_days, self.coefficients):
+            seg, frac = divmod((djd - self.start) / seg_days, 1.0)
+            c = coef[int(seg)].tolist()
+            x2 = 2 * (2 * frac - 1)
+            b1 = b2 = 0.0
+            for ck in reversed(c[1:]):
+                b1, b2 = ck + x2 * b1 - b2, b1
+            out.append((c[0] + x2 / 2 * b1 - b2) % 360)
+        return out
+
+    def longitudes_array(self, djd: np.ndarray, derivative: bool = False) -> np.ndarray:
+        """
+        Vectorised evaluation over many instants: returns (n, channels) degrees
+        (0–360), or °/day speeds when `derivative` is set.
+        """
+        djd = np.asarray(djd, dtype=float)
+        out = np.empty((djd.size, len(self.coefficients)))
+        for j, (seg_days, coef) in enumerate(zip(self.segment_days, self.coefficients)):
+            pos = (djd - self.start) / seg_days
+            seg = np.floor(pos).astype(np.int64)
+            x = 2 * (pos - seg) - 1
+            c = coef[seg]                           # (n, degree + 1)
+            if derivative:
+                c = chebyshev.chebder(c, axis=1) * (2 / seg_days)
+            b1 = np.zeros(djd.size)
+            b2 = np.zeros(djd.size)
+            for k in range(c.shape[1] - 1, 0, -1):
+                b1, b2 = c[:, k] + 2 * x * b1 - b2, b1
+            value = c[:, 0] + x * b1 - b2
+            out[:, j] = value if derivative else np.mod(value, 360)
+        return out
+
+    def speeds(self, djd: np.ndarray) -> np.ndarray:
+        """Daily motion (°/day) of every channel."""
+        return self.longitudes_array(djd, derivative=True)
+
+
+@lru_cache(maxsize=1)
+def get_ephemeris_table() -> Optional[EphemerisTable]:
+    """Process-wide table, or None when not built (the engine then uses live PyEphem)."""
+    path = settings.EPHEMERIS_TABLE_PATH
+    if not path or not Path(path).is_file():
+        return None
+    return EphemerisTable(path)
+
+
+# ── Offline build ──────────────────────────────────────────────────────────
+def _fit_channel(body_cls, attribute: str, seg_days: float, degree: int,
+                 start: float, end: float) -> np.ndarray:
+    segments = math.ceil((end - start) / seg_days)
+    # Chebyshev points of the first kind, mapped to each segment
+    nodes = np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))[::-1]
+    body = body_cls()
+    observer = ephem.Observer()
+    observer.pressure = 0
+    observer.epoch = ephem.J2000
+
+    coefficients = np.empty((segments, degree + 1))
+    for s in range(segments):
+        seg_start = start + s * seg_days
+        samples = np.empty(degree + 1)
+        for k, x in enumerate(nodes):
+            observer.date = seg_start + (x + 1) / 2 * seg_days
+            body.compute(observer)
+            samples[k] = math.degrees(getattr(body, attribute))
+        samples = np.unwrap(samples, period=360)
+        coefficients[s] = chebyshev.chebfit(nodes, samples, degree)
+    return coefficients
+
+
+def build_table(out: str, start: float = DEFAULT_START, end: float = DEFAULT_END) -> int:
+    """Fit every channel over [start, end) and write the table. Returns the file size."""
+    blocks = [
+        (name, seg_days, degree, _fit_channel(body, attr, seg_days, degree, start, end))
+        for name, body, attr, seg_days, degree in CHANNELS
+    ]
+
+    offset = HEADER.size + CHANNEL.size * len(blocks)
+    table = []
+    for name, seg_days, degree, coef in blocks:
+        table.append(CHANNEL.pack(name.encode(), seg_days, degree, len(coef), offset))
+        offset += coef.nbytes
+
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(blocks), start, end))
+        f.writelines(table)
+        for *_, coef in blocks:
+            f.write(coef.astype("<f8").tobytes())
+    return offset
+
+
+# ── Accuracy report ────────────────────────────────────────────────────────
+def accuracy_report(table: EphemerisTable, samples: int = 20000, seed: int = 7) -> str:
+    """Compare the table with live PyEphem at random instants; markdown, arc-seconds."""
+    rng = np.random.default_rng(seed)
+    djd = rng.uniform(table.start, table.end, samples)
+    fitted = table.longitudes_array(djd)
+
+    rows = []
+    for j, (name, body_cls, attr, seg_days, degree) in enumerate(CHANNELS):
+        body = body_cls()
+        live = np.array([_live_degrees(body, attr, t) for t in djd])
+        err = np.abs((fitted[:, j] - live + 180) % 360 - 180) * 3600
+        rows.append((name, attr, seg_days, degree, err))
+
+    scalar_err = max(
+        abs((a - b + 180) % 360 - 180) * 3600
+        for t in djd[:500]
+        for a, b in zip(table.longitudes(t), table.longitudes_array(np.array([t]))[0])
+    )
+
+    lines = [
+        "| Channel | PyEphem quantity | Segment (days) | Degree | Max (″) | RMS (″) | p99 (″) |",
+        "|---------|------------------|---------------:|-------:|--------:|--------:|--------:|",
+    ]
+    for name, attr, seg_days, degree, err in rows:
+        lines.append(
+            f"| {name} | {attr} | {seg_days:g} | {degree} | {err.max():.4f} "
+            f"| {math.sqrt(np.mean(err ** 2)):.4f} | {np.percentile(err, 99):.4f} |"
+        )
+    lines.append("")
+    lines.append(f"{samples} random instants between {ephem.Date(table.start)} and "
+                 f"{ephem.Date(table.end)} UT; scalar vs vectorised evaluator max "
+                 f"difference {scalar_err:.2e}″.")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ephemeris table tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="fit and write the table (1900–2100 by default)")
+    build.add_argument("out")
+    report = sub.add_parser("report", help="accuracy against live PyEphem, in arc-seconds")
+    report.add_argument("table")
+    report.add_argument("--samples", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        started = time.perf_counter()
+        size = build_table(args.out)
+        print(f"Wrote {size / 1e6:.1f} MB to {args.out} in {time.perf_counter() - started:.1f}s")
+    else:
+        print(accuracy_report(EphemerisTable(args.table), samples=args.samples))
+
+
+if __name__ == "__main__":
+    main()
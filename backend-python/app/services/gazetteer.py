@@ -0,0 +1,369 @@
+"""
+Offline Gazetteer
+Resolves place names to coordinates and timezone from a memory-mapped index
+built from the GeoNames cities dump — no network access on the request path.
+
+Build the index once (the Docker image does this at build time):
+
+    python -m app.services.gazetteer build cities15000.txt data/gazetteer.bin \\
+        --countries countryInfo.txt
+"""
+
+import argparse
+import mmap
+import re
+import struct
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from timezonefinder import TimezoneFinder
+
+from app.core.config import settings
+
+
+# ── File layout ────────────────────────────────────────────────────────────
+# header | records | keys | trigram codes | trigram offsets | postings | strings
+MAGIC = b"BHGZ"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIIIIIIIII")  # magic, version, counts, blob sizes, section offsets
+
+RECORD_DTYPE = np.dtype([
+    ("lat", "<f4"), ("lon", "<f4"), ("population", "<u4"),
+    ("name_off", "<u4"), ("name_len", "<u2"), ("tz", "<u2"), ("country", "S2"),
+])
+KEY_DTYPE = np.dtype([("off", "<u4"), ("len", "<u2"), ("record", "<u4")])
+
+MAX_PREFIX_CANDIDATES = 256      # most populous name matches kept for the final ranking
+MIN_TRIGRAM_SCORE = 0.5
+
+
+class PlaceNotFoundError(LookupError):
+    """Raised when a place name cannot be resolved from the local gazetteer."""
+
+
+@dataclass
+class Place:
+    name: str
+    latitude: float
+    longitude: float
+    timezone: str
+    country: str
+    population: int
+
+
+# ── Normalisation ──────────────────────────────────────────────────────────
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """ASCII-fold, lowercase and collapse punctuation/whitespace."""
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return _NON_ALNUM.sub(" ", folded.lower()).strip()
+
+
+def trigrams(key: str) -> List[int]:
+    """Distinct trigram codes of a normalised key, padded at the word edges."""
+    padded = f"  {key} "
+    return sorted({
+        (ord(padded[i]) << 16) | (ord(padded[i + 1]) << 8) | ord(padded[i + 2])
+        for i in range(len(padded) - 2)
+    })
+
+
+# ── Timezones ──────────────────────────────────────────────────────────────
+@lru_cache(maxsize=1)
+def _timezone_finder() -> TimezoneFinder:
+    return TimezoneFinder()
+
+
+@lru_cache(maxsize=65536)
+def _timezone_at(lat: float, lon: float) -> Optional[str]:
+    return _timezone_finder().timezone_at(lat=lat, lng=lon)
+
+
+def timezone_at(lat: float, lon: float) -> Optional[str]:
+    """Memoised TimezoneFinder lookup (coordinates rounded to ~10 m)."""
+    return _timezone_at(round(lat, 4), round(lon, 4))
+
+
+# ── Runtime index ──────────────────────────────────────────────────────────
+class Gazetteer:
+    """Read-only view over a gazetteer file, shared copy-free via mmap."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, n_records, n_keys, n_trigrams, n_postings, tz_len, countries_len,
+         records_at, keys_at, trigrams_at, strings_at) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} gazetteer index")
+
+        buf = self._mm
+        self.records = np.frombuffer(buf, RECORD_DTYPE, n_records, records_at)
+        self.keys = np.frombuffer(buf, KEY_DTYPE, n_keys, keys_at)
+        self.trigram_codes = np.frombuffer(buf, "<u4", n_trigrams, trigrams_at)
+        offsets_at = trigrams_at + 4 * n_trigrams
+        self.trigram_offsets = np.frombuffer(buf, "<u4", n_trigrams + 1, offsets_at)
+        self.postings = np.frombuffer(buf, "<u4", n_postings, offsets_at + 4 * (n_trigrams + 1))
+        self._strings_at = strings_at
+
+        self.timezones = self._string(0, tz_len).decode().split("\n")
+        self.countries: Dict[str, str] = {}
+        for line in self._string(tz_len, countries_len).decode().splitlines():
+            code, _, name = line.partition("\t")
+            self.countries[normalize(name)] = code
+
+        # Key offsets/lengths as plain lists: bisect over them is far faster than numpy scalars
+        self._key_off = self.keys["off"].tolist()
+        self._key_len = self.keys["len"].tolist()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _string(self, off: int, length: int) -> bytes:
+        start = self._strings_at + off
+        return self._mm[start:start + length]
+
+    def _key(self, i: int) -> bytes:
+        start = self._strings_at + self._key_off[i]
+        return self._mm[start:start + self._key_len[i]]
+
+    def _bisect(self, key: bytes) -> int:
+        lo, hi = 0, len(self._key_off)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_range(self, key: bytes, exact: bool) -> Tuple[int, int]:
+        """Key ids [lo, hi) equal to `key`, or starting with it."""
+        lo = self._bisect(key)
+        # Keys are ASCII, so key + NUL sorts right after `key` itself and the
+        # successor of its last byte right after every key it prefixes
+        end = key + b"\0" if exact else key[:-1] + bytes([key[-1] + 1])
+        return lo, self._bisect(end)
+
+    def _trigram_matches(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Key ids sharing at least MIN_TRIGRAM_SCORE of the query trigrams, with their score."""
+        codes = np.array(trigrams(key), dtype="<u4")
+        pos = np.searchsorted(self.trigram_codes, codes)
+        present = pos < len(self.trigram_codes)
+        pos = pos[present][self.trigram_codes[pos[present]] == codes[present]]
+        if len(pos) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        hits = np.concatenate([
+            self.postings[self.trigram_offsets[p]:self.trigram_offsets[p + 1]] for p in pos.tolist()
+        ])
+        key_ids, counts = np.unique(hits, return_counts=True)
+        scores = counts / len(codes)
+        good = scores >= MIN_TRIGRAM_SCORE
+        return key_ids[good], scores[good]
+
+    def _place(self, idx: int) -> Place:
+        rec = self.records[idx]
+        return Place(
+            name=self._string(int(rec["name_off"]), int(rec["name_len"])).decode(),
+            latitude=float(rec["lat"]),
+            longitude=float(rec["lon"]),
+            timezone=self.timezones[int(rec["tz"])],
+            country=rec["country"].decode(),
+            population=int(rec["population"]),
+        )
+
+    def search(self, query: str, limit: int = 5) -> List[Place]:
+        """
+        Resolve a free-text place ("Varanasi", "Pune, India", "Springfield, US").
+        Candidates come from exact name/alias matches, else prefix matches,
+        else trigram similarity, and are ranked by country qualifier, match
+        score, then population.
+        """
+        parts = [normalize(p) for p in query.split(",")]
+        name = parts[0] if parts else ""
+        if not name:
+            return []
+        qualifiers = {self.countries.get(q, q.upper()) for q in parts[1:] if q}
+
+        key = name.encode()
+        lo, hi = self._prefix_range(key, exact=True)
+        if lo == hi:
+            lo, hi = self._prefix_range(key, exact=False)
+        if lo < hi:
+            key_ids, scores = np.arange(lo, hi), np.ones(hi - lo)
+        else:
+            key_ids, scores = self._trigram_matches(name)
+        if len(key_ids) == 0:
+            return []
+
+        recs = self.records[self.keys["record"][key_ids]]
+        in_country = np.isin(recs["country"], [q.encode() for q in qualifiers])
+        population = recs["population"].astype(np.int64)
+        if lo < hi and hi - lo > MAX_PREFIX_CANDIDATES:
+            # A short prefix matches a long run of keys; keep the most populous
+            # ones (country-qualified first) across all of it before sorting
+            top = np.argpartition(-((in_country.astype(np.int64) << 32) | population),
+                                  MAX_PREFIX_CANDIDATES)[:MAX_PREFIX_CANDIDATES]
+            key_ids, scores = key_ids[top], scores[top]
+            in_country, population = in_country[top], population[top]
+        order = np.lexsort((-population, -scores, ~in_country))
+
+        places, seen = [], set()
+        for i in order.tolist():
+            record = int(self.keys["record"][key_ids[i]])
+            if record not in seen:
+                seen.add(record)
+                places.append(self._place(record))
+                if len(places) == limit:
+                    break
+        return places
+
+    def lookup(self, query: str) -> Place:
+        """Best match for a place name, or PlaceNotFoundError."""
+        matches = self.search(query, limit=1)
+        if not matches:
+            raise PlaceNotFoundError(f"Place not found: {query!r}")
+        return matches[0]
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Optional[Gazetteer]:
+    """Process-wide gazetteer, or None if the index has not been built."""
+    if not Path(settings.GAZETTEER_PATH).is_file():
+        return None
+    return Gazetteer(settings.GAZETTEER_PATH)
+
+
+def lookup_place(query: str) -> Place:
+    """Resolve a place name through the process-wide gazetteer."""
+    gazetteer = get_gazetteer()
+    if gazetteer is None:
+        raise PlaceNotFoundError(
+            f"Place not found: {query!r} (gazetteer index missing at {settings.GAZETTEER_PATH})"
+        )
+    return gazetteer.lookup(query)
+
+
+# ── Offline build ──────────────────────────────────────────────────────────
+def _read_geonames(path: str) -> Iterable[Tuple[str, List[str], float, float, str, int, str]]:
+    """Yield (name, aliases, lat, lon, country, population, timezone) from a GeoNames dump."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 18:
+                continue
+            aliases = [cols[2]] + (cols[3].split(",") if cols[3] else [])
+            yield (cols[1], aliases, float(cols[4]), float(cols[5]),
+                   cols[8], int(cols[14] or 0), cols[17])
+
+
+def _read_countries(path: Optional[str]) -> List[Tuple[str, str]]:
+    """(ISO code, country name) pairs from GeoNames countryInfo.txt."""
+    if not path:
+        return []
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            cols = line.split("\t")
+            if len(cols) > 4:
+                pairs.append((cols[0], cols[4]))
+    return pairs
+
+
+def build_index(source: str, out: str, countries_path: Optional[str] = None) -> int:
+    """Build a gazetteer file from a GeoNames cities dump. Returns the record count."""
+    rows = sorted(_read_geonames(source), key=lambda r: -r[5])
+    strings = bytearray()
+    tz_names: Dict[str, int] = {}
+
+    def add_string(value: bytes) -> int:
+        off = len(strings)
+        strings.extend(value)
+        return off
+
+    countries = _read_countries(countries_path)
+    records = np.zeros(len(rows), dtype=RECORD_DTYPE)
+    key_rows: List[Tuple[bytes, int]] = []
+
+    for i, (name, aliases, lat, lon, country, population, tz) in enumerate(rows):
+        tz = tz or timezone_at(lat, lon) or "UTC"
+        tz_id = tz_names.setdefault(tz, len(tz_names))
+        records[i] = (lat, lon, population, 0, 0, tz_id, country.encode()[:2])
+        seen = set()
+        for alias in [name] + aliases:
+            key = normalize(alias)
+            if key and key not in seen and len(key) < 64:
+                seen.add(key)
+                key_rows.append((key.encode(), i))
+
+    tz_blob = "\n".join(tz_names).encode()
+    countries_blob = "\n".join(f"{code}\t{name}" for code, name in countries).encode()
+    add_string(tz_blob)
+    add_string(countries_blob)
+    for i, (name, *_rest) in enumerate(rows):
+        encoded = name.encode()
+        records[i]["name_off"] = add_string(encoded)
+        records[i]["name_len"] = len(encoded)
+
+    key_rows.sort()
+    keys = np.zeros(len(key_rows), dtype=KEY_DTYPE)
+    postings_by_trigram: Dict[int, List[int]] = {}
+    for k, (key, record) in enumerate(key_rows):
+        keys[k] = (add_string(key), len(key), record)
+        for code in trigrams(key.decode()):
+            postings_by_trigram.setdefault(code, []).append(k)
+
+    codes = np.array(sorted(postings_by_trigram), dtype="<u4")
+    offsets = np.zeros(len(codes) + 1, dtype="<u4")
+    postings = np.array(
+        [k for code in codes.tolist() for k in postings_by_trigram[code]], dtype="<u4"
+    )
+    offsets[1:] = np.cumsum([len(postings_by_trigram[c]) for c in codes.tolist()])
+
+    records_at = HEADER.size
+    keys_at = records_at + records.nbytes
+    trigrams_at = keys_at + keys.nbytes
+    strings_at = trigrams_at + codes.nbytes + offsets.nbytes + postings.nbytes
+
+    Path(out).parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records), len(keys), len(codes), len(postings),
+                            len(tz_blob), len(countries_blob),
+                            records_at, keys_at, trigrams_at, strings_at))
+        for section in (records, keys, codes, offsets, postings):
+            f.write(section.tobytes())
+        f.write(bytes(strings))
+    return len(records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline gazetteer tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="build the index from a GeoNames cities dump")
+    build.add_argument("source", help="GeoNames cities file, e.g. cities15000.txt")
+    build.add_argument("out", help="output index path")
+    build.add_argument("--countries", help="GeoNames countryInfo.txt for country-name qualifiers")
+    lookup = sub.add_parser("lookup", help="resolve a place from an index")
+    lookup.add_argument("index")
+    lookup.add_argument("query")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_index(args.source, args.out, args.countries)
+        print(f"Wrote {count} places to {args.out}")
+    else:
+        for place in Gazetteer(args.index).search(args.query):
+            print(place)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Horoscope Store
+Rashi horoscopes are a function of rashi × period × date window (× optional
+Mahadasha), so each reading is generated once, persisted to the `horoscopes`
+table and served from an in-memory snapshot of the current windows. Groq is
+only called on a miss; the nightly Celery job (app.worker) fills the store
+ahead of traffic.
+"""
+
+import asyncio
+import calendar
+import time
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import structlog
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import Horoscope
+from app.services.ai_service import generate_ai_horoscope, stream_ai_horoscope
+from app.services.astrology_engine import DASHA_ORDER, RASHIS, RASHIS_ENGLISH
+from app.services.transit_service import transit_service
+
+logger = structlog.get_logger()
+
+PERIOD_TYPES = ("daily", "weekly", "monthly", "yearly")
+
+# (rashi_id, period type, dasha) — the date window is implied by the snapshot day
+SnapshotKey = Tuple[int, str, str]
+
+
+def period_window(period_type: str, today: date) -> Tuple[date, date]:
+    """Date range a reading covers: the day, Monday–Sunday, the month or the year."""
+    if period_type == "daily":
+        return today, today
+    if period_type == "weekly":
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=6)
+    if period_type == "monthly":
+        last = calendar.monthrange(today.year, today.month)[1]
+        return today.replace(day=1), today.replace(day=last)
+    return date(today.year, 1, 1), date(today.year, 12, 31)
+
+
+def date_context(period_type: str, today: date) -> str:
+    """Human-readable period for the prompt."""
+    if period_type == "daily":
+        return today.strftime("%A, %d %B %Y")
+    elif period_type == "weekly":
+        return f"Week of {today.strftime('%d %B %Y')}"
+    elif period_type == "monthly":
+        return today.strftime("%B %Y")
+    return str(today.year)
+
+
+def dasha_lord(current_dasha: Optional[str]) -> Optional[str]:
+    """
+    The Mahadasha lord of a request ("jupiter", "Jupiter Mahadasha" → Jupiter),
+    "" for none, or None when it names no planet (such readings are not stored).
+    """
+    words = (current_dasha or "").split()
+    if not words:
+        return ""
+    lord = words[0].capitalize()
+    return lord if lord in DASHA_ORDER else None
+
+
+def _int(value: Any, low: int = 0, high: int = 100) -> Optional[int]:
+    try:
+        return max(low, min(high, int(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(value: Any, limit: int) -> Optional[str]:
+    return str(value)[:limit] if value is not None else None
+
+
+class HoroscopeStore:
+
+    def __init__(self, refresh_seconds: int = 300, pregenerate_concurrency: int = 2):
+        self.refresh_seconds = refresh_seconds
+        self.pregenerate_concurrency = pregenerate_concurrency
+        self._snapshot: Dict[SnapshotKey, Dict[str, Any]] = {}
+        self._snapshot_day: Optional[date] = None
+        self._refreshed_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._locks: Dict[SnapshotKey, asyncio.Lock] = {}
+        self._lock_users: Dict[SnapshotKey, int] = {}
+        self._version = 0          # bumped whenever the snapshot's content changes
+        self.hits = 0
+        self.db_hits = 0
+        self.generated = 0
+        self.db_errors = 0
+
+    @staticmethod
+    def rashi_id(rashi: str) -> Optional[int]:
+        name = rashi.strip().capitalize()
+        return RASHIS.index(name) + 1 if name in RASHIS else None
+
+    # ── Snapshot ───────────────────────────────────────────────────────────
+    async def refresh(self, today: Optional[date] = None) -> None:
+        """Reload every stored reading for the current daily/weekly/monthly/yearly windows."""
+        today = today or date.today()
+        windows = [
+            and_(Horoscope.type == p, Horoscope.date_from == period_window(p, today)[0])
+            for p in PERIOD_TYPES
+        ]
+        try:
+            async with AsyncSessionLocal() as session:
+                rows = (await session.execute(
+                    select(Horoscope.rashi_id, Horoscope.type, Horoscope.dasha, Horoscope.reading)
+                    .where(or_(*windows), Horoscope.reading.isnot(None))
+                )).all()
+        except Exception as e:
+            self.db_errors += 1
+            logger.warning("Horoscope snapshot refresh failed", error=str(e))
+            rows = None
+
+        self._refreshed_at = time.monotonic()
+        if rows is None and self._snapshot_day == today:
+            return      # keep serving what we have
+        snapshot = {(r.rashi_id, r.type, r.dasha): r.reading for r in rows or ()}
+        if snapshot != self._snapshot or today != self._snapshot_day:
+            self._version += 1
+        self._snapshot = snapshot
+        self._snapshot_day = today
+        logger.info("Horoscope snapshot loaded", readings=len(self._snapshot), day=str(today))
+
+    async def _ensure_fresh(self, today: date) -> None:
+        if today == self._snapshot_day and time.monotonic() - self._refreshed_at < self.refresh_seconds:
+            return
+        async with self._refresh_lock:
+            if today != self._snapshot_day or time.monotonic() - self._refreshed_at >= self.refresh_seconds:
+                await self.refresh(today)
+
+    def _put(self, key: SnapshotKey, reading: Dict[str, Any]) -> None:
+        self._snapshot[key] = reading
+        self._version += 1
+
+    async def version(self, today: Optional[date] = None) -> Tuple[Optional[date], int]:
+        """Changes whenever a reading served for `today` may have changed."""
+        await self._ensure_fresh(today or date.today())
+        return self._snapshot_day, self._version
+
+    # ── Persistence ────────────────────────────────────────────────────────
+    async def _load_one(self, key: SnapshotKey, date_from: date) -> Optional[Dict[str, Any]]:
+        rashi_id, period_type, dasha = key
+        try:
+            async with AsyncSessionLocal() as session:
+                return await session.scalar(
+                    select(Horoscope.reading).where(
+                        Horoscope.rashi_id == rashi_id, Horoscope.type == period_type,
+                        Horoscope.date_from == date_from, Horoscope.dasha == dasha,
+                    )
+                )
+        except Exception as e:
+            self.db_errors += 1
+            logger.warning("Horoscope lookup failed", error=str(e))
+            return None
+
+    async def _save(self, key: SnapshotKey, window: Tuple[date, date], reading: Dict[str, Any]) -> None:
+        rashi_id, period_type, dasha = key
+        row = {
+            "rashi_id": rashi_id, "type": period_type, "dasha": dasha,
+            "date_from": window[0], "date_to": window[1],
+            "prediction": str(reading.get("main_prediction", "")),
+            "love_prediction": _text(reading.get("love"), 10_000),
+            "career_prediction": _text(reading.get("career"), 10_000),
+            "health_prediction": _text(reading.get("health"), 10_000),
+            "love_score": _int(reading.get("love_score")),
+            "career_score": _int(reading.get("career_score")),
+            "health_score": _int(reading.get("health_score")),
+            "finance_score": _int(reading.get("finance_score")),
+            "lucky_color": _text(reading.get("lucky_color"), 100),
+            "lucky_number": _int(reading.get("lucky_number"), -10**9, 10**9),
+            "lucky_gem": _text(reading.get("lucky_gem"), 100),
+            "lucky_day": _text(reading.get("lucky_day"), 50),
+            "reading": reading,
+        }
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    insert(Horoscope).values(**row).on_conflict_do_nothing(
+                        index_elements=["rashi_id", "type", "date_from", "dasha"]
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            self.db_errors += 1
+            logger.warning("Horoscope save failed", error=str(e))
+
+    # ── Lookup ─────────────────────────────────────────────────────────────
+    @staticmethod
+    def _prompt_args(
+        rashi: str, rashi_english: str, period_type: str, current_dasha: Optional[str], today: date
+    ) -> Dict[str, Any]:
+        return dict(
+            rashi=rashi,
+            rashi_english=rashi_english,
+            period_type=period_type,
+            date_context=date_context(period_type, today),
+            current_transits=transit_service.current()["transits"],
+            current_dasha=current_dasha or None,
+        )
+
+    async def _cached(self, key: SnapshotKey, today: date) -> Optional[Dict[str, Any]]:
+        """Snapshot, then the table (another worker may have generated it since the last refresh)."""
+        await self._ensure_fresh(today)
+        reading = self._snapshot.get(key)
+        if reading is not None:
+            self.hits += 1
+            return reading
+        reading = await self._load_one(key, period_window(key[1], today)[0])
+        if reading is not None:
+            self.db_hits += 1
+            self._put(key, reading)
+        return reading
+
+    @asynccontextmanager
+    async def _generating(self, key: SnapshotKey) -> AsyncIterator[None]:
+        """
+        One generation per key at a time (get and stream alike). A key's lock
+        lives while anyone holds or awaits it, so all of them share one.
+        """
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[key] -= 1
+            if not self._lock_users[key]:
+                del self._lock_users[key], self._locks[key]
+
+    async def get(
+        self, rashi: str, rashi_english: str, period_type: str,
+        current_dasha: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Stored reading for the current window, generating and persisting it on a miss."""
+        today = date.today()
+        rashi_id = self.rashi_id(rashi)
+        dasha = dasha_lord(current_dasha)
+        if rashi_id is None or period_type not in PERIOD_TYPES or dasha is None:
+            # Not a storable reading — answer directly
+            return await generate_ai_horoscope(
+                **self._prompt_args(rashi, rashi_english, period_type, current_dasha, today)
+            )
+
+        key = (rashi_id, period_type, dasha)
+        reading = self._snapshot.get(key) if today == self._snapshot_day else None
+        if reading is not None:
+            self.hits += 1
+            return reading
+
+        # Waiters pick up the stored result
+        async with self._generating(key):
+            reading = await self._cached(key, today)
+            if reading is None:
+                reading = await generate_ai_horoscope(**self._prompt_args(
+                    RASHIS[rashi_id - 1], RASHIS_ENGLISH[rashi_id - 1], period_type, dasha, today
+                ))
+                self.generated += 1
+                self._put(key, reading)
+                await self._save(key, period_window(period_type, today), reading)
+        return reading
+
+    async def stream(
+        self, rashi: str, rashi_english: str, period_type: str,
+        current_dasha: Optional[str] = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """SSE events for a reading: replayed from the store, or streamed from Groq and stored."""
+        today = date.today()
+        rashi_id = self.rashi_id(rashi)
+        dasha = dasha_lord(current_dasha)
+        if rashi_id is None or period_type not in PERIOD_TYPES or dasha is None:
+            args = self._prompt_args(rashi, rashi_english, period_type, current_dasha, today)
+            async for event in stream_ai_horoscope(**args):
+                yield event
+            return
+
+        key = (rashi_id, period_type, dasha)
+        reading = await self._cached(key, today)
+        if reading is None:
+            # Same per-key generation as get(): a miss already being generated
+            # is waited for and replayed rather than streamed from Groq again
+            waiting = key in self._locks
+            if waiting:
+                yield "open", {}        # the wait takes no AI slot; let the response start
+            async with self._generating(key):
+                reading = await self._cached(key, today)
+                if reading is None:
+                    args = self._prompt_args(
+                        RASHIS[rashi_id - 1], RASHIS_ENGLISH[rashi_id - 1], period_type, dasha, today
+                    )
+                    async for event, data in stream_ai_horoscope(**args):
+                        if event == "open" and waiting:
+                            continue
+                        if event == "done":
+                            self.generated += 1
+                            self._put(key, data)
+                            await self._save(key, period_window(period_type, today), data)
+                        yield event, data
+                    return
+
+        for field, value in reading.items():
+            yield "field", {"key": field, "value": value}
+        yield "done", reading
+
+    # ── Pre-generation ─────────────────────────────────────────────────────
+    async def pregenerate(
+        self, today: Optional[date] = None, periods: Tuple[str, ...] = PERIOD_TYPES
+    ) -> Dict[str, int]:
+        """Make sure all 12 rashis × `periods` exist for the windows containing `today`."""
+        today = today or date.today()
+        await self.refresh(today)
+        before = self.generated
+        semaphore = asyncio.Semaphore(self.pregenerate_concurrency)
+        failed: List[str] = []
+
+        async def one(rashi_id: int, period_type: str) -> None:
+            async with semaphore:
+                try:
+                    await self.get(RASHIS[rashi_id - 1], RASHIS_ENGLISH[rashi_id - 1], period_type)
+                except Exception as e:
+                    failed.append(f"{RASHIS[rashi_id - 1]}/{period_type}")
+                    logger.warning("Horoscope pre-generation failed",
+                                   rashi=RASHIS[rashi_id - 1], period=period_type, error=str(e))
+
+        await asyncio.gather(*(one(r, p) for r in range(1, 13) for p in periods))
+        result = {"generated": self.generated - before, "failed": len(failed),
+                  "total": 12 * len(periods)}
+        logger.info("Horoscope pre-generation finished", day=str(today), **result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "snapshot_day": str(self._snapshot_day) if self._snapshot_day else None,
+            "readings": len(self._snapshot),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "generated": self.generated,
+            "db_errors": self.db_errors,
+        }
+
+
+horoscope_store = HoroscopeStore(
+    refresh_seconds=settings.HOROSCOPE_SNAPSHOT_REFRESH_SECONDS,
+    pregenerate_concurrency=settings.HOROSCOPE_PREGENERATE_CONCURRENCY,
+)
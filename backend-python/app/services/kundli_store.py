@@ -0,0 +1,294 @@
+"""
+Kundli Store
+Generated charts are persisted write-behind: the request only enqueues the
+chart, and a background task COPYs batches into `kundlis` and `dasha_periods`
+in one transaction over the engine's asyncpg pool. Reads go through a bounded
+in-process cache (which also covers charts still waiting in the queue), then
+the table. Dasha is_current flags are never stored; they are set on read.
+"""
+
+import asyncio
+import json
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import asyncpg
+import structlog
+from sqlalchemy import exc as sa_exc
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, raw_connection
+from app.models import Kundli
+from app.services.dasha_engine import CHILD_KEYS, VimshottariDasha
+from app.services.partner_search import normalize_gender
+
+logger = structlog.get_logger()
+
+KUNDLI_COLUMNS = (
+    "id", "name", "date_of_birth", "time_of_birth", "place_of_birth", "latitude", "longitude",
+    "timezone", "gender", "ascendant", "moon_sign", "sun_sign", "nakshatra", "nakshatra_pada",
+    "moon_longitude", "moon_pada", "is_manglik", "is_public",
+    "planetary_positions", "house_positions", "chart_data",
+)
+DASHA_COLUMNS = ("id", "kundli_id", "planet", "dasha_type", "start_date", "end_date", "parent_dasha_id")
+
+MAX_RETRY_SECONDS = 30.0
+
+# Failures worth retrying the same batch for; anything else means some row
+# in it will never be accepted
+TRANSIENT_ERRORS = (
+    OSError, asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError, asyncpg.InterfaceError,
+    asyncpg.exceptions.InsufficientResourcesError, asyncpg.exceptions.OperatorInterventionError,
+    asyncpg.exceptions.TransactionRollbackError,
+    sa_exc.OperationalError, sa_exc.InterfaceError, sa_exc.TimeoutError,
+)
+
+
+class PendingKundli(NamedTuple):
+    chart: Dict[str, Any]           # the KundliResponse as served
+    latitude: float
+    longitude: float
+    timezone: str
+    gender: Optional[str]
+    match: Dict[str, Any]           # partner_search.match_columns()
+    is_public: bool = False         # listed in partner search
+
+
+def _timeless(periods: List[Dict]) -> List[Dict]:
+    """Dasha periods without is_current, which is only true as of some moment."""
+    return [
+        {
+            key: _timeless(value) if key in CHILD_KEYS else value
+            for key, value in period.items() if key != "is_current"
+        }
+        for period in periods
+    ]
+
+
+def _stored(chart: Dict[str, Any]) -> Dict[str, Any]:
+    if not chart.get("dasha_periods"):
+        return chart
+    return {**chart, "dasha_periods": _timeless(chart["dasha_periods"])}
+
+
+def _as_of_now(chart: Dict[str, Any], moon_longitude: Optional[float]) -> Dict[str, Any]:
+    """A stored chart with is_current set for now, from the same boundaries as a fresh one."""
+    if not chart.get("dasha_periods"):
+        return chart
+    if moon_longitude is None:
+        moon_longitude = chart["planets"]["Moon"]["sidereal_longitude"]
+    dasha = VimshottariDasha.from_moon(date.fromisoformat(chart["date_of_birth"]), moon_longitude)
+    return {**chart, "dasha_periods": dasha.mark_current(chart["dasha_periods"])}
+
+
+def _kundli_row(item: PendingKundli) -> Tuple:
+    chart = item.chart
+    return (
+        uuid.UUID(chart["id"]), chart["name"],
+        date.fromisoformat(chart["date_of_birth"]),
+        datetime.strptime(chart["time_of_birth"], "%H:%M").time(),
+        chart["place_of_birth"],
+        Decimal(f"{item.latitude:.7f}"), Decimal(f"{item.longitude:.7f}"),
+        item.timezone, normalize_gender(item.gender),
+        chart["ascendant_rashi"], chart["moon_sign"], chart["sun_sign"],
+        chart["nakshatra"], chart["nakshatra_pada"],
+        item.match["moon_longitude"], item.match["moon_pada"], item.match["is_manglik"],
+        item.is_public,
+        json.dumps(chart["planets"]), json.dumps(chart["houses"]), json.dumps(_stored(chart)),
+    )
+
+
+def _dasha_rows(kundli_id: uuid.UUID, dashas: Optional[List[Dict]]) -> List[Tuple]:
+    rows = []
+    for maha in dashas or ():
+        maha_id = uuid.uuid4()
+        rows.append((maha_id, kundli_id, maha["planet"], "mahadasha",
+                     date.fromisoformat(maha["start_date"]), date.fromisoformat(maha["end_date"]), None))
+        for antar in maha.get("antardashas", ()):
+            rows.append((uuid.uuid4(), kundli_id, antar["planet"], "antardasha",
+                         date.fromisoformat(antar["start_date"]), date.fromisoformat(antar["end_date"]),
+                         maha_id))
+    return rows
+
+
+class KundliStore:
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        batch_size: int = 200,
+        flush_seconds: float = 0.5,
+        max_queue: int = 10_000,
+        cache_entries: int = 10_000,
+    ):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_queue = max_queue
+        self.cache_entries = cache_entries
+        # id → (chart as stored, Moon's sidereal longitude)
+        self._cache: "OrderedDict[str, Tuple[Dict[str, Any], Optional[float]]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.db_errors = 0
+        self.rejected = 0
+        self.hits = 0
+        self.db_hits = 0
+
+    # ── Lifecycle ──────────────────────────────────────────────────────────
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._stopping = False
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush what is queued (one attempt) and stop the writer."""
+        if self._task is None:
+            return
+        self._stopping = True
+
+        async def drain() -> None:
+            await self._queue.put(None)
+            await self._task
+
+        try:
+            await asyncio.wait_for(drain(), timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            logger.warning("Kundli store stopped with charts unwritten", queued=self._queue.qsize())
+        self._task = self._queue = None
+
+    # ── Cache ──────────────────────────────────────────────────────────────
+    def _remember(self, chart: Dict[str, Any], moon_longitude: Optional[float]) -> None:
+        self._cache[chart["id"]] = (_stored(chart), moon_longitude)
+        self._cache.move_to_end(chart["id"])
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+
+    # ── Write path ─────────────────────────────────────────────────────────
+    def save(self, item: PendingKundli) -> bool:
+        """Queue a chart for persistence without waiting; False if it was not queued."""
+        self._remember(item.chart, item.match["moon_longitude"])
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("Kundli store queue full, chart not persisted", id=item.chart["id"])
+            return False
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch, deadline = [item], loop.time() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+            await self._flush_with_retry(batch)
+
+    async def _flush_with_retry(self, batch: List[PendingKundli]) -> None:
+        delay = 1.0
+        while True:
+            try:
+                await self._flush(batch)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except TRANSIENT_ERRORS as e:
+                self.db_errors += 1
+                logger.warning("Kundli store write failed", charts=len(batch), error=str(e))
+                if self._stopping:
+                    self.dropped += len(batch)
+                    return
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_SECONDS)
+            except Exception as e:
+                self.db_errors += 1
+                if len(batch) == 1:
+                    self.rejected += 1
+                    logger.error("Kundli store rejected chart", id=batch[0].chart["id"], error=str(e))
+                    return
+                # Halve the batch until the offending row is on its own; the rest is written
+                half = len(batch) // 2
+                await self._flush_with_retry(batch[:half])
+                await self._flush_with_retry(batch[half:])
+                return
+
+    async def _flush(self, batch: List[PendingKundli]) -> None:
+        kundlis = [_kundli_row(item) for item in batch]
+        dashas = [
+            row for item, kundli in zip(batch, kundlis)
+            for row in _dasha_rows(kundli[0], item.chart.get("dasha_periods"))
+        ]
+        async with raw_connection() as conn:
+            async with conn.transaction():
+                await conn.copy_records_to_table("kundlis", records=kundlis, columns=KUNDLI_COLUMNS)
+                if dashas:
+                    await conn.copy_records_to_table("dasha_periods", records=dashas, columns=DASHA_COLUMNS)
+
+    # ── Read path ──────────────────────────────────────────────────────────
+    async def get(self, kundli_id: uuid.UUID) -> Optional[Dict[str, Any]]:
+        """The chart as served by /generate; None if it is not stored."""
+        key = str(kundli_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return _as_of_now(*cached)
+
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(
+                select(Kundli.chart_data, Kundli.moon_longitude).where(Kundli.id == kundli_id)
+            )).first()
+        if row is None:
+            return None
+        self.db_hits += 1
+        chart, moon_longitude = row
+        self._remember(chart, moon_longitude)
+        return _as_of_now(chart, moon_longitude)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self._task is not None,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "db_errors": self.db_errors,
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+        }
+
+
+kundli_store = KundliStore(
+    enabled=settings.KUNDLI_STORE_ENABLED,
+    batch_size=settings.KUNDLI_STORE_BATCH_SIZE,
+    flush_seconds=settings.KUNDLI_STORE_FLUSH_SECONDS,
+    max_queue=settings.KUNDLI_STORE_MAX_QUEUE,
+    cache_entries=settings.KUNDLI_CACHE_ENTRIES,
+)
@@ -0,0 +1,282 @@
+"""
+Muhurta Search
+Concrete auspicious windows for an event, scored against the event's rules
+in muhurta_rules.yaml (tithi, nakshatra, vara, lagna, and with a birth chart
+Tara and Chandra bala), with Rahu Kalam, Yamaganda and Vishti karana left
+out.
+
+Nothing is sampled at a fixed resolution: a day is cut at every instant one
+of its factors changes (limb transitions from the Panchang engine, lagna
+changes root-found on the rising point sampled every
+MUHURTA_LAGNA_STEP_MINUTES, sunrise, sunset and kalam edges), so every
+factor is constant within a piece and each piece is scored once. Adjacent
+pieces that score and read the same are merged into one window.
+"""
+
+import calendar
+import math
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pytz
+
+from app.core.config import settings
+from app.core.metrics import stage
+from app.services.astrology_engine import NAKSHATRAS, OBLIQUITY_RAD, RASHIS, RASHIS_ENGLISH
+from app.services.panchang import (
+    KALAMS, MAX_LIMB_DAYS, VARAS, ayanamsa_at, crossings, grid_cell, interpolate, karana_name,
+    local_time, panchang_engine, sun_times, tithi_name,
+)
+
+MUHURTA_RULES_PATH = Path(__file__).with_name("muhurta_rules.yaml")
+
+FACTORS = ("nakshatra", "tithi", "lagna", "vara", "paksha", "tara", "chandra")
+BAD_TARAS = (3, 5, 7)                      # Vipat, Pratyak, Naidhana
+GOOD_CHANDRA_HOUSES = (1, 3, 6, 7, 10, 11)
+VISHTI = np.array([karana_name(k) == "Vishti" for k in range(60)])
+
+
+def lagna_longitude(djd: np.ndarray, lat: float, lon: float) -> np.ndarray:
+    """Sidereal longitude of the rising point of the ecliptic at each instant (Dublin JD)."""
+    lst = np.radians(280.46061837 + 360.98564736629 * (djd - 36525.0) + lon)
+    tan_lat = math.tan(math.radians(lat))
+    rising = np.degrees(np.arctan2(
+        np.cos(lst), -(np.sin(lst) * math.cos(OBLIQUITY_RAD) + tan_lat * math.sin(OBLIQUITY_RAD))
+    ))
+    return np.mod(rising - ayanamsa_at(djd), 360)
+
+
+# ── Rules ──────────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class EventRules:
+    name: str
+    aliases: Tuple[str, ...]
+    nakshatras: np.ndarray                 # bool per nakshatra
+    tithis: np.ndarray                     # bool per tithi (0–29)
+    varas: np.ndarray                      # bool per weekday (Monday first)
+    lagnas: Optional[np.ndarray]           # bool per rashi, None = no preference
+    daytime: bool
+    require: Tuple[str, ...]
+
+
+def _mask(names: List[str], universe: List[str], kind: str) -> np.ndarray:
+    unknown = set(names) - set(universe)
+    if unknown:
+        raise ValueError(f"unknown {kind} {', '.join(sorted(unknown))}")
+    return np.isin(universe, names)
+
+
+def load_rules(path: Path = MUHURTA_RULES_PATH) -> Tuple[Dict[str, Any], Dict[str, EventRules]]:
+    import yaml
+    with open(path, encoding="utf-8") as f:
+        spec = yaml.safe_load(f)
+
+    tithis = [tithi_name(i)[0] for i in range(30)]
+    defaults = spec["defaults"]
+    defaults["avoid"] = _mask(defaults["avoid_tithis"], tithis, "tithi")
+    events = {}
+    for name, event in spec["events"].items():
+        try:
+            favourable = _mask(event["tithis"], tithis, "tithi")
+            if event.get("shukla_only"):
+                favourable[15:] = False
+            lagnas = event.get("lagnas")
+            require = tuple(event.get("require", ()))
+            if set(require) - {"nakshatra", "tithi", "vara", "lagna"} or ("lagna" in require and not lagnas):
+                raise ValueError(f"cannot require {', '.join(require)}")
+            events[name] = EventRules(
+                name=name,
+                aliases=tuple(a.lower() for a in event.get("aliases", ())),
+                nakshatras=_mask(event["nakshatras"], NAKSHATRAS, "nakshatra"),
+                tithis=favourable,
+                varas=_mask(event["varas"], VARAS, "vara"),
+                lagnas=_mask(lagnas, RASHIS, "rashi") if lagnas else None,
+                daytime=bool(event.get("daytime", False)),
+                require=require,
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Muhurta rules for {name!r}: {e}") from e
+    if "general" not in events:
+        raise ValueError("Muhurta rules need a 'general' event")
+    return defaults, events
+
+
+DEFAULTS, EVENTS = load_rules()
+
+
+def event_for(event_type: str) -> str:
+    """The rules for a free-text event ("Marriage / Wedding" → marriage), else general."""
+    text = event_type.lower()
+    for name, rules in EVENTS.items():
+        if any(re.search(rf"\b{re.escape(alias)}\b", text) for alias in rules.aliases):
+            return name
+    return "general"
+
+
+def natal_points(kundli_data: Optional[Dict[str, Any]]) -> Tuple[Optional[int], Optional[int]]:
+    """(janma nakshatra, moon rashi) indices from a chart's names, where present."""
+    kundli_data = kundli_data or {}
+    nakshatra = kundli_data.get("nakshatra")
+    moon = kundli_data.get("moon_sign")
+    return (
+        NAKSHATRAS.index(nakshatra) if nakshatra in NAKSHATRAS else None,
+        RASHIS.index(moon) if moon in RASHIS else RASHIS_ENGLISH.index(moon) if moon in RASHIS_ENGLISH else None,
+    )
+
+
+def month_span(text: str, today: date) -> Tuple[date, int]:
+    """
+    First date and day count for "2026-03", "March 2026" or "March" (its next
+    occurrence). The current month is searched from today.
+    """
+    text = text.strip()
+    for fmt in ("%Y-%m", "%B %Y", "%b %Y", "%B", "%b"):
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        year = parsed.year if "%Y" in fmt else today.year + ((parsed.month, 1) < (today.month, 1))
+        first = date(year, parsed.month, 1)
+        last = date(year, parsed.month, calendar.monthrange(year, parsed.month)[1])
+        first = max(first, today)
+        if last < first:
+            raise ValueError(f"{text} is in the past")
+        return first, (last - first).days + 1
+    raise ValueError(f'Unrecognised month {text!r}; use e.g. "2026-03" or "March 2026"')
+
+
+# ── Search ─────────────────────────────────────────────────────────────────
+def rank(windows: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """Best windows first: highest score, then longest, then earliest."""
+    return sorted(windows, key=lambda w: (-w["score"], -w["duration_minutes"], w["start"]))[:limit]
+
+
+def search(
+    lat: float, lon: float, timezone: str, start: date, count: int, event: str,
+    natal: Tuple[Optional[int], Optional[int]] = (None, None), limit: int = 10,
+) -> List[Dict[str, Any]]:
+    """The best `limit` windows for `event` over `count` local days from `start`."""
+    with stage("muhurta"):
+        rules = EVENTS[event]
+        tz = pytz.timezone(timezone)
+        cell = grid_cell(lat, lon)
+        suns = np.array([sun_times(*cell, start.toordinal() + d) for d in range(count + 1)], dtype=float)
+        bounds, sunrise, sunset = suns[:, 0], suns[:-1, 1], suns[:-1, 2]
+        first, last = bounds[0], bounds[-1]
+        weekdays = np.array([(start + timedelta(days=d)).weekday() for d in range(count)])
+
+        # Every instant a factor changes
+        times, sun, moon = panchang_engine.sample(first, last + MAX_LIMB_DAYS)
+        limbs = {limb: crossings(times, values)
+                 for limb, values in panchang_engine.limb_values(times, sun, moon).items()}
+        step = settings.MUHURTA_LAGNA_STEP_MINUTES / 1440
+        lagna_times = np.arange(first - step, last + 2 * step, step)
+        rising = np.unwrap(lagna_longitude(lagna_times, lat, lon), period=360) / 30
+        limbs["lagna"] = crossings(lagna_times, rising)
+        eighth = (sunset - sunrise) / 8
+        kalams = {
+            kalam: (sunrise + (np.take(parts, weekdays) - 1) * eighth, sunrise + np.take(parts, weekdays) * eighth)
+            for kalam, parts in KALAMS.items() if kalam in DEFAULTS["exclude"]
+        }
+        cuts = np.concatenate(
+            [bounds, sunrise, sunset] + [instants for _, instants in limbs.values()]
+            + [edge for span in kalams.values() for edge in span]
+        )
+        cuts = np.unique(cuts[(cuts >= first) & (cuts <= last)])     # NaN (no sunrise) drops out here
+
+        # Factors at the middle of each piece
+        mid = (cuts[:-1] + cuts[1:]) / 2
+        day = np.searchsorted(bounds, mid, side="right") - 1
+
+        def current(limb: str, period: int) -> np.ndarray:
+            numbers, instants = limbs[limb]
+            return (numbers[np.searchsorted(instants, mid, side="right")] - 1) % period
+
+        tithi, nakshatra, karana = current("tithi", 30), current("nakshatra", 27), current("karana", 60)
+        lagna = np.floor(interpolate(lagna_times, rising, mid)).astype(int) % 12
+        moon_rashi = (np.mod(interpolate(times, moon, mid) - ayanamsa_at(mid), 360) // 30).astype(int)
+
+        ok = ~DEFAULTS["avoid"][tithi]
+        if "vishti" in DEFAULTS["exclude"]:
+            ok &= ~VISHTI[karana]
+        for kalam_start, kalam_end in kalams.values():
+            ok &= ~((mid >= kalam_start[day]) & (mid < kalam_end[day]))
+        if rules.daytime:
+            ok &= (mid >= sunrise[day]) & (mid < sunset[day])
+
+        factors = {
+            "nakshatra": rules.nakshatras[nakshatra],
+            "tithi": rules.tithis[tithi],
+            "vara": rules.varas[weekdays[day]],
+            "paksha": tithi < 15,
+        }
+        if rules.lagnas is not None:
+            factors["lagna"] = rules.lagnas[lagna]
+        janma, natal_moon = natal
+        if janma is not None:
+            factors["tara"] = ~np.isin((nakshatra - janma) % 27 % 9 + 1, BAD_TARAS)
+        if natal_moon is not None:
+            factors["chandra"] = np.isin((moon_rashi - natal_moon) % 12 + 1, GOOD_CHANDRA_HOUSES)
+        for factor in rules.require:
+            ok &= factors[factor]
+        weights = DEFAULTS["weights"]
+        score = sum(weights[f] * held for f, held in factors.items()) * 100 / sum(weights[f] for f in factors)
+
+        # Merge neighbouring pieces that read the same
+        pieces: List[List] = []
+        for k in np.flatnonzero(ok).tolist():
+            key = (day[k], tithi[k], nakshatra[k], lagna[k], moon_rashi[k], score[k])
+            if pieces and pieces[-1][0] == key and pieces[-1][2] == cuts[k]:
+                pieces[-1][2] = cuts[k + 1]
+            else:
+                pieces.append([key, cuts[k], cuts[k + 1], k])
+
+        minimum = settings.MUHURTA_MIN_WINDOW_MINUTES / 1440
+        windows = []
+        for (d, t, n, l, _, s), begin, end, k in pieces:
+            if end - begin < minimum:
+                continue
+            name, paksha = tithi_name(int(t))
+            windows.append({
+                "date": (start + timedelta(days=int(d))).isoformat(),
+                "start": local_time(float(begin), tz),
+                "end": local_time(float(end), tz),
+                "duration_minutes": round((end - begin) * 1440),
+                "score": round(float(s), 1),
+                "vara": VARAS[weekdays[d]],
+                "tithi": f"{paksha} {name}",
+                "nakshatra": NAKSHATRAS[n],
+                "lagna": RASHIS[l],
+                "favourable": [f for f in FACTORS if f in factors and factors[f][k]],
+            })
+        return rank(windows, limit)
+
+
+async def find_muhurta(
+    event_type: str, month: str, place: str = "", lat: Optional[float] = None, lon: Optional[float] = None,
+    timezone: Optional[str] = None, kundli_data: Optional[Dict[str, Any]] = None, limit: int = 10,
+) -> Dict[str, Any]:
+    """
+    Ranked windows for a free-text event in a month, at a place (default
+    MUHURTA_DEFAULT_*), on the chart pool. Raises ValueError for a bad month
+    and PlaceNotFoundError for an unknown place.
+    """
+    from app.services.astrology_engine import astrology_engine
+    from app.services.chart_pool import chart_pool
+
+    if not place and (lat is None or lon is None):
+        lat, lon = settings.MUHURTA_DEFAULT_LATITUDE, settings.MUHURTA_DEFAULT_LONGITUDE
+        timezone = timezone or settings.MUHURTA_DEFAULT_TIMEZONE
+    lat, lon, timezone = astrology_engine.resolve_location(place, lat, lon, timezone)
+    start, count = month_span(month, datetime.now(pytz.timezone(timezone)).date())
+    event = event_for(event_type)
+    windows = await chart_pool.muhurta(lat, lon, timezone, start, count, event, natal_points(kundli_data), limit)
+    return {
+        "event": event, "latitude": lat, "longitude": lon, "timezone": timezone,
+        "from": start.isoformat(), "to": (start + timedelta(days=count - 1)).isoformat(),
+        "windows": windows,
+    }
@@ -0,0 +1,250 @@
+"""
+Panchang
+Vara, tithi, nakshatra, yoga and karana with their exact end times, sunrise,
+sunset and the day's Rahu Kalam, Yamaganda and Gulika Kalam, for any place
+and run of days.
+
+Each limb is a steadily rising function of the Sun and Moon (their
+elongation for tithi and karana, the sidereal Moon for nakshatra, the sum of
+both sidereal longitudes for yoga), so instead of scanning minute by minute
+the two bodies are computed every PANCHANG_STEP_HOURS, every whole-number
+crossing is bracketed between samples and its instant solved on the cubic
+through the four nearest samples: about two ephemeris calls per day of
+range. Sunrise and sunset are cached per (grid cell, date).
+"""
+
+import math
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import ephem
+import numpy as np
+import pytz
+
+from app.core.config import settings
+from app.core.metrics import stage
+from app.services.astrology_engine import (
+    AYANAMSA_ANNUAL_PRECESSION, LAHIRI_AYANAMSA_2000, NAKSHATRA_LORDS, NAKSHATRA_SPAN, NAKSHATRAS, RASHIS,
+    AstrologyEngine,
+)
+
+
+# ── Names ──────────────────────────────────────────────────────────────────
+TITHIS = [
+    "Pratipada", "Dwitiya", "Tritiya", "Chaturthi", "Panchami", "Shashthi", "Saptami", "Ashtami",
+    "Navami", "Dashami", "Ekadashi", "Dwadashi", "Trayodashi", "Chaturdashi", "Purnima",
+]
+YOGAS = [
+    "Vishkambha", "Priti", "Ayushman", "Saubhagya", "Shobhana", "Atiganda", "Sukarma", "Dhriti",
+    "Shoola", "Ganda", "Vriddhi", "Dhruva", "Vyaghata", "Harshana", "Vajra", "Siddhi", "Vyatipata",
+    "Variyana", "Parigha", "Shiva", "Siddha", "Sadhya", "Shubha", "Shukla", "Brahma", "Indra", "Vaidhriti",
+]
+MOVABLE_KARANAS = ["Bava", "Balava", "Kaulava", "Taitila", "Garaja", "Vanija", "Vishti"]
+VARAS = ["Somavara", "Mangalavara", "Budhavara", "Guruvara", "Shukravara", "Shanivara", "Ravivara"]
+
+# Which eighth of the daytime (1–8) each kalam takes, by weekday (Monday first)
+KALAMS = {
+    "rahu_kalam":   (2, 7, 5, 6, 4, 3, 8),
+    "yamaganda":    (4, 3, 2, 1, 7, 6, 5),
+    "gulika_kalam": (6, 5, 4, 3, 2, 1, 7),
+}
+
+# limb → number of divisions in one cycle
+LIMBS = {"tithi": 30, "nakshatra": 27, "yoga": 27, "karana": 60}
+
+# Longest a limb lasts (tithi ~26.8 h), so the one current at the last
+# sunrise of a range also ends inside the sampled window
+MAX_LIMB_DAYS = 1.25
+
+
+def tithi_name(index: int) -> Tuple[str, str]:
+    """(name, paksha) of tithi 0–29."""
+    paksha = "Shukla" if index < 15 else "Krishna"
+    name = "Amavasya" if index == 29 else TITHIS[index % 15]
+    return name, paksha
+
+
+def karana_name(index: int) -> str:
+    """Karana 0–59: Kimstughna, eight rounds of the seven movable ones, then three fixed."""
+    if index == 0:
+        return "Kimstughna"
+    if index >= 57:
+        return ("Shakuni", "Chatushpada", "Naga")[index - 57]
+    return MOVABLE_KARANAS[(index - 1) % 7]
+
+
+def ayanamsa_at(djd: np.ndarray) -> np.ndarray:
+    """The engine's Lahiri model as a continuous function of time (Dublin JD)."""
+    return LAHIRI_AYANAMSA_2000 + (djd - float(ephem.J2000)) / 365.25 * AYANAMSA_ANNUAL_PRECESSION
+
+
+def local_time(djd: Optional[float], tz: pytz.BaseTzInfo) -> Optional[str]:
+    """A Dublin JD instant as an ISO timestamp in `tz`."""
+    if djd is None:
+        return None
+    return pytz.utc.localize(ephem.Date(djd).datetime()).astimezone(tz).isoformat(timespec="seconds")
+
+
+# ── Sunrise / sunset ───────────────────────────────────────────────────────
+GRID = settings.PANCHANG_GRID_DEGREES
+
+
+def grid_cell(lat: float, lon: float) -> Tuple[int, int]:
+    return math.floor(lat / GRID), math.floor(lon / GRID)
+
+
+@lru_cache(maxsize=settings.PANCHANG_SUN_CACHE_SIZE)
+def sun_times(cell_lat: int, cell_lon: int, ordinal: int) -> Tuple[float, Optional[float], Optional[float]]:
+    """
+    (day start, sunrise, sunset) as Dublin JD at the centre of a grid cell on
+    a local date. The day starts at sunrise, or at local mean midnight where
+    the Sun does not rise.
+    """
+    lat, lon = (cell_lat + 0.5) * GRID, (cell_lon + 0.5) * GRID
+    midnight = float(ephem.Date(datetime.combine(date.fromordinal(ordinal), datetime.min.time()))) - lon / 360
+    observer = ephem.Observer()
+    observer.lat, observer.lon = math.radians(lat), math.radians(lon)
+    observer.date = midnight
+    sun = ephem.Sun()
+    try:
+        sunrise = float(observer.next_rising(sun))
+        sunset = float(observer.next_setting(sun, start=sunrise))
+    except (ephem.AlwaysUpError, ephem.NeverUpError):
+        return midnight, None, None
+    return sunrise, sunrise, sunset
+
+
+# ── Limb transitions ───────────────────────────────────────────────────────
+def _cubic(values: np.ndarray, i: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Coefficients (u³ … u⁰) of the cubic through samples i-1 … i+2, with u = 0 at i and 1 at i+1."""
+    p0, p1, p2, p3 = (values[i + k] for k in (-1, 0, 1, 2))
+    return (-p0 + 3 * p1 - 3 * p2 + p3) / 6, (p0 - 2 * p1 + p2) / 2, (-2 * p0 - 3 * p1 + 6 * p2 - p3) / 6, p1
+
+
+def crossings(times: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Every whole number a rising sampled quantity passes between times[1] and
+    times[-2], with the instant it does: (numbers, instants).
+    """
+    numbers = np.arange(math.floor(values[1]) + 1, math.floor(values[-2]) + 1)
+    i = np.searchsorted(values, numbers) - 1            # values[i] < n <= values[i + 1]
+    c3, c2, c1, c0 = _cubic(values, i)
+    c0 = c0 - numbers
+    u = -c0 / (values[i + 1] - values[i])
+    for _ in range(4):                                  # Newton from the linear estimate
+        u -= (((c3 * u + c2) * u + c1) * u + c0) / ((3 * c3 * u + 2 * c2) * u + c1)
+    return numbers, times[i] + u * (times[1] - times[0])
+
+
+def interpolate(times: np.ndarray, values: np.ndarray, at: np.ndarray) -> np.ndarray:
+    """Sampled quantity at instants inside (times[1], times[-2])."""
+    step = times[1] - times[0]
+    i = np.clip(((at - times[0]) // step).astype(np.intp), 1, times.size - 3)
+    u = (at - times[i]) / step
+    c3, c2, c1, c0 = _cubic(values, i)
+    return ((c3 * u + c2) * u + c1) * u + c0
+
+
+class PanchangEngine:
+
+    def __init__(self, step_hours: float):
+        self.step = step_hours / 24
+
+    def sample(self, start: float, end: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sample times covering [start, end] (Dublin JD) with a spare sample at
+        each end, and the unwrapped tropical Sun and Moon longitudes there.
+        """
+        times = np.arange(start - self.step, end + 2 * self.step, self.step)
+        sun, moon = ephem.Sun(), ephem.Moon()
+        lon = np.array([
+            (AstrologyEngine._ecliptic_longitude(sun, t), AstrologyEngine._ecliptic_longitude(moon, t))
+            for t in times.tolist()
+        ])
+        lon = np.unwrap(lon, period=360, axis=0)
+        return times, lon[:, 0], lon[:, 1]
+
+    @staticmethod
+    def limb_values(times: np.ndarray, sun: np.ndarray, moon: np.ndarray) -> Dict[str, np.ndarray]:
+        """Each limb's count in divisions (unwrapped): its integer part mod LIMBS[limb] is the limb."""
+        ayanamsa = ayanamsa_at(times)
+        elongation = moon - sun
+        return {
+            "tithi": elongation / 12,
+            "nakshatra": (moon - ayanamsa) / NAKSHATRA_SPAN,
+            "yoga": (sun + moon - 2 * ayanamsa) / NAKSHATRA_SPAN,
+            "karana": elongation / 6,
+        }
+
+    def days(self, lat: float, lon: float, timezone: str, start: date, count: int) -> List[Dict[str, Any]]:
+        """Panchang of `count` consecutive local dates from `start`, each from sunrise to the next."""
+        tz = pytz.timezone(timezone)
+        cell = grid_cell(lat, lon)
+        with stage("sun_times"):
+            suns = [sun_times(*cell, start.toordinal() + d) for d in range(count + 1)]
+        bounds = [s[0] for s in suns]
+
+        with stage("panchang_limbs"):
+            times, sun, moon = self.sample(bounds[0], bounds[-1] + MAX_LIMB_DAYS)
+            ends = {limb: crossings(times, values) for limb, values in self.limb_values(times, sun, moon).items()}
+        first = np.array(bounds[:-1])
+        ayanamsa = ayanamsa_at(first)
+        moon_rashi = np.mod(interpolate(times, moon, first) - ayanamsa, 360) // 30
+        sun_rashi = np.mod(interpolate(times, sun, first) - ayanamsa, 360) // 30
+
+        days = []
+        for d in range(count):
+            day = start + timedelta(days=d)
+            begin, end = bounds[d], bounds[d + 1]
+            _, sunrise, sunset = suns[d]
+            entry = {
+                "date": day.isoformat(),
+                "vara": VARAS[day.weekday()],
+                "sunrise": local_time(sunrise, tz),
+                "sunset": local_time(sunset, tz),
+            }
+            for limb, (numbers, instants) in ends.items():
+                # The limb current at sunrise, then any that begin before the next sunrise
+                j = int(np.searchsorted(instants, begin, side="right"))
+                spans = []
+                while True:
+                    index = int(numbers[j] - 1) % LIMBS[limb]
+                    spans.append(self._limb(limb, index, local_time(float(instants[j]), tz)))
+                    if instants[j] >= end:
+                        break
+                    j += 1
+                entry[limb] = spans
+            entry["moon_rashi"] = RASHIS[int(moon_rashi[d])]
+            entry["sun_rashi"] = RASHIS[int(sun_rashi[d])]
+            for kalam, parts in KALAMS.items():
+                if sunrise is None:
+                    entry[kalam] = None
+                    continue
+                eighth = (sunset - sunrise) / 8
+                part = parts[day.weekday()] - 1
+                entry[kalam] = {
+                    "start": local_time(sunrise + part * eighth, tz),
+                    "end": local_time(sunrise + (part + 1) * eighth, tz),
+                }
+            entry["ayanamsa"] = round(float(ayanamsa[d]), 4)
+            days.append(entry)
+        return days
+
+    @staticmethod
+    def _limb(limb: str, index: int, ends_at: str) -> Dict[str, Any]:
+        if limb == "tithi":
+            name, paksha = tithi_name(index)
+            return {"number": index % 15 + 1, "name": name, "paksha": paksha, "ends_at": ends_at}
+        if limb == "nakshatra":
+            return {"number": index + 1, "name": NAKSHATRAS[index], "lord": NAKSHATRA_LORDS[index], "ends_at": ends_at}
+        if limb == "yoga":
+            return {"number": index + 1, "name": YOGAS[index], "ends_at": ends_at}
+        return {"name": karana_name(index), "ends_at": ends_at}
+
+    def stats(self) -> Dict[str, Any]:
+        info = sun_times.cache_info()
+        return {"sun_cache_hits": info.hits, "sun_cache_misses": info.misses, "sun_cache_size": info.currsize}
+
+
+panchang_engine = PanchangEngine(step_hours=settings.PANCHANG_STEP_HOURS)
@@ -0,0 +1,161 @@
+"""
+Partner Search
+Best Ashtakoota matches for a stored Kundli among public profiles of the
+opposite gender. A candidate's score depends only on its Moon pada, so for a
+given chart the 108 padas (× Manglik status) form buckets of known score.
+Buckets are read best-first, each one a range of the partial index on
+(gender, is_manglik, moon_pada, id), until a page is full; only the rows
+returned get a per-koota breakdown.
+"""
+
+import base64
+import json
+import uuid
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import literal, select, union_all
+
+from app.core.database import AsyncSessionLocal
+from app.models import Kundli
+from app.services.ashtakoota import PADAS, TOTAL_TABLE, breakdown, is_manglik, pada_index
+from app.services.astrology_engine import KundliData
+
+BUCKETS_PER_QUERY = 24
+
+# (score, manglik, pada) — one index range per bucket
+Bucket = Tuple[float, Optional[bool], int]
+
+GENDERS = {"male": "female", "female": "male"}     # searcher → candidates
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor that does not belong to this search."""
+
+
+def match_columns(kundli_data: KundliData) -> Dict[str, Any]:
+    """Matchmaking columns for a kundlis row."""
+    moon = kundli_data.planets["Moon"].sidereal_longitude
+    return {"moon_longitude": moon, "moon_pada": pada_index(moon), "is_manglik": is_manglik(kundli_data)}
+
+
+def normalize_gender(gender: Optional[str]) -> Optional[str]:
+    gender = (gender or "").strip().lower()
+    return {"m": "male", "f": "female"}.get(gender, gender) or None
+
+
+@lru_cache(maxsize=1024)
+def buckets(pada: int, as_groom: bool, manglik: Optional[bool], min_score: float) -> Tuple[Bucket, ...]:
+    """Candidate buckets, best first: score, then a matching Manglik status, then pada."""
+    scores = TOTAL_TABLE[pada] if as_groom else TOTAL_TABLE[:, pada]
+    # Manglik marries Manglik; candidates of unknown status come last
+    statuses = (manglik, not manglik, None) if manglik is not None else (False, True, None)
+    keyed = [
+        (-float(scores[p]), rank, p, status)
+        for p in range(PADAS) if scores[p] >= min_score
+        for rank, status in enumerate(statuses)
+    ]
+    return tuple((-score, status, p) for score, _, p, status in sorted(keyed))
+
+
+def encode_cursor(bucket: Bucket, last_id: uuid.UUID) -> str:
+    raw = json.dumps([bucket[1], bucket[2], str(last_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[bool], int, uuid.UUID]:
+    try:
+        manglik, pada, last_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return manglik, int(pada), uuid.UUID(last_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+class PartnerSearch:
+
+    def __init__(self, buckets_per_query: int = BUCKETS_PER_QUERY):
+        self.buckets_per_query = buckets_per_query
+
+    @staticmethod
+    def _bucket_query(ordinal: int, gender: str, bucket: Bucket, after: Optional[uuid.UUID], limit: int):
+        _, manglik, pada = bucket
+        query = select(
+            literal(ordinal).label("bucket"), Kundli.id, Kundli.name, Kundli.moon_sign,
+            Kundli.nakshatra, Kundli.nakshatra_pada, Kundli.moon_pada, Kundli.is_manglik,
+        ).where(
+            Kundli.is_public, Kundli.gender == gender, Kundli.moon_pada == pada,
+            Kundli.is_manglik.is_(None) if manglik is None else Kundli.is_manglik == manglik,
+        )
+        if after is not None:
+            query = query.where(Kundli.id > after)
+        return query.order_by(Kundli.id).limit(limit)
+
+    async def search(
+        self, kundli_id: uuid.UUID, limit: int = 20,
+        cursor: Optional[str] = None, min_score: float = 18.0,
+    ) -> Optional[Dict[str, Any]]:
+        """One page of matches for `kundli_id`; None if it does not exist."""
+        async with AsyncSessionLocal() as session:
+            me = (await session.execute(
+                select(Kundli.id, Kundli.gender, Kundli.moon_pada, Kundli.is_manglik)
+                .where(Kundli.id == kundli_id)
+            )).first()
+            if me is None:
+                return None
+            gender = normalize_gender(me.gender)
+            if gender not in GENDERS or me.moon_pada is None:
+                raise ValueError("Partner search needs the chart's gender and Moon position")
+
+            as_groom = gender == "male"
+            order = buckets(me.moon_pada, as_groom, me.is_manglik, min_score)
+            start, after = 0, None
+            if cursor:
+                manglik, pada, after = decode_cursor(cursor)
+                start = next(
+                    (i for i, b in enumerate(order) if b[1] == manglik and b[2] == pada), None
+                )
+                if start is None:
+                    raise InvalidCursorError("Invalid cursor")
+
+            rows: List[Any] = []
+            while start < len(order) and len(rows) < limit:
+                chunk = range(start, min(start + self.buckets_per_query, len(order)))
+                need = limit - len(rows)
+                query = union_all(*(
+                    self._bucket_query(i, GENDERS[gender], order[i], after if i == start else None, need)
+                    for i in chunk
+                ))
+                page = query.subquery()
+                rows += (await session.execute(
+                    select(page).order_by(page.c.bucket, page.c.id).limit(need)
+                )).all()
+                start, after = chunk.stop, None
+
+        results = []
+        for row in rows:
+            groom, bride = (me.moon_pada, row.moon_pada) if as_groom else (row.moon_pada, me.moon_pada)
+            results.append({
+                "id": str(row.id),
+                "name": row.name,
+                "moon_sign": row.moon_sign,
+                "nakshatra": row.nakshatra,
+                "nakshatra_pada": row.nakshatra_pada,
+                "is_manglik": row.is_manglik,
+                "manglik_match": row.is_manglik is not None and row.is_manglik == me.is_manglik,
+                **breakdown(groom, bride),
+            })
+
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_cursor = encode_cursor(order[last.bucket], last.id)
+        return {
+            "kundli_id": str(kundli_id),
+            "role": "groom" if as_groom else "bride",
+            "is_manglik": me.is_manglik,
+            "results": results,
+            "next_cursor": next_cursor,
+        }
+
+
+partner_search = PartnerSearch()
@@ -0,0 +1,237 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same key share one computation. Within a
+worker they await the same in-flight future; across workers the first one
+takes a Redis lock and publishes the encoded result on a per-key channel that
+the others subscribe to. If the leader's computation fails, its followers
+get LeaderFailedError rather than all retrying at once; only if Redis is
+unreachable, or the leader is cancelled, vanishes or outlasts the wait, do
+callers compute for themselves.
+"""
+
+import asyncio
+import json
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+import structlog
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+_OK, _FAILED = b"1", b"0"      # first byte of a published result
+REDIS_BACKOFF_SECONDS = 5.0    # after a Redis error, coalesce locally only for a while
+
+# Delete the lock only while it still holds our token: a leader that outlived
+# lock_seconds must not release the next leader's lock
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderFailedError(RuntimeError):
+    """The worker computing a key failed; `kind` is its exception's class name."""
+
+    def __init__(self, kind: str, detail: str):
+        super().__init__(f"{kind}: {detail}" if detail else kind)
+        self.kind = kind
+        self.detail = detail
+
+
+class _LeaderCancelled(Exception):
+    """Set on a local future whose leading caller was cancelled; its followers lead afresh."""
+
+
+def _json_encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode()
+
+
+def _json_decode(blob: bytes) -> Any:
+    return json.loads(blob)
+
+
+class SingleFlight:
+
+    def __init__(
+        self,
+        redis_enabled: bool = True,
+        lock_seconds: float = 60.0,
+        wait_seconds: float = 60.0,
+        result_ttl_seconds: int = 15,
+        failure_ttl_seconds: int = 2,
+    ):
+        self.redis_enabled = redis_enabled
+        self.lock_seconds = lock_seconds
+        self.wait_seconds = wait_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._redis_retry_at = 0.0
+        self.leaders = 0
+        self.local_joins = 0
+        self.remote_joins = 0
+        self.fallbacks = 0
+        self.failures_shared = 0
+        self.redis_errors = 0
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        encode: Callable[[T], bytes] = _json_encode,
+        decode: Callable[[bytes], T] = _json_decode,
+    ) -> T:
+        """Result of `fn()`, computed at most once at a time per key across all workers."""
+        future = self._inflight.get(key)
+        while future is not None:
+            self.local_joins += 1
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                # Only the leading request was cancelled; the first follower
+                # back takes over and the rest join it
+                future = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._run(key, fn, encode, decode)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()      # consumed here if nobody joined
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _redis_failed(self, action: str, error: Exception) -> None:
+        self.redis_errors += 1
+        self._redis_retry_at = asyncio.get_running_loop().time() + REDIS_BACKOFF_SECONDS
+        logger.warning(f"Single-flight Redis {action} failed", error=str(error))
+
+    async def _run(self, key: str, fn, encode, decode):
+        if not self.redis_enabled or asyncio.get_running_loop().time() < self._redis_retry_at:
+            self.leaders += 1
+            return await fn()
+
+        redis = get_redis()
+        lock_key, result_key, channel = f"sf:lock:{key}", f"sf:result:{key}", f"sf:chan:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await redis.set(lock_key, token, nx=True, px=int(self.lock_seconds * 1000))
+        except Exception as e:
+            self._redis_failed("lock", e)
+            self.leaders += 1
+            return await fn()
+
+        if acquired:
+            return await self._lead(redis, fn, encode, lock_key, token, result_key, channel)
+
+        blob = await self._follow(redis, lock_key, result_key, channel)
+        if blob is not None and blob[:1] == _OK:
+            self.remote_joins += 1
+            return decode(blob[1:])
+        if blob is not None:
+            # The leader failed; computing again from every follower at once
+            # would repeat the load that likely caused it
+            self.failures_shared += 1
+            failure = json.loads(blob[1:] or b"{}")
+            raise LeaderFailedError(failure.get("kind", "Error"), failure.get("detail", ""))
+
+        self.fallbacks += 1
+        return await fn()
+
+    async def _lead(self, redis, fn, encode, lock_key: str, token: str, result_key: str, channel: str):
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Not a failure of the computation: followers see the lock go
+            # without a result and compute for themselves
+            await self._release(redis, lock_key, token)
+            raise
+        except BaseException as e:
+            failure = _FAILED + _json_encode({"kind": type(e).__name__, "detail": str(e)})
+            await self._publish(redis, lock_key, token, result_key, channel, failure, self.failure_ttl_seconds)
+            raise
+        blob = _OK + encode(result)
+        await self._publish(redis, lock_key, token, result_key, channel, blob, self.result_ttl_seconds)
+        return result
+
+    async def _publish(
+        self, redis, lock_key: str, token: str, result_key: str, channel: str, blob: bytes, ttl: int
+    ) -> None:
+        try:
+            # The result key covers followers that subscribe just after the publish
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.set(result_key, blob, ex=ttl)
+                pipe.publish(channel, blob)
+                pipe.eval(_RELEASE_LOCK, 1, lock_key, token)
+                await pipe.execute()
+        except Exception as e:
+            self._redis_failed("publish", e)
+
+    async def _release(self, redis, lock_key: str, token: str) -> None:
+        try:
+            await redis.eval(_RELEASE_LOCK, 1, lock_key, token)
+        except Exception as e:
+            self._redis_failed("unlock", e)
+
+    async def _follow(self, redis, lock_key: str, result_key: str, channel: str) -> Optional[bytes]:
+        """Wait for the leading worker's published blob; None if it vanished or timed out."""
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.wait_seconds
+            while loop.time() < deadline:
+                blob = await redis.get(result_key)
+                if blob is not None:
+                    return blob
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.25)
+                if message is not None and message["type"] == "message":
+                    return message["data"]
+                if message is None and not await redis.exists(lock_key):
+                    return await redis.get(result_key)   # leader expired without publishing
+            return None
+        except Exception as e:
+            self._redis_failed("wait", e)
+            return None
+        finally:
+            try:
+                await pubsub.unsubscribe(channel)
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "local_joins": self.local_joins,
+            "remote_joins": self.remote_joins,
+            "fallbacks": self.fallbacks,
+            "failures_shared": self.failures_shared,
+            "redis_errors": self.redis_errors,
+        }
+
+
+single_flight = SingleFlight(
+    redis_enabled=settings.SINGLE_FLIGHT_REDIS,
+    lock_seconds=settings.SINGLE_FLIGHT_LOCK_SECONDS,
+    wait_seconds=settings.SINGLE_FLIGHT_WAIT_SECONDS,
+    result_ttl_seconds=settings.SINGLE_FLIGHT_RESULT_TTL_SECONDS,
+    failure_ttl_seconds=settings.SINGLE_FLIGHT_FAILURE_TTL_SECONDS,
+)
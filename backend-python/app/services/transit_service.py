@@ -0,0 +1,120 @@
+"""
+Live Transits
+Current sidereal positions, signs and retrograde state of the nine grahas,
+computed with AstrologyEngine and cached per time bucket so every caller in
+the same bucket (/transits/*, AI horoscopes) shares one ephemeris pass.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.astrology_engine import (
+    GRAHAS, RASHI_SYMBOLS, RASHIS_ENGLISH, AstrologyEngine, astrology_engine
+)
+
+GRAHA_COLORS = {
+    "Sun": "#f39c12", "Moon": "#ecf0f1", "Mars": "#e74c3c",
+    "Mercury": "#2ecc71", "Jupiter": "#f1c40f", "Venus": "#e91e63",
+    "Saturn": "#607d8b", "Rahu": "#9c27b0", "Ketu": "#795548",
+}
+
+GRAHA_THEMES = {
+    "Sun": "Authority, vitality and sense of purpose",
+    "Moon": "Emotions, intuition and the inner life",
+    "Mars": "Drive, courage and decisive action",
+    "Mercury": "Thinking, communication and trade",
+    "Jupiter": "Wisdom, growth and good fortune",
+    "Venus": "Love, beauty and material comforts",
+    "Saturn": "Discipline, karma and long-term effort",
+    "Rahu": "Ambition, obsession and the unconventional",
+    "Ketu": "Detachment, insight and past-life karma",
+}
+
+RASHI_THEMES = [
+    "expressed boldly and with initiative",
+    "grounded in patience and steady material effort",
+    "channelled through ideas, learning and conversation",
+    "turned toward home, family and emotional security",
+    "shining through creativity, leadership and self-expression",
+    "focused on analysis, health and careful service",
+    "seeking balance, partnership and fairness",
+    "working beneath the surface through intensity and transformation",
+    "reaching for philosophy, travel and higher learning",
+    "structured around career, duty and practical ambition",
+    "directed at community, innovation and humanitarian ideals",
+    "dissolving into compassion, spirituality and imagination",
+]
+
+
+def _effects(planet: str, rashi_index: int, is_retrograde: bool) -> str:
+    text = f"{GRAHA_THEMES[planet]} {RASHI_THEMES[rashi_index]}."
+    if is_retrograde and planet not in ("Rahu", "Ketu"):
+        text += " Retrograde: a time to review and revisit rather than begin."
+    return text
+
+
+def compute_transits(moment: datetime, engine: AstrologyEngine = astrology_engine) -> List[Dict[str, Any]]:
+    """Positions of all nine grahas at a UTC instant."""
+    tropical, speeds = engine.geocentric_longitudes(moment)
+    ayanamsa = engine.get_ayanamsa(moment)
+
+    transits = []
+    for (name, sanskrit, symbol), lon, speed in zip(GRAHAS, tropical, speeds):
+        sidereal = engine.tropical_to_sidereal(lon, ayanamsa)
+        rashi_idx, rashi, degree = engine.get_rashi(sidereal)
+        nakshatra, pada, _ = engine.get_nakshatra(sidereal)
+        is_retrograde = speed < 0
+        transits.append({
+            "planet": name,
+            "sanskrit": sanskrit,
+            "symbol": symbol,
+            "sign": RASHIS_ENGLISH[rashi_idx],
+            "rashi": rashi,
+            "rashi_symbol": RASHI_SYMBOLS[rashi_idx],
+            "degree": round(degree, 2),
+            "longitude": round(sidereal, 4),
+            "nakshatra": nakshatra,
+            "nakshatra_pada": pada,
+            "speed": round(speed, 4),
+            "is_retrograde": is_retrograde,
+            "effects": _effects(name, rashi_idx, is_retrograde),
+            "color": GRAHA_COLORS[name],
+        })
+    return transits
+
+
+class TransitService:
+    """Keeps one snapshot per `bucket_seconds` window, computed on first use."""
+
+    def __init__(self, bucket_seconds: int = 600):
+        self.bucket_seconds = bucket_seconds
+        self._bucket: Optional[int] = None
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self.computations = 0
+
+    def current(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        now = now or datetime.now(timezone.utc)
+        bucket = int(now.timestamp()) // self.bucket_seconds
+        # No awaits between the check and the store, so a burst of requests
+        # on the event loop triggers exactly one computation per bucket.
+        if bucket != self._bucket:
+            start = datetime.fromtimestamp(bucket * self.bucket_seconds, timezone.utc)
+            self._snapshot = {
+                "date": start.date().isoformat(),
+                "computed_for": start.isoformat(),
+                "valid_until": (start + timedelta(seconds=self.bucket_seconds)).isoformat(),
+                "ayanamsa": round(astrology_engine.get_ayanamsa(start), 4),
+                "transits": compute_transits(start.replace(tzinfo=None)),
+            }
+            self._bucket = bucket
+            self.computations += 1
+        return self._snapshot
+
+    def planet(self, name: str) -> Optional[Dict[str, Any]]:
+        return next(
+            (t for t in self.current()["transits"] if t["planet"].lower() == name.lower()), None
+        )
+
+
+transit_service = TransitService(bucket_seconds=settings.TRANSIT_BUCKET_SECONDS)
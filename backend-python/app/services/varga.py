@@ -0,0 +1,116 @@
+"""
+Divisional Charts (Shodashavarga)
+The sixteen Parashari vargas, D1–D60, for the Lagna and the nine grahas in a
+single array pass. Each varga's sign is read from a (varga, rashi, part)
+table built at import, so asking for all sixteen costs about the same as one.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.astrology_engine import ASCENDANT_FIELD, GRAHAS, RASHIS, SIDEREAL_FIELDS, KundliData
+
+
+def _odd(s: int) -> bool:
+    """Odd (masculine) sign: Mesha, Mithuna, … (index 0, 2, …)."""
+    return s % 2 == 0
+
+
+def _trimshamsa(s: int, degree: int) -> int:
+    """D30: unequal spans ruled by Mars, Saturn, Jupiter, Mercury and Venus."""
+    if _odd(s):
+        spans = ((5, 0), (10, 10), (18, 8), (25, 2), (30, 6))     # Mesha, Kumbha, Dhanu, Mithuna, Tula
+    else:
+        spans = ((5, 1), (12, 5), (20, 11), (25, 9), (30, 7))     # Vrishabha, Kanya, Meena, Makara, Vrischika
+    return next(sign for end, sign in spans if degree < end)
+
+
+# code → (name, parts per sign, sign of part k of rashi s). D30 is tabulated
+# per degree, which its unequal spans all align with.
+VARGAS: Dict[str, tuple] = {
+    "D1":  ("Rashi",           1,  lambda s, k: s),
+    "D2":  ("Hora",            2,  lambda s, k: 4 - k if _odd(s) else 3 + k),
+    "D3":  ("Drekkana",        3,  lambda s, k: s + 4 * k),
+    "D4":  ("Chaturthamsha",   4,  lambda s, k: s + 3 * k),
+    "D7":  ("Saptamsha",       7,  lambda s, k: s + k if _odd(s) else s + 6 + k),
+    "D9":  ("Navamsha",        9,  lambda s, k: (0, 9, 6, 3)[s % 4] + k),
+    "D10": ("Dashamsha",       10, lambda s, k: s + k if _odd(s) else s + 8 + k),
+    "D12": ("Dwadashamsha",    12, lambda s, k: s + k),
+    "D16": ("Shodashamsha",    16, lambda s, k: (0, 4, 8)[s % 3] + k),
+    "D20": ("Vimshamsha",      20, lambda s, k: (0, 8, 4)[s % 3] + k),
+    "D24": ("Chaturvimshamsha", 24, lambda s, k: (4 if _odd(s) else 3) + k),
+    "D27": ("Saptavimshamsha", 27, lambda s, k: (0, 3, 6, 9)[s % 4] + k),
+    "D30": ("Trimshamsha",     30, _trimshamsa),
+    "D40": ("Khavedamsha",     40, lambda s, k: (0 if _odd(s) else 6) + k),
+    "D45": ("Akshavedamsha",   45, lambda s, k: (0, 4, 8)[s % 3] + k),
+    "D60": ("Shashtiamsha",    60, lambda s, k: s + k),
+}
+VARGA_CODES = list(VARGAS)
+VARGA_INDEX = {code: i for i, code in enumerate(VARGA_CODES)}
+
+DIVISIONS = np.array([parts for _, parts, _ in VARGAS.values()])
+PART_SIGN = np.zeros((len(VARGAS), 12, DIVISIONS.max()), dtype=np.int8)
+for _v, (_, _parts, _rule) in enumerate(VARGAS.values()):
+    for _s in range(12):
+        PART_SIGN[_v, _s, :_parts] = [_rule(_s, _k) % 12 for _k in range(_parts)]
+
+# Lagna, then the nine grahas in GRAHAS order
+POINT_FIELDS = np.r_[ASCENDANT_FIELD, SIDEREAL_FIELDS.start:SIDEREAL_FIELDS.stop]
+
+
+def parse_vargas(text: Optional[str]) -> List[str]:
+    """
+    "D9,D10" (or "all") as varga codes in canonical order. Raises ValueError
+    for unknown codes.
+    """
+    if not text or not text.strip():
+        return []
+    codes = {c.strip().upper() for c in text.split(",") if c.strip()}
+    if "ALL" in codes:
+        return list(VARGA_CODES)
+    unknown = sorted(codes - VARGAS.keys())
+    if unknown:
+        raise ValueError(f"Unknown varga {', '.join(unknown)}; choose from {', '.join(VARGA_CODES)}")
+    return [code for code in VARGA_CODES if code in codes]
+
+
+def varga_signs(points: np.ndarray, vargas: Sequence[str] = VARGA_CODES) -> np.ndarray:
+    """
+    Rashi indices (…, len(vargas), P) of sidereal longitudes (…, P), for a
+    single chart or a batch.
+    """
+    v = np.array([VARGA_INDEX[code] for code in vargas])
+    points = np.mod(points, 360)
+    rashi = (points // 30).astype(np.intp)[..., None, :]
+    divisions = DIVISIONS[v][:, None]
+    part = np.minimum((points % 30)[..., None, :] * divisions / 30, divisions - 1).astype(np.intp)
+    return PART_SIGN[v[:, None], rashi, part]
+
+
+def chart_points(kundli_data: KundliData) -> np.ndarray:
+    return kundli_data.longitudes[POINT_FIELDS]
+
+
+def stored_points(chart: Dict[str, Any]) -> np.ndarray:
+    """The same points from a stored KundliResponse (longitudes rounded to 4 places)."""
+    ascendant = RASHIS.index(chart["ascendant_rashi"]) * 30 + chart["ascendant_degree"]
+    return np.array([ascendant] + [chart["planets"][name]["sidereal_longitude"] for name, _, _ in GRAHAS])
+
+
+def divisional_charts(points: np.ndarray, vargas: Sequence[str] = VARGA_CODES) -> Dict[str, Dict[str, Any]]:
+    """
+    The requested vargas of one chart: each one's Lagna and every graha's
+    sign and house (whole sign, counted from the varga Lagna).
+    """
+    charts = {}
+    for code, (asc, *signs) in zip(vargas, varga_signs(points, vargas).tolist()):
+        charts[code] = {
+            "name": VARGAS[code][0],
+            "ascendant_rashi": RASHIS[asc],
+            "planets": {
+                GRAHAS[i][0]: {"rashi": RASHIS[s], "house": (s - asc) % 12 + 1}
+                for i, s in enumerate(signs)
+            },
+        }
+    return charts
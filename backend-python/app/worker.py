@@ -0,0 +1,143 @@
+"""
+Celery worker + beat schedule
+
+    celery -A app.worker worker --beat --loglevel=info -Q celery,ai,charts
+
+or one worker per queue, each at its JOBS_*_CONCURRENCY unless -c is given:
+
+    celery -A app.worker worker --beat --loglevel=info          # nightly pre-generation
+    celery -A app.worker worker -Q ai -n ai@%h --loglevel=info  # AI report jobs
+    celery -A app.worker worker -Q charts -n charts@%h --loglevel=info
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+import groq
+import orjson
+from celery import Celery, Task, states
+from celery.schedules import crontab
+from celery.signals import celeryd_init
+
+from app.api.v1.kundli import KundliBatchRequest, kundli_batch_payload
+from app.core.config import settings
+from app.core.database import engine
+from app.core.redis import close_redis
+from app.services.ai_governor import AIOverloadedError
+from app.services.ai_service import close_client as close_ai_client
+from app.services.ai_service import generate_kundli_reading, generate_yearly_prediction
+from app.services.chart_pool import ChartPoolOverloadedError
+from app.services.horoscope_store import horoscope_store
+
+celery_app = Celery("bhramhlekh", broker=settings.REDIS_URL, backend=settings.REDIS_URL)
+celery_app.conf.update(
+    timezone="UTC",
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    task_routes={"jobs.ai.*": {"queue": "ai"}, "jobs.charts.*": {"queue": "charts"}},
+    beat_schedule={
+        "pregenerate-horoscopes": {
+            "task": "horoscopes.pregenerate",
+            "schedule": crontab(hour=settings.HOROSCOPE_PREGENERATE_HOUR, minute=5),
+        },
+    },
+)
+
+# queue → worker processes, retries, and how long a finished job's result is kept
+JOB_QUEUES: Dict[str, Dict[str, int]] = {
+    "ai": {
+        "concurrency": settings.JOBS_AI_CONCURRENCY,
+        "max_retries": settings.JOBS_AI_MAX_RETRIES,
+        "result_ttl": settings.JOBS_AI_RESULT_TTL_SECONDS,
+    },
+    "charts": {
+        "concurrency": settings.JOBS_CHARTS_CONCURRENCY,
+        "max_retries": settings.JOBS_CHARTS_MAX_RETRIES,
+        "result_ttl": settings.JOBS_CHARTS_RESULT_TTL_SECONDS,
+    },
+}
+
+# Transient failures worth another attempt; anything else fails the job at once
+RETRY_ON = {
+    "ai": (AIOverloadedError, groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError),
+    "charts": (ChartPoolOverloadedError,),
+}
+
+
+@celeryd_init.connect
+def _queue_concurrency(conf, options: Dict[str, Any], **_: Any) -> None:
+    """A worker on a single job queue (-Q ai, -Q charts) runs that queue's concurrency unless -c is given."""
+    queues = options.get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    if not options.get("concurrency") and len(queues) == 1 and queues[0] in JOB_QUEUES:
+        conf.worker_concurrency = JOB_QUEUES[queues[0]]["concurrency"] or None     # None = CPU count
+
+
+def _run(job: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a coroutine on a fresh event loop, closing the clients bound to it afterwards."""
+    async def run() -> Any:
+        try:
+            return await job()
+        finally:
+            await engine.dispose()
+            await close_ai_client()
+            await close_redis()
+    return asyncio.run(run())
+
+
+@celery_app.task(name="horoscopes.pregenerate")
+def pregenerate_horoscopes() -> Dict[str, int]:
+    """All 12 rashis × daily/weekly/monthly/yearly for today's windows; existing readings are kept."""
+    return _run(horoscope_store.pregenerate)
+
+
+# ── Jobs (POST /jobs/{kind}) ───────────────────────────────────────────────
+def job_key(job_id: str) -> str:
+    """Redis key registering a job's kind; GET /jobs/{id} is a 404 once it expires."""
+    return f"job:{job_id}"
+
+
+class Job(Task):
+    result_ttl: int = 86400
+
+    def after_return(self, status, retval, task_id, args, kwargs, einfo) -> None:
+        # Celery's result_expires is global; a job's result, and the key that
+        # makes it visible, live as long as its queue says
+        if status in states.READY_STATES:
+            self.backend.expire(self.backend.get_key_for_task(task_id), self.result_ttl)
+            self.backend.client.expire(job_key(task_id), self.result_ttl)
+
+
+def job(queue: str, name: str):
+    limits = JOB_QUEUES[queue]
+    return celery_app.task(
+        name=f"jobs.{queue}.{name}",
+        base=Job,
+        track_started=True,
+        autoretry_for=RETRY_ON[queue],
+        max_retries=limits["max_retries"],
+        retry_backoff=True,
+        result_ttl=limits["result_ttl"],
+    )
+
+
+@job("ai", "yearly")
+def yearly_job(request: Dict[str, Any]) -> Dict[str, Any]:
+    """The /ai/yearly response body."""
+    prediction = _run(lambda: generate_yearly_prediction(request["kundli_data"], request["year"]))
+    return {"success": True, "year": request["year"], "prediction": prediction}
+
+
+@job("ai", "kundli_reading")
+def kundli_reading_job(request: Dict[str, Any]) -> Dict[str, Any]:
+    """The /ai/kundli-reading response body."""
+    return {"success": True, "reading": _run(lambda: generate_kundli_reading(request["kundli_data"]))}
+
+
+@job("charts", "kundli_batch")
+def kundli_batch_job(request: Dict[str, Any]) -> Dict[str, Any]:
+    """The /kundli/generate-batch response body."""
+    payload = _run(lambda: kundli_batch_payload(KundliBatchRequest.model_validate(request)))
+    return orjson.loads(orjson.dumps(payload))       # dates and numpy scalars as JSON types
@@ -0,0 +1,126 @@
+"""
+Benchmark cases: the astrology engine called directly, and the ASGI app's
+routes called in-process over httpx (AI routes answer from FakeGroq).
+"""
+
+import itertools
+import random
+from datetime import date, datetime
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from app.services.astrology_engine import astrology_engine
+from app.services.muhurta import search as muhurta_search
+from app.services.panchang import GRID, panchang_engine
+from benchmarks.chart_memory import births
+from benchmarks.harness import Case
+
+SAMPLE_BIRTHS = births(512, seed=18)
+BATCH_SIZE = 1000
+
+
+# ── Engine ─────────────────────────────────────────────────────────────────
+def engine_cases() -> List[Case]:
+    engine = astrology_engine
+    rng = random.Random(18)
+    moments = itertools.cycle([datetime(1950 + i % 100, 1 + i % 12, 1 + i % 28, i % 24) for i in range(97)])
+    longitudes = itertools.cycle([rng.uniform(0, 360) for _ in range(997)])
+    explicit = itertools.cycle(SAMPLE_BIRTHS)
+    geocoded = itertools.cycle([
+        {"dob": b["dob"], "tob": b["tob"], "place": place}
+        for b, place in zip(SAMPLE_BIRTHS, itertools.cycle(
+            ["Delhi, India", "Mumbai", "Varanasi", "Kolkata", "Chennai", "Bengaluru"]
+        ))
+    ])
+    moons = itertools.cycle([(b["dob"], rng.uniform(0, 360)) for b in SAMPLE_BIRTHS])
+    charts = engine.calculate_kundli_batch(SAMPLE_BIRTHS)
+    single = itertools.cycle([np.array(c.longitudes)[None] for c in charts])
+    block = np.array([c.longitudes for c in charts])
+    # A new sunrise cache cell per call, so every year is computed from scratch
+    cells = itertools.count()
+
+    cases = [
+        Case("engine.get_ayanamsa", "engine", lambda: engine.get_ayanamsa(next(moments))),
+        Case("engine.get_nakshatra", "engine", lambda: engine.get_nakshatra(next(longitudes))),
+        Case("engine.calculate_kundli[coordinates]", "engine",
+             lambda: engine.calculate_kundli(**next(explicit))),
+        # Places from benchmarks/fixtures/cities.tsv, which benchmarks.run indexes
+        Case("engine.calculate_kundli[geocoded]", "engine",
+             lambda: engine.calculate_kundli(**next(geocoded))),
+        Case(f"engine.calculate_kundli_batch[{BATCH_SIZE}]", "engine",
+             lambda: engine.calculate_kundli_batch(SAMPLE_BIRTHS * (BATCH_SIZE // len(SAMPLE_BIRTHS))
+                                                   + SAMPLE_BIRTHS[:BATCH_SIZE % len(SAMPLE_BIRTHS)])),
+        Case("engine.calculate_vimshottari_dasha[depth=2]", "engine",
+             lambda: engine.calculate_vimshottari_dasha(*next(moons))),
+        Case("engine.calculate_vimshottari_dasha[depth=3]", "engine",
+             lambda: engine.calculate_vimshottari_dasha(*next(moons), depth=3)),
+        Case("engine.detect_yogas", "engine", lambda: engine._yoga_masks(next(single))),
+        Case(f"engine.detect_yogas[{len(SAMPLE_BIRTHS)}]", "engine", lambda: engine._yoga_masks(block)),
+        Case("panchang.days[365]", "engine", lambda: panchang_engine.days(
+            10 + next(cells) % 1000 * GRID, 77.2, "Asia/Kolkata", date(2025, 1, 1), 365)),
+        Case("muhurta.search[31]", "engine", lambda: muhurta_search(
+            10 + next(cells) % 1000 * GRID, 77.2, "Asia/Kolkata", date(2025, 3, 1), 31, "marriage", (3, 1))),
+    ]
+    return cases
+
+
+# ── HTTP ───────────────────────────────────────────────────────────────────
+def _birth_json(birth: Dict, name: str = "Benchmark") -> Dict:
+    return {
+        "name": name, "date_of_birth": birth["dob"].isoformat(), "time_of_birth": birth["tob"],
+        "place_of_birth": "Benchmark", "latitude": birth["lat"], "longitude": birth["lon"],
+        "timezone": birth["timezone"],
+    }
+
+
+def http_cases(client: httpx.AsyncClient) -> List[Case]:
+    counter = itertools.count()
+    fixed = _birth_json(SAMPLE_BIRTHS[0])
+
+    def fresh_birth() -> Dict:
+        # A chart no cache tier has seen: shift the birth place by 0.001° per call
+        i = next(counter)
+        return {**fixed, "latitude": round(20 + (i % 20_000) * 0.001, 4), "longitude": 77.2 + i // 20_000}
+
+    kundli = {"name": "Benchmark", "moon_sign": "Kumbha", "ascendant_rashi": "Simha",
+              "nakshatra": "Shatabhisha", "nakshatra_pada": 2, "yogas": [], "planets": {}}
+
+    async def call(method: str, url: str, **kwargs) -> None:
+        response = await client.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} → {response.status_code}: {response.text[:200]}")
+
+    def case(name: str, method: str, url: str, group: str = "http", concurrency: int = 1, **kwargs) -> Case:
+        payload = kwargs.pop("json_factory", None)
+        if payload is not None:
+            return Case(name, group, lambda: call(method, url, json=payload()),
+                        is_async=True, concurrency=concurrency)
+        return Case(name, group, lambda: call(method, url, **kwargs), is_async=True, concurrency=concurrency)
+
+    return [
+        case("http GET /health", "GET", "/health"),
+        case("http GET /api/v1/rashis/", "GET", "/api/v1/rashis/"),
+        case("http GET /api/v1/planets/ [gzip]", "GET", "/api/v1/planets/",
+             headers={"accept-encoding": "gzip"}),
+        case("http GET /api/v1/transits/current", "GET", "/api/v1/transits/current"),
+        case("http GET /api/v1/horoscope/daily/Mesha", "GET", "/api/v1/horoscope/daily/Mesha"),
+        case("http POST /api/v1/kundli/generate [cached]", "POST", "/api/v1/kundli/generate", json=fixed),
+        case("http POST /api/v1/kundli/generate [cached] x16", "POST", "/api/v1/kundli/generate",
+             concurrency=16, json=fixed),
+        case("http POST /api/v1/kundli/generate [uncached]", "POST", "/api/v1/kundli/generate",
+             json_factory=fresh_birth),
+        case("http POST /api/v1/kundli/dasha?depth=3", "POST", "/api/v1/kundli/dasha?depth=3",
+             json={"date_of_birth": "1990-06-15", "moon_longitude": 317.75}),
+        case("http POST /api/v1/compatibility/match", "POST", "/api/v1/compatibility/match",
+             json={"groom_moon_longitude": 317.75, "bride_moon_longitude": 41.2}),
+        case("ai POST /api/v1/ai/kundli-reading", "POST", "/api/v1/ai/kundli-reading",
+             group="ai", json={"kundli_data": kundli}),
+        case("ai POST /api/v1/ai/kundli-reading x16", "POST", "/api/v1/ai/kundli-reading",
+             group="ai", concurrency=16, json={"kundli_data": kundli}),
+        case("ai POST /api/v1/ai/chat", "POST", "/api/v1/ai/chat", group="ai",
+             json={"messages": [{"role": "user", "content": "What does Saturn in the 7th mean?"}]}),
+        case("ai POST /api/v1/ai/kundli-reading/stream", "POST", "/api/v1/ai/kundli-reading/stream",
+             group="ai", json={"kundli_data": kundli}),
+    ]
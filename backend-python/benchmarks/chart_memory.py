@@ -0,0 +1,81 @@
+"""
+Memory held per KundliData, for charts built one at a time and in a batch,
+next to the serialized forms the API and the chart cache produce from them.
+
+    python -m benchmarks.chart_memory [--charts 5000]
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import date
+from typing import Callable, Dict, List
+
+import orjson
+
+from app.api.v1.kundli import KundliRequest, _kundli_payload
+from app.services import chart_cache
+from app.services.astrology_engine import KundliData, astrology_engine
+
+
+def births(n: int, seed: int = 1) -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        dict(
+            dob=date(rng.randint(1950, 2020), rng.randint(1, 12), rng.randint(1, 28)),
+            tob=f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}", place="",
+            lat=rng.uniform(-60, 60), lon=rng.uniform(-180, 180), timezone="Asia/Kolkata",
+        )
+        for _ in range(n)
+    ]
+
+
+def traced_bytes(make: Callable[[], list]) -> float:
+    """Bytes still allocated per item after `make()`, as seen by tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = make()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / len(items)
+
+
+def run(n: int) -> Dict[str, float]:
+    sample = births(n)
+    astrology_engine.calculate_kundli_batch(sample[:10])        # load the ephemeris table first
+
+    charts: List[KundliData] = astrology_engine.calculate_kundli_batch(sample)
+    request = KundliRequest(name="Benchmark", date_of_birth=date(2000, 1, 1),
+                            time_of_birth="00:00", place_of_birth="")
+    return {
+        "KundliData, batch (bytes/chart)": traced_bytes(lambda: astrology_engine.calculate_kundli_batch(sample)),
+        "KundliData, single (bytes/chart)": traced_bytes(
+            lambda: [astrology_engine.calculate_kundli(**b) for b in sample[: max(n // 5, 1)]]
+        ),
+        "API payload dicts (bytes/chart)": traced_bytes(
+            lambda: [_kundli_payload(request, c, None) for c in charts[: max(n // 5, 1)]]
+        ),
+        "API JSON (bytes/chart)": sum(
+            len(orjson.dumps(_kundli_payload(request, c, None))) for c in charts[:100]
+        ) / min(n, 100),
+        "chart cache entry (bytes/chart)": len(chart_cache.encode(charts[0], [])),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--charts", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = run(args.charts)
+    width = max(map(len, results))
+    print(f"{args.charts} charts")
+    for name, value in results.items():
+        print(f"  {name:<{width}}  {value:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+In-process stand-in for the Groq API. The app's Groq client is pointed at an
+httpx MockTransport that answers chat completions (plain and streamed) with a
+canned reading after an optional delay, so the AI routes can be timed
+without network access or an API key.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+from groq import AsyncGroq
+
+from app.services import ai_service
+
+READING = {
+    "main_prediction": "Jupiter's gaze on the Moon brings steady growth and clarity.",
+    "love": "Warmth returns to close relationships.",
+    "career": "Patient effort is rewarded by those in authority.",
+    "health": "Favour routine; rest well.",
+    "love_score": 78, "career_score": 82, "health_score": 71, "finance_score": 69,
+    "lucky_color": "Yellow", "lucky_number": 3, "lucky_gem": "Yellow Sapphire", "lucky_day": "Thursday",
+    "remedies": ["Chant the Guru Beej Mantra on Thursdays"],
+}
+
+USAGE = {"prompt_tokens": 600, "completion_tokens": 300, "total_tokens": 900}
+
+
+class FakeGroq:
+
+    def __init__(self, latency: float = 0.0, chunk_chars: int = 24):
+        self.latency = latency
+        self.chunk_chars = chunk_chars
+        self.calls = 0
+
+    def _completion(self, body: dict, content: str) -> dict:
+        return {
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "bench"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": USAGE,
+        }
+
+    def _stream(self, body: dict, content: str) -> bytes:
+        events = []
+        for i in range(0, len(content), self.chunk_chars):
+            chunk = {
+                "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": body.get("model", "bench"),
+                "choices": [{"index": 0, "delta": {"content": content[i:i + self.chunk_chars]},
+                             "finish_reason": None}],
+            }
+            events.append(f"data: {json.dumps(chunk)}\n\n")
+        # Like Groq, usage comes on a final chunk with no content
+        final = {
+            "id": "chatcmpl-bench", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": body.get("model", "bench"),
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"id": "req-bench", "usage": USAGE},
+        }
+        events.append(f"data: {json.dumps(final)}\n\n")
+        events.append("data: [DONE]\n\n")
+        return "".join(events).encode()
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        body = json.loads(request.content)
+        content = json.dumps(READING)
+        if body.get("stream"):
+            return httpx.Response(200, content=self._stream(body, content),
+                                  headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json=self._completion(body, content))
+
+    def install(self) -> None:
+        """Make ai_service talk to this stand-in instead of api.groq.com."""
+        ai_service._client = AsyncGroq(
+            api_key="benchmark",
+            base_url="http://groq.benchmark",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self.handle)),
+        )
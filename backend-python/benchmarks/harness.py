@@ -0,0 +1,200 @@
+"""
+Timing, baseline comparison and JSON reports for the benchmark suite.
+"""
+
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from importlib import metadata
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import numpy as np
+
+MIN_CALLS = 5
+
+PACKAGES = ("fastapi", "starlette", "pydantic", "ephem", "numpy", "groq", "httpx", "orjson", "sqlalchemy")
+
+
+@dataclass
+class Case:
+    name: str
+    group: str                      # engine | http | ai
+    fn: Callable[[], Union[Any, Awaitable[Any]]]
+    is_async: bool = False
+    concurrency: int = 1            # async cases only: callers running at once
+
+
+@dataclass
+class Result:
+    name: str
+    group: str
+    concurrency: int
+    calls: int
+    seconds: float
+    ops_per_sec: float
+    mean_us: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+
+
+def _result(case: Case, samples_ns: List[int], elapsed_ns: int) -> Result:
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1000
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return Result(
+        name=case.name, group=case.group, concurrency=case.concurrency,
+        calls=len(samples), seconds=round(elapsed_ns / 1e9, 3),
+        ops_per_sec=round(len(samples) / (elapsed_ns / 1e9), 2),
+        mean_us=round(float(samples.mean()), 2),
+        p50_us=round(float(p50), 2), p95_us=round(float(p95), 2), p99_us=round(float(p99), 2),
+    )
+
+
+def measure(case: Case, min_time: float, warmup: int) -> Result:
+    """Call a sync case back to back for at least `min_time` seconds."""
+    for _ in range(warmup):
+        case.fn()
+    samples: List[int] = []
+    start = time.perf_counter_ns()
+    deadline = start + int(min_time * 1e9)
+    while True:
+        t0 = time.perf_counter_ns()
+        case.fn()
+        t1 = time.perf_counter_ns()
+        samples.append(t1 - t0)
+        if t1 >= deadline and len(samples) >= MIN_CALLS:
+            return _result(case, samples, t1 - start)
+
+
+async def measure_async(case: Case, min_time: float, warmup: int) -> Result:
+    """Run `concurrency` callers of an async case for at least `min_time` seconds."""
+    for _ in range(warmup):
+        await case.fn()
+    samples: List[int] = []
+    start = time.perf_counter_ns()
+    deadline = start + int(min_time * 1e9)
+
+    async def caller() -> None:
+        while True:
+            t0 = time.perf_counter_ns()
+            await case.fn()
+            t1 = time.perf_counter_ns()
+            samples.append(t1 - t0)
+            if t1 >= deadline and len(samples) >= MIN_CALLS:
+                return
+
+    await asyncio.gather(*(caller() for _ in range(case.concurrency)))
+    return _result(case, samples, time.perf_counter_ns() - start)
+
+
+def best(results: List[Result]) -> Result:
+    """The fastest of several rounds — the one least disturbed by the rest of the machine."""
+    return max(results, key=lambda r: r.ops_per_sec)
+
+
+# ── Baselines ──────────────────────────────────────────────────────────────
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path: str, results: List[Result], env: Dict[str, Any]) -> None:
+    baseline = {
+        "environment": env,
+        "cases": {r.name: {"ops_per_sec": r.ops_per_sec, "p50_us": r.p50_us, "p95_us": r.p95_us}
+                  for r in results},
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(
+    results: List[Result], baseline: Optional[Dict[str, Any]], threshold: float
+) -> List[Dict[str, Any]]:
+    """
+    Each result against its baseline. A regression needs both throughput down
+    and median latency up by more than `threshold`; a real slowdown moves
+    both, a stall on a busy machine usually only one.
+    """
+    cases = (baseline or {}).get("cases", {})
+    comparisons = []
+    for r in results:
+        base = cases.get(r.name)
+        if base is None:
+            comparisons.append({"name": r.name, "status": "new"})
+            continue
+        ops = r.ops_per_sec / base["ops_per_sec"] - 1
+        p50 = r.p50_us / base["p50_us"] - 1
+        if ops < -threshold and p50 > threshold:
+            status = "regression"
+        elif ops > threshold and p50 < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        comparisons.append({
+            "name": r.name,
+            "status": status,
+            "ops_per_sec_change": round(ops, 4),
+            "p50_change": round(p50, 4),
+            "p95_change": round(r.p95_us / base["p95_us"] - 1, 4),
+            "baseline": base,
+        })
+    return comparisons
+
+
+# ── Reports ────────────────────────────────────────────────────────────────
+def environment() -> Dict[str, Any]:
+    from app.services.ephemeris_table import get_ephemeris_table
+
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "packages": versions,
+        "ephemeris_table": get_ephemeris_table() is not None,
+    }
+
+
+def write_report(
+    path: str, results: List[Result], comparisons: List[Dict[str, Any]],
+    env: Dict[str, Any], threshold: float,
+) -> None:
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": env,
+        "threshold": threshold,
+        "results": [asdict(r) for r in results],
+        "comparisons": comparisons,
+        "regressions": [c["name"] for c in comparisons if c["status"] == "regression"],
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+def print_table(results: List[Result], comparisons: List[Dict[str, Any]]) -> None:
+    by_name = {c["name"]: c for c in comparisons}
+    width = max(len(r.name) for r in results)
+    print(f"{'case':<{width}}  {'ops/s':>10}  {'p50 µs':>10}  {'p95 µs':>10}  {'Δ ops/s':>8}  {'Δ p50':>8}")
+    for r in results:
+        c = by_name.get(r.name, {})
+        ops, p50 = (f"{c[k]:+.1%}" if k in c else "—" for k in ("ops_per_sec_change", "p50_change"))
+        flag = "  REGRESSION" if c.get("status") == "regression" else ""
+        print(f"{r.name:<{width}}  {r.ops_per_sec:>10,.1f}  {r.p50_us:>10,.1f}  {r.p95_us:>10,.1f}"
+              f"  {ops:>8}  {p50:>8}{flag}")
@@ -0,0 +1,119 @@
+"""
+Benchmark suite: engine hot paths, the ASGI routes in-process (no server, no
+database; Groq answered by benchmarks.fake_groq), compared with stored
+baselines.
+
+    python -m benchmarks.run                          # all cases vs benchmarks/baselines.json
+    python -m benchmarks.run -k kundli --report out.json
+    python -m benchmarks.run --save-baseline          # after an intended change, on the reference machine
+
+Exits with status 1 when any case is more than --threshold slower than its
+baseline, in both throughput and median latency.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+
+# Hermetic app: in-process tiers only, nothing written to Postgres
+os.environ.setdefault("CHART_CACHE_REDIS", "false")
+os.environ.setdefault("SINGLE_FLIGHT_REDIS", "false")
+os.environ.setdefault("KUNDLI_STORE_ENABLED", "false")
+os.environ.setdefault("CHART_POOL_ENABLED", "false")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+# Geocoding always runs against the fixture gazetteer (built below), never a
+# full GeoNames index, so its timings stay comparable with the baseline
+FIXTURES = Path(__file__).with_name("fixtures")
+os.environ["GAZETTEER_PATH"] = str(Path(tempfile.mkdtemp(prefix="benchmark-")) / "gazetteer.bin")
+
+import structlog  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).with_name("baselines.json")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Jyotish Darshan benchmark suite")
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="only cases whose name contains this (repeatable)")
+    parser.add_argument("--group", choices=["engine", "http", "ai"], action="append",
+                        help="only these groups (repeatable)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per round")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per case; the fastest is kept")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed calls per case")
+    parser.add_argument("--groq-latency-ms", type=float, default=0.0,
+                        help="simulated Groq response time")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before a case counts as a regression")
+    parser.add_argument("--report", help="write a JSON report here")
+    return parser.parse_args()
+
+
+def selected(case, args: argparse.Namespace) -> bool:
+    if args.group and case.group not in args.group:
+        return False
+    return not args.filter or any(f in case.name for f in args.filter)
+
+
+async def run_async_cases(args: argparse.Namespace) -> List:
+    import httpx
+
+    from app.main import app
+    from benchmarks.cases import http_cases
+    from benchmarks.fake_groq import FakeGroq
+    from benchmarks.harness import best, measure_async
+
+    FakeGroq(latency=args.groq_latency_ms / 1000).install()
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for case in http_cases(client):
+            if selected(case, args):
+                rounds = [await measure_async(case, args.min_time, args.warmup) for _ in range(args.rounds)]
+                results.append(best(rounds))
+                print(f"  {case.name}", file=sys.stderr)
+    return results
+
+
+def main() -> None:
+    args = parse_args()
+    # Keep the app's per-request warnings (Redis/Postgres unavailable) out of the timings
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(40))
+
+    from app.services.gazetteer import build_index
+    from benchmarks.cases import engine_cases
+    from benchmarks.harness import (
+        best, compare, environment, load_baseline, measure, print_table, save_baseline, write_report,
+    )
+
+    build_index(str(FIXTURES / "cities.tsv"), os.environ["GAZETTEER_PATH"], str(FIXTURES / "countryInfo.txt"))
+    results = []
+    for case in engine_cases():
+        if selected(case, args):
+            results.append(best([measure(case, args.min_time, args.warmup) for _ in range(args.rounds)]))
+            print(f"  {case.name}", file=sys.stderr)
+    if not args.group or {"http", "ai"} & set(args.group):
+        results += asyncio.run(run_async_cases(args))
+    if not results:
+        sys.exit("No benchmark cases selected")
+
+    env = environment()
+    comparisons = compare(results, load_baseline(args.baseline), args.threshold)
+    print_table(results, comparisons)
+    if args.report:
+        write_report(args.report, results, comparisons, env, args.threshold)
+    if args.save_baseline:
+        save_baseline(args.baseline, results, env)
+        print(f"Baseline written to {args.baseline}")
+    elif any(c["status"] == "regression" for c in comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from app.services import single_flight as single_flight_module
+from app.services.single_flight import SingleFlight
+
+
+class FakePubSub:
+
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+
+    async def get_message(self, ignore_subscribe_messages: bool = True, timeout: float = 0.0):
+        try:
+            return {"type": "message", "data": await asyncio.wait_for(self.queue.get(), timeout)}
+        except asyncio.TimeoutError:
+            return None
+
+    async def unsubscribe(self, channel: str) -> None:
+        self.redis.subscribers[channel].remove(self.queue)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class FakePipeline:
+
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self) -> list:
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    """The few commands SingleFlight uses, with no expiry."""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+        self.published = []
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value.encode() if isinstance(value, str) else value
+        return True
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def delete(self, key):
+        return int(self.data.pop(key, None) is not None)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def eval(self, script, numkeys, key, token):
+        # _RELEASE_LOCK: delete only if the lock still holds `token`
+        if self.data.get(key) == token.encode():
+            del self.data[key]
+            return 1
+        return 0
+
+    async def publish(self, channel, blob):
+        self.published.append((channel, blob))
+        for queue in self.subscribers.get(channel, ()):
+            queue.put_nowait(blob)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(single_flight_module, "get_redis", lambda: fake)
+    return fake
+
+
+def test_cancelled_leader_hands_over_to_local_follower():
+    async def main():
+        flight = SingleFlight(redis_enabled=False)
+        started, calls = asyncio.Event(), []
+
+        async def fn():
+            calls.append(1)
+            if len(calls) == 1:
+                started.set()
+                await asyncio.sleep(3600)
+            return "chart"
+
+        leader = asyncio.create_task(flight.do("k", fn))
+        await started.wait()
+        follower = asyncio.create_task(flight.do("k", fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await follower == "chart"
+        assert len(calls) == 2
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_leader_publishes_no_failure(redis):
+    async def main():
+        leading, following = SingleFlight(wait_seconds=5), SingleFlight(wait_seconds=5)
+        started = asyncio.Event()
+
+        async def stuck():
+            started.set()
+            await asyncio.sleep(3600)
+
+        async def compute():
+            return {"chart": 1}
+
+        leader = asyncio.create_task(leading.do("k", stuck))
+        await started.wait()
+        follower = asyncio.create_task(following.do("k", compute))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await follower == {"chart": 1}
+        assert following.fallbacks == 1
+        assert following.failures_shared == 0
+        assert not any(channel == "sf:chan:k" for channel, _ in redis.published)
+
+    asyncio.run(main())
+
+
+def test_late_leader_keeps_the_next_leaders_lock(redis):
+    async def main():
+        flight = SingleFlight()
+
+        async def slow():
+            # Our lock expired and another worker took the key over
+            redis.data["sf:lock:k"] = b"next-leader"
+            return {"chart": 1}
+
+        assert await flight.do("k", slow) == {"chart": 1}
+        assert redis.data["sf:lock:k"] == b"next-leader"
+        assert redis.data["sf:result:k"] == b'1{"chart": 1}'
+
+    asyncio.run(main())
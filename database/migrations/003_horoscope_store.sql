@@ -0,0 +1,14 @@
+-- =============================================================
+-- Jyotish Darshan — Pre-generated horoscope store
+-- Migration: 003_horoscope_store.sql
+-- =============================================================
+
+-- Full AI reading alongside the summary columns, and the Mahadasha it was
+-- generated for ('' = general reading for the rashi)
+ALTER TABLE horoscopes
+    ADD COLUMN IF NOT EXISTS dasha   VARCHAR(50) NOT NULL DEFAULT '',
+    ADD COLUMN IF NOT EXISTS reading JSONB;
+
+-- One reading per rashi, period, window and dasha; pre-generation upserts on it
+CREATE UNIQUE INDEX IF NOT EXISTS uq_horoscopes_reading
+    ON horoscopes(rashi_id, type, date_from, dasha);
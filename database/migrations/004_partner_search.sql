@@ -0,0 +1,26 @@
+-- =============================================================
+-- Jyotish Darshan — Partner search over stored Kundlis
+-- Migration: 004_partner_search.sql
+-- =============================================================
+
+-- Everything Ashtakoota needs is the Moon's nakshatra pada
+-- (0–107 = nakshatra × 4 + pada − 1), plus Manglik status and gender
+ALTER TABLE kundlis
+    ADD COLUMN IF NOT EXISTS moon_longitude DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS moon_pada      SMALLINT CHECK (moon_pada BETWEEN 0 AND 107),
+    ADD COLUMN IF NOT EXISTS is_manglik     BOOLEAN;
+
+-- Backfill from the nakshatra columns; search compares genders as lowercase
+UPDATE kundlis k
+   SET moon_pada = (n.id - 1) * 4 + k.nakshatra_pada - 1
+  FROM nakshatras n
+ WHERE k.moon_pada IS NULL
+   AND k.nakshatra = n.name
+   AND k.nakshatra_pada BETWEEN 1 AND 4;
+
+UPDATE kundlis SET gender = lower(gender) WHERE gender <> lower(gender);
+
+-- Each (gender, manglik, pada) bucket is one contiguous range, already in id order
+CREATE INDEX IF NOT EXISTS idx_kundlis_partner_search
+    ON kundlis(gender, is_manglik, moon_pada, id)
+    WHERE is_public AND moon_pada IS NOT NULL;